@@ -18,11 +18,8 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from cvxpy.atoms.affine.affine_atom import AffAtom
-from cvxpy.atoms.affine.vec import vec
-from cvxpy.atoms.affine.reshape import reshape
 from cvxpy.utilities import key_utils as ku
 import cvxpy.lin_ops.lin_utils as lu
-import scipy.sparse as sp
 import numpy as np
 
 
@@ -91,19 +88,7 @@ class index(AffAtom):
         Expression
             An expression representing the index/slice.
         """
-        expr = index.cast_to_const(expr)
-        # Order the entries of expr and select them using key.
-        idx_mat = np.arange(expr.size[0]*expr.size[1])
-        idx_mat = np.reshape(idx_mat, expr.size, order='F')
-        select_mat = idx_mat[key]
-        if select_mat.ndim == 2:
-            final_size = select_mat.shape
-        else:  # Always cast 1d arrays as column vectors.
-            final_size = (select_mat.size, 1)
-        select_vec = np.reshape(select_mat, select_mat.size, order='F')
-        # Select the chosen entries from expr.
-        identity = sp.eye(expr.size[0]*expr.size[1]).tocsc()
-        return reshape(identity[select_vec]*vec(expr), *final_size)
+        return special_index(expr, key)
 
     @staticmethod
     def get_index(matrix, constraints, row, col):
@@ -190,3 +175,88 @@ class index(AffAtom):
                                                      (rows, cols),
                                                      [key])
         constraints += [lu.create_eq(slc, block)] + idx_constr
+
+
+class special_index(AffAtom):
+    """ Indexing using logical indexing or a list of indices. """
+    # expr - the expression indexed into.
+    # key - the index key, with ndarrays or lists.
+
+    def __init__(self, expr, key):
+        self.key = key
+        expr = special_index.cast_to_const(expr)
+        self._select_vec, self._size = special_index.select_entries(expr.size,
+                                                                    key)
+        super(special_index, self).__init__(expr)
+
+    # The string representation of the atom.
+    def name(self):
+        return self.args[0].name() + "[%s]" % (self.key,)
+
+    # Returns the selected entries of the given value.
+    @AffAtom.numpy_numeric
+    def numeric(self, values):
+        entries = np.asarray(values[0]).ravel(order='F')[self._select_vec]
+        return np.reshape(entries, self._size, order='F')
+
+    def size_from_args(self):
+        """Returns the shape of the index expression.
+        """
+        return self._size
+
+    def get_data(self):
+        """Returns the key.
+        """
+        return [self.key]
+
+    @staticmethod
+    def select_entries(size, key):
+        """Returns the entries selected by the key.
+
+        Parameters
+        ----------
+        size : tuple
+            The size of the expression being indexed into.
+        key : tuple
+            ndarrays or lists.
+
+        Returns
+        -------
+        tuple
+            (indices of the selected entries in the vectorized expression,
+             size of the result)
+        """
+        rows, cols = size
+        # Zero-stride views of the row and column offsets, so only the
+        # selected entries are evaluated.
+        row_idx, col_idx = np.broadcast_arrays(np.arange(rows)[:, None],
+                                               rows*np.arange(cols)[None, :])
+        select_mat = row_idx[key] + col_idx[key]
+        if select_mat.ndim == 2:
+            final_size = select_mat.shape
+        else:  # Always cast 1d arrays as column vectors.
+            final_size = (select_mat.size, 1)
+        select_vec = np.reshape(select_mat, select_mat.size, order='F')
+        return select_vec, final_size
+
+    @staticmethod
+    def graph_implementation(arg_objs, size, data=None):
+        """Select the entries of the expression.
+
+        Parameters
+        ----------
+        arg_objs : list
+            LinExpr for each argument.
+        size : tuple
+            The size of the resulting expression.
+        data : list
+            The key.
+
+        Returns
+        -------
+        tuple
+            (LinOp, [constraints])
+        """
+        select_vec, _ = special_index.select_entries(arg_objs[0].size,
+                                                     data[0])
+        return (lu.gather(arg_objs[0], size, select_vec), [])
@@ -19,12 +19,14 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 
 
 from .. import utilities as u
+from ..utilities import performance_utils as pu
 from .. import interface as intf
 from ..expressions.constants import Constant, CallbackParam
 from ..expressions.expression import Expression
+from ..expressions.leaf import Leaf
 import abc
 import numpy as np
-from fastcache import clru_cache
+import scipy.sparse as sp
 
 
 class Atom(Expression):
@@ -42,6 +44,9 @@ class Atom(Expression):
         self.args = [Atom.cast_to_const(arg) for arg in args]
         self.validate_arguments()
         self._size = self.size_from_args()
+        # The last computed value and the Leaf.VALUE_VERSION it is valid for.
+        self._value_version = None
+        self._cached_value = None
 
     def name(self):
         """Returns the string representation of the function call.
@@ -70,13 +75,19 @@ class Atom(Expression):
         """
         return NotImplemented
 
-    @clru_cache(maxsize=100)
+    @pu.compute_once
+    def is_constant(self):
+        """Is the expression constant?
+        """
+        return super(Atom, self).is_constant()
+
+    @pu.compute_once
     def is_positive(self):
         """Is the expression positive?
         """
         return self.sign_from_args()[0]
 
-    @clru_cache(maxsize=100)
+    @pu.compute_once
     def is_negative(self):
         """Is the expression negative?
         """
@@ -106,7 +117,7 @@ class Atom(Expression):
         """
         return NotImplemented
 
-    @clru_cache(maxsize=100)
+    @pu.compute_once
     def is_convex(self):
         """Is the expression convex?
         """
@@ -123,7 +134,7 @@ class Atom(Expression):
         else:
             return False
 
-    @clru_cache(maxsize=100)
+    @pu.compute_once
     def is_concave(self):
         """Is the expression concave?
         """
@@ -140,32 +151,40 @@ class Atom(Expression):
         else:
             return False
 
+    @pu.compute_once
+    def is_dcp(self):
+        """Is the expression DCP compliant? (i.e., no unknown curvatures).
+        """
+        return super(Atom, self).is_dcp()
+
     def canonicalize(self):
         """Represent the atom as an affine objective and conic constraints.
         """
+        obj = self.canonical_node[0]
+        return (obj, u.canonical_constraints([self]))
+
+    def canonicalize_node(self):
+        """Represent the atom as an affine objective and the conic constraints
+           added by its graph implementation.
+        """
         # Constant atoms are treated as a leaf.
         if self.is_constant():
             # Parameterized expressions are evaluated later.
             if self.parameters():
                 rows, cols = self.size
                 param = CallbackParam(lambda: self.value, rows, cols)
-                return param.canonical_form
+                return param.canonical_node
             # Non-parameterized expressions are evaluated immediately.
             else:
-                return Constant(self.value).canonical_form
+                return Constant(self.value).canonical_node
         else:
-            arg_objs = []
-            constraints = []
-            for arg in self.args:
-                obj, constr = arg.canonical_form
-                arg_objs.append(obj)
-                constraints += constr
+            arg_objs = [arg.canonical_node[0] for arg in self.args]
             # Special info required by the graph implementation.
             data = self.get_data()
             graph_obj, graph_constr = self.graph_implementation(arg_objs,
                                                                 self.size,
                                                                 data)
-            return (graph_obj, constraints + graph_constr)
+            return (graph_obj, graph_constr, self.args)
 
     @abc.abstractmethod
     def graph_implementation(self, arg_objs, size, data=None):
@@ -218,23 +237,33 @@ class Atom(Expression):
 
     @property
     def value(self):
+        return evaluate([self])[0]
+
+    def value_from_args(self, arg_values):
+        """Computes the value of the atom from the values of its arguments.
+
+        Parameters
+        ----------
+        arg_values : list
+            The value of each argument, or None if the atom is zero.
+
+        Returns
+        -------
+        A numpy matrix or a scalar, or None if the value is unknown.
+        """
         # Catch the case when the expression is known to be
         # zero through DCP analysis.
         if self.is_zero():
             result = intf.DEFAULT_INTF.zeros(*self.size)
         else:
-            arg_values = []
-            for arg in self.args:
-                # A argument without a value makes all higher level
-                # values None.
-                # But if the atom is constant with non-constant
-                # arguments it doesn't depend on its arguments,
-                # so it isn't None.
-                arg_val = arg.value
-                if arg_val is None and not self.is_constant():
-                    return None
-                else:
-                    arg_values.append(arg_val)
+            # A argument without a value makes all higher level
+            # values None.
+            # But if the atom is constant with non-constant
+            # arguments it doesn't depend on its arguments,
+            # so it isn't None.
+            if any(val is None for val in arg_values) and \
+               not self.is_constant():
+                return None
             result = self.numeric(arg_values)
 
         # Reduce to a scalar if possible.
@@ -330,3 +359,70 @@ class Atom(Expression):
             result = numeric_func(self, values)
             return intf.DEFAULT_INTF.const_to_matrix(result)
         return new_numeric
+
+
+def evaluate(exprs):
+    """Returns the values of the expressions.
+
+    The expressions are evaluated in a single pass over their combined
+    graph, so shared subexpressions are computed once. Atoms keep their
+    values until a variable or parameter value changes.
+
+    Parameters
+    ----------
+    exprs : list
+        The expressions to evaluate.
+
+    Returns
+    -------
+    list
+        The value of each expression.
+    """
+    version = Leaf.VALUE_VERSION
+    # Map of id(expression) to value for this pass.
+    values = {}
+    # Ids of expressions that depend on a callback parameter,
+    # whose value can change without notice.
+    volatile = set()
+    stack = [(expr, False) for expr in reversed(exprs)]
+    while stack:
+        expr, expanded = stack.pop()
+        key = id(expr)
+        if key in values:
+            continue
+        if not isinstance(expr, Atom):
+            values[key] = expr.value
+            if isinstance(expr, CallbackParam):
+                volatile.add(key)
+        elif expr._value_version == version:
+            values[key] = expr._cached_value
+        elif not expanded:
+            stack.append((expr, True))
+            # The value of a zero atom does not depend on its arguments.
+            if not expr.is_zero():
+                stack.extend((arg, False) for arg in reversed(expr.args))
+        else:
+            if expr.is_zero():
+                arg_values = None
+            else:
+                arg_values = [values[id(arg)] for arg in expr.args]
+            values[key] = expr.value_from_args(arg_values)
+            if any(id(arg) in volatile for arg in expr.args):
+                volatile.add(key)
+            # Evaluating a PartialProblem changes variable values.
+            elif Leaf.VALUE_VERSION == version:
+                # The cached value is shared by all later reads,
+                # so it is stored read-only and handed out as a copy.
+                values[key] = Leaf._read_only(values[key])
+                expr._value_version = version
+                expr._cached_value = values[key]
+    return [_copy_value(values[id(expr)]) if isinstance(expr, Atom)
+            else values[id(expr)] for expr in exprs]
+
+
+def _copy_value(value):
+    """Returns a copy of a NumPy or SciPy value.
+    """
+    if isinstance(value, np.ndarray) or sp.issparse(value):
+        return value.copy()
+    return value
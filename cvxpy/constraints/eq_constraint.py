@@ -39,15 +39,17 @@ class EqConstraint(LeqConstraint):
         """
         return cvxtypes.abs()(self._expr)
 
-    def canonicalize(self):
-        """Returns the graph implementation of the object.
+    def canonicalize_node(self):
+        """Returns the graph implementation of the object alone.
 
         Marks the top level constraint as the dual_holder,
         so the dual value will be saved to the EqConstraint.
 
-        Returns:
-            A tuple of (affine expression, [constraints]).
+        Returns
+        -------
+        tuple
+            A tuple of (None, [dual holder], [expression]).
         """
-        obj, constraints = self._expr.canonical_form
+        obj = self._expr.canonical_node[0]
         dual_holder = lu.create_eq(obj, constr_id=self.id)
-        return (None, constraints + [dual_holder])
+        return (None, [dual_holder], [self._expr])
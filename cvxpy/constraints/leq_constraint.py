@@ -100,9 +100,22 @@ class LeqConstraint(u.Canonical, Constraint):
         tuple
             A tuple of (affine expression, [constraints]).
         """
-        obj, constraints = self._expr.canonical_form
+        return (None, u.canonical_constraints([self]))
+
+    def canonicalize_node(self):
+        """Returns the graph implementation of the object alone.
+
+        Marks the top level constraint as the dual_holder,
+        so the dual value will be saved to the LeqConstraint.
+
+        Returns
+        -------
+        tuple
+            A tuple of (None, [dual holder], [expression]).
+        """
+        obj = self._expr.canonical_node[0]
         dual_holder = lu.create_leq(obj, constr_id=self.id)
-        return (None, constraints + [dual_holder])
+        return (None, [dual_holder], [self._expr])
 
     def variables(self):
         """Returns the variables in the compared expressions.
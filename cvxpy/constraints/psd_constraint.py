@@ -53,18 +53,18 @@ class PSDConstraint(LeqConstraint):
         min_eig = cvxtypes.lambda_min()(self._expr + self._expr.T)/2
         return cvxtypes.neg()(min_eig)
 
-    def canonicalize(self):
-        """Returns the graph implementation of the object.
+    def canonicalize_node(self):
+        """Returns the graph implementation of the object alone.
 
         Marks the top level constraint as the dual_holder,
-        so the dual value will be saved to the EqConstraint.
+        so the dual value will be saved to the PSDConstraint.
 
         Returns:
-            A tuple of (affine expression, [constraints]).
+            A tuple of (None, [dual holder], [expression]).
         """
-        obj, constraints = self._expr.canonical_form
+        obj = self._expr.canonical_node[0]
         half = lu.create_const(0.5, (1, 1))
         symm = lu.mul_expr(half, lu.sum_expr([obj, lu.transpose(obj)]),
                            obj.size)
         dual_holder = SDP(symm, enforce_sym=False, constr_id=self.id)
-        return (None, constraints + [dual_holder])
+        return (None, [dual_holder], [self._expr])
@@ -54,8 +54,8 @@ class SOC(Constraint):
             The solver being called.
         """
         leq_constr += self.__format[1]
-        # Update dims.
-        dims[s.SOC_DIM].append(self.size[0])
+        # Update dims with a block of one cone.
+        dims[s.SOC_DIM].append((1, self.size[0]))
 
     @pu.lazyprop
     def __format(self):
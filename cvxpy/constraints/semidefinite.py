@@ -21,9 +21,8 @@ import cvxpy.settings as s
 from cvxpy.error import SolverError
 import cvxpy.lin_ops.lin_utils as lu
 import cvxpy.utilities.performance_utils as pu
+import cvxpy.utilities.tri_utils as tri_utils
 from cvxpy.constraints.constraint import Constraint
-import numpy as np
-import scipy.sparse as sp
 
 
 class SDP(Constraint):
@@ -98,25 +97,8 @@ class SDP(Constraint):
         """
         rows = cols = self.size[0]
         entries = rows*(cols + 1)//2
-        val_arr = []
-        row_arr = []
-        col_arr = []
-        count = 0
-        for j in range(cols):
-            for i in range(rows):
-                if j <= i:
-                    # Index in the original matrix.
-                    col_arr.append(j*rows + i)
-                    # Index in the extracted vector.
-                    row_arr.append(count)
-                    if j == i:
-                        val_arr.append(1.0)
-                    else:
-                        val_arr.append(np.sqrt(2))
-                    count += 1
-
+        coeff = tri_utils.scaled_lower_tri(rows)
         size = (entries, rows*cols)
-        coeff = sp.coo_matrix((val_arr, (row_arr, col_arr)), size).tocsc()
         coeff = lu.create_const(coeff, size, sparse=True)
         vect = lu.reshape(self.A, (rows*cols, 1))
         return lu.mul_expr(coeff, vect, (entries, 1))
@@ -57,9 +57,8 @@ class SOC_Axis(SOC):
             The solver being called.
         """
         leq_constr += self.__format[1]
-        # Update dims.
-        for cone_size in self.size:
-            dims[s.SOC_DIM].append(cone_size[0])
+        # Update dims with a block of same-size cones.
+        dims[s.SOC_DIM].append((self.num_cones(), self.cone_size()[0]))
 
     @pu.lazyprop
     def __format(self):
@@ -91,8 +90,4 @@ class SOC_Axis(SOC):
         list
             A list of the dimensions of the elementwise cones.
         """
-        cones = []
-        cone_size = self.cone_size()
-        for i in range(self.num_cones()):
-            cones.append(cone_size)
-        return cones
+        return self.num_cones()*[self.cone_size()]
@@ -20,6 +20,7 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 # Utility functions for constraints.
 
 import cvxpy.lin_ops.lin_utils as lu
+import numpy as np
 import scipy.sparse as sp
 
 
@@ -53,10 +54,11 @@ def format_axis(t, X, axis):
     # Make X_mat
     mat_size = (cone_size, X.size[0])
     prod_size = (cone_size, X.size[1])
-    val_arr = (cone_size - 1)*[1.0]
-    row_arr = range(1, cone_size)
-    col_arr = range(cone_size-1)
-    X_mat = sp.coo_matrix((val_arr, (row_arr, col_arr)), mat_size).tocsc()
+    # Shifts X down by one row, so each column holds a single non-zero.
+    val_arr = np.ones(cone_size - 1)
+    row_arr = np.arange(1, cone_size)
+    col_ptr = np.arange(cone_size)
+    X_mat = sp.csc_matrix((val_arr, row_arr, col_ptr), mat_size)
     X_mat = lu.create_const(X_mat, mat_size, sparse=True)
     terms += [lu.mul_expr(X_mat, X, prod_size)]
     return [lu.create_geq(lu.sum_expr(terms))]
@@ -105,13 +107,10 @@ def get_spacing_matrix(size, spacing, offset):
     LinOp
         A sparse matrix constant LinOp.
     """
-    val_arr = []
-    row_arr = []
-    col_arr = []
-    # Selects from each column.
-    for var_row in range(size[1]):
-        val_arr.append(1.0)
-        row_arr.append(spacing*var_row + offset)
-        col_arr.append(var_row)
-    mat = sp.coo_matrix((val_arr, (row_arr, col_arr)), size).tocsc()
+    # Selects from each column, so each column holds a single non-zero.
+    cols = size[1]
+    val_arr = np.ones(cols)
+    row_arr = spacing*np.arange(cols) + offset
+    col_ptr = np.arange(cols + 1)
+    mat = sp.csc_matrix((val_arr, row_arr, col_ptr), size)
     return lu.create_const(mat, size, sparse=True)
@@ -75,6 +75,7 @@ class Parameter(Leaf):
     @value.setter
     def value(self, val):
         self._value = self._validate_value(val)
+        self.values_changed()
 
     @property
     def grad(self):
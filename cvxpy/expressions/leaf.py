@@ -29,10 +29,33 @@ class Leaf(expression.Expression):
     """
 
     __metaclass__ = abc.ABCMeta
+    # Incremented whenever the value of a variable or parameter changes.
+    # Atoms store their values along with the version they were computed at.
+    VALUE_VERSION = 0
 
     def __init__(self):
         self.args = []
 
+    @staticmethod
+    def values_changed():
+        """Marks the cached values of all expressions as out of date.
+
+        Called when a value is assigned. Changing a value in place is not
+        tracked, so the value must be assigned again afterwards.
+        """
+        Leaf.VALUE_VERSION += 1
+
+    @staticmethod
+    def _read_only(value):
+        """Returns a read-only view of a NumPy value.
+
+        Used for the values atoms cache, which must not change in place.
+        """
+        if isinstance(value, np.ndarray):
+            value = value.view()
+            value.setflags(write=False)
+        return value
+
     def variables(self):
         """Default is empty list of Variables.
         """
@@ -81,7 +104,13 @@ class Leaf(expression.Expression):
         """
         if val is not None:
             # Convert val to the proper matrix type.
+            orig_val = val
             val = intf.DEFAULT_INTF.const_to_matrix(val)
+            # Keep a private copy so that later writes into
+            # the argument do not bypass values_changed.
+            if isinstance(orig_val, np.ndarray) and \
+               np.may_share_memory(val, orig_val):
+                val = val.copy()
             size = intf.size(val)
             if size != self.size:
                 raise ValueError(
@@ -68,6 +68,7 @@ class Variable(Leaf):
         """Save the value of the primal variable.
         """
         self.primal_value = value
+        self.values_changed()
 
     @property
     def value(self):
@@ -19,3 +19,5 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 
 from cvxpy.lin_ops.lin_constraints import LinEqConstr, LinLeqConstr
 from cvxpy.lin_ops.lin_op import LinOp, CONSTANT_ID
+from cvxpy.lin_ops.lin_arena import (LinOpArena, to_arena, from_arena,
+                                     constrs_to_arena, constrs_from_arena)
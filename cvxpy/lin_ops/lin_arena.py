@@ -0,0 +1,264 @@
+"""
+Copyright 2013 Steven Diamond
+
+This file is part of CVXPY.
+
+CVXPY is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CVXPY is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# A flat representation of LinOp trees.
+# Every distinct node is stored once, in post-order, as an integer opcode,
+# a size and a range of child indices. Data that is not a LinOp goes
+# into a side table. Pickling an arena never recurses, and subtrees shared
+# between the stored trees stay shared.
+
+from cvxpy.lin_ops.lin_constraints import LinEqConstr, LinLeqConstr
+import cvxpy.lin_ops.lin_op as lo
+import numpy as np
+
+
+class LinOpArena(object):
+    """A collection of LinOp trees stored in flat arrays.
+
+    Attributes
+    ----------
+    opcodes : NumPy int8 array
+        The opcode of each node, an index into lin_op.OP_TYPES.
+    sizes : NumPy int64 array
+        The (rows, cols) of each node.
+    child_ptr : NumPy int64 array
+        The args of node i are children[child_ptr[i]:child_ptr[i+1]].
+    children : NumPy int64 array
+        The node indices of the args.
+    data_node : NumPy int64 array
+        The node index of the data of each node, or -1 if the data
+        is not a LinOp.
+    data_ref : NumPy int64 array
+        The index of the data of each node in payloads, or -1 if the data
+        is None or a LinOp.
+    payloads : list
+        The data that is not a LinOp.
+    roots : NumPy int64 array
+        The node indices of the trees.
+    """
+    __slots__ = ("opcodes", "sizes", "child_ptr", "children",
+                 "data_node", "data_ref", "payloads", "roots")
+
+    def __init__(self, opcodes, sizes, child_ptr, children,
+                 data_node, data_ref, payloads, roots):
+        self.opcodes = opcodes
+        self.sizes = sizes
+        self.child_ptr = child_ptr
+        self.children = children
+        self.data_node = data_node
+        self.data_ref = data_ref
+        self.payloads = payloads
+        self.roots = roots
+
+    @classmethod
+    def from_lin_ops(cls, roots):
+        """Flattens LinOp trees into an arena.
+
+        Parameters
+        ----------
+        roots : list
+            The LinOps to store.
+
+        Returns
+        -------
+        LinOpArena
+            The arena holding every node reachable from the roots.
+        """
+        # Map of id(LinOp) to node index. The roots keep the nodes alive.
+        index = {}
+        nodes = []
+        stack = [(root, False) for root in reversed(roots)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in index:
+                continue
+            if expanded:
+                index[id(node)] = len(nodes)
+                nodes.append(node)
+            else:
+                stack.append((node, True))
+                if isinstance(node.data, lo.LinOp):
+                    stack.append((node.data, False))
+                stack.extend((arg, False) for arg in reversed(node.args))
+
+        num_nodes = len(nodes)
+        opcodes = np.fromiter((node.opcode for node in nodes),
+                              np.int8, num_nodes)
+        sizes = np.array([node.size for node in nodes],
+                         dtype=np.int64).reshape((num_nodes, 2))
+        num_args = np.fromiter((len(node.args) for node in nodes),
+                               np.int64, num_nodes)
+        child_ptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(num_args, out=child_ptr[1:])
+        children = np.fromiter((index[id(arg)] for node in nodes
+                                for arg in node.args),
+                               np.int64, child_ptr[-1])
+        data_node = np.full(num_nodes, -1, dtype=np.int64)
+        data_ref = np.full(num_nodes, -1, dtype=np.int64)
+        payloads = []
+        for i, node in enumerate(nodes):
+            if isinstance(node.data, lo.LinOp):
+                data_node[i] = index[id(node.data)]
+            elif node.data is not None:
+                data_ref[i] = len(payloads)
+                payloads.append(node.data)
+        roots = np.array([index[id(root)] for root in roots], dtype=np.int64)
+        return cls(opcodes, sizes, child_ptr, children,
+                   data_node, data_ref, payloads, roots)
+
+    def __len__(self):
+        """The number of nodes in the arena.
+        """
+        return len(self.opcodes)
+
+    @property
+    def nbytes(self):
+        """The memory used by the index arrays, excluding the payloads.
+        """
+        return sum(arr.nbytes for arr in [self.opcodes, self.sizes,
+                                          self.child_ptr, self.children,
+                                          self.data_node, self.data_ref,
+                                          self.roots])
+
+    def to_lin_ops(self):
+        """Rebuilds the LinOp trees stored in the arena.
+
+        Returns
+        -------
+        list
+            The LinOps for the roots, in order.
+        """
+        child_ptr = self.child_ptr.tolist()
+        children = self.children.tolist()
+        data_node = self.data_node.tolist()
+        data_ref = self.data_ref.tolist()
+        ops = []
+        # Post-order, so the args and data of a node are built before it.
+        for i, (code, size) in enumerate(zip(self.opcodes.tolist(),
+                                             self.sizes.tolist())):
+            args = [ops[j] for j in children[child_ptr[i]:child_ptr[i+1]]]
+            if data_node[i] >= 0:
+                data = ops[data_node[i]]
+            elif data_ref[i] >= 0:
+                data = self.payloads[data_ref[i]]
+            else:
+                data = None
+            ops.append(lo.LinOp(lo.OP_TYPES[code], tuple(size), args, data))
+        return [ops[i] for i in self.roots.tolist()]
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+def to_arena(lin_ops):
+    """Flattens LinOp trees into an arena, e.g., before pickling them.
+
+    Parameters
+    ----------
+    lin_ops : list
+        The LinOps to store.
+
+    Returns
+    -------
+    LinOpArena
+        The arena holding every node reachable from the LinOps.
+    """
+    return LinOpArena.from_lin_ops(lin_ops)
+
+
+def from_arena(arena):
+    """Rebuilds the LinOp trees stored in an arena.
+
+    Parameters
+    ----------
+    arena : LinOpArena
+        The arena returned by to_arena.
+
+    Returns
+    -------
+    list
+        The LinOps passed to to_arena, in order.
+    """
+    return arena.to_lin_ops()
+
+
+def constrs_to_arena(constr_lists, exprs=()):
+    """Stores the linear constraints of several lists in one arena.
+
+    Constraints that appear in more than one list are stored once.
+
+    Parameters
+    ----------
+    constr_lists : list
+        Lists of constraints. Constraints other than LinEqConstr and
+        LinLeqConstr are kept as they are.
+    exprs : list, optional
+        Other LinOps to store in the arena.
+
+    Returns
+    -------
+    tuple
+        (the packed constraints for constrs_from_arena, the lists with
+         each linear constraint replaced by an integer reference)
+    """
+    index = {}
+    lin_constrs = []
+    for constr_list in constr_lists:
+        for constr in constr_list:
+            if isinstance(constr, (LinEqConstr, LinLeqConstr)) and \
+               id(constr) not in index:
+                index[id(constr)] = len(lin_constrs)
+                lin_constrs.append(constr)
+    ref_lists = [[index.get(id(constr), constr) for constr in constr_list]
+                 for constr_list in constr_lists]
+    headers = [(type(constr), constr.constr_id, constr.size)
+               for constr in lin_constrs]
+    arena = to_arena(list(exprs) + [constr.expr for constr in lin_constrs])
+    return (arena, len(exprs), headers), ref_lists
+
+
+def constrs_from_arena(packed, ref_lists):
+    """Rebuilds the constraints stored by constrs_to_arena.
+
+    Parameters
+    ----------
+    packed : tuple
+        The packed constraints returned by constrs_to_arena.
+    ref_lists : list
+        The lists of constraints and references returned by
+        constrs_to_arena.
+
+    Returns
+    -------
+    tuple
+        (the other LinOps, the lists of constraints)
+    """
+    arena, num_exprs, headers = packed
+    ops = from_arena(arena)
+    lin_constrs = [constr_type(expr, constr_id, size)
+                   for (constr_type, constr_id, size), expr
+                   in zip(headers, ops[num_exprs:])]
+    constr_lists = [[lin_constrs[constr] if isinstance(constr, int)
+                     else constr for constr in constr_list]
+                    for constr_list in ref_lists]
+    return ops[:num_exprs], constr_lists
@@ -17,15 +17,6 @@ You should have received a copy of the GNU General Public License
 along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from collections import namedtuple
-
-# A linear operator applied to a variable
-# or a constant or function of parameters.
-LinOp = namedtuple("LinOp", ["type",
-                             "size",
-                             "args",
-                             "data"])
-
 # The types of linear operators.
 
 # A variable.
@@ -103,3 +94,68 @@ PARAM = "param"
 NO_OP = "no_op"
 # ID in coefficients for constants.
 CONSTANT_ID = "constant_id"
+
+# The operator types in a fixed order.
+# The position of a type is its integer opcode in a LinOp or LinOpArena.
+OP_TYPES = (VARIABLE, PROMOTE, MUL, RMUL, MUL_ELEM, DIV, SUM, NEG, INDEX,
+            TRANSPOSE, SUM_ENTRIES, TRACE, RESHAPE, DIAG_VEC, DIAG_MAT,
+            UPPER_TRI, CONV, KRON, HSTACK, VSTACK, SCALAR_CONST, DENSE_CONST,
+            SPARSE_CONST, PARAM, NO_OP)
+OPCODES = {op_type: code for code, op_type in enumerate(OP_TYPES)}
+
+
+class LinOp(object):
+    """A linear operator applied to a variable
+    or a constant or function of parameters.
+
+    A compact node: the type is stored as its integer opcode, and the
+    node has no instance dictionary.
+
+    Attributes
+    ----------
+    opcode : int
+        The index of the type in OP_TYPES.
+    size : tuple
+        The (rows, cols) dimensions of the operator.
+    args : list
+        The LinOps the operator is applied to.
+    data : object
+        The type specific data, e.g., a LinOp for the coefficient.
+    """
+    __slots__ = ("opcode", "size", "args", "data")
+    _fields = ("type", "size", "args", "data")
+
+    def __init__(self, type, size, args, data):
+        self.opcode = OPCODES[type]
+        self.size = size
+        self.args = args
+        self.data = data
+
+    @property
+    def type(self):
+        """The type of the operator, e.g., MUL.
+        """
+        return OP_TYPES[self.opcode]
+
+    def _astuple(self):
+        return (self.type, self.size, self.args, self.data)
+
+    def __eq__(self, other):
+        if not isinstance(other, LinOp):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "LinOp(type=%r, size=%r, args=%r, data=%r)" % self._astuple()
+
+    def __getstate__(self):
+        return (self.opcode, self.size, self.args, self.data)
+
+    def __setstate__(self, state):
+        self.opcode, self.size, self.args, self.data = state
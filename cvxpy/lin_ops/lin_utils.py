@@ -18,8 +18,10 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import cvxpy.lin_ops.lin_op as lo
+from collections import namedtuple
 from cvxpy.lin_ops.lin_constraints import LinEqConstr, LinLeqConstr
 import numpy as np
+import scipy.sparse as sp
 
 # Utility functions for dealing with LinOp.
 
@@ -338,6 +340,36 @@ def index(operator, size, keys):
     return lo.LinOp(lo.INDEX, size, [operator], keys)
 
 
+def gather(operator, size, indices):
+    """Selects arbitrary entries of an operator.
+
+    The selection is a single sparse matrix with one non-zero per row,
+    so it is built in time proportional to the number of entries selected.
+
+    Parameters
+    ----------
+    operator : LinOp
+        The expression to select from.
+    size : tuple
+        The size of the selected entries.
+    indices : NDArray
+        The indices of the selected entries in the vectorized operator,
+        in column-major order of the result.
+
+    Returns
+    -------
+    LinOp
+        An operator representing the selection.
+    """
+    length = size[0]*size[1]
+    vec_size = (operator.size[0]*operator.size[1], 1)
+    select = sp.csr_matrix((np.ones(length), indices, np.arange(length + 1)),
+                           (length, vec_size[0]))
+    select = create_const(select, select.shape, sparse=True)
+    vec = reshape(operator, vec_size)
+    return reshape(mul_expr(select, vec, (length, 1)), size)
+
+
 def conv(lh_op, rh_op, size):
     """1D discrete convolution of two vectors.
 
@@ -556,6 +588,61 @@ def create_geq(lh_op, rh_op=None, constr_id=None):
     return create_leq(neg_expr(lh_op), rh_op, constr_id)
 
 
+ExprSummary = namedtuple("ExprSummary", ["vars", "params"])
+
+
+def walk_expr(operator):
+    """Iterates over the nodes of the operator, depth first.
+
+    LinOps stored as the data of another LinOp are visited after its args.
+    The traversal uses an explicit stack, so deep trees do not hit the
+    recursion limit.
+
+    Parameters
+    ----------
+    operator : LinOp
+        The root of the expression.
+
+    Yields
+    ------
+    LinOp
+        The nodes of the expression.
+    """
+    stack = [operator]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node.data, lo.LinOp):
+            stack.append(node.data)
+        stack.extend(reversed(node.args))
+
+
+def get_expr_summary(operator):
+    """Get the variables and parameters in the operator.
+
+    The variables and parameters are collected in a single traversal,
+    so callers that need both should call this function once.
+
+    Parameters
+    ----------
+    operator : LinOp
+        The operator to summarize.
+
+    Returns
+    -------
+    ExprSummary
+        A tuple of (var id, var size) pairs and a tuple of parameters.
+    """
+    vars_ = []
+    params = []
+    for node in walk_expr(operator):
+        if node.type == lo.VARIABLE:
+            vars_.append((node.data, node.size))
+        elif node.type == lo.PARAM:
+            params += node.data.parameters()
+    return ExprSummary(tuple(vars_), tuple(params))
+
+
 def get_expr_vars(operator):
     """Get a list of the variables in the operator and their sizes.
 
@@ -569,13 +656,7 @@ def get_expr_vars(operator):
     list
         A list of (var id, var size) pairs.
     """
-    if operator.type == lo.VARIABLE:
-        return [(operator.data, operator.size)]
-    else:
-        vars_ = []
-        for arg in operator.args:
-            vars_ += get_expr_vars(arg)
-        return vars_
+    return list(get_expr_summary(operator).vars)
 
 
 def get_expr_params(operator):
@@ -591,17 +672,92 @@ def get_expr_params(operator):
     list
         A list of parameter objects.
     """
-    if operator.type == lo.PARAM:
-        return operator.data.parameters()
-    else:
-        params = []
-        for arg in operator.args:
-            params += get_expr_params(arg)
-        # Some LinOps have a param as data.
-        if isinstance(operator.data, lo.LinOp):
-            params += get_expr_params(operator.data)
-        return params
+    return list(get_expr_summary(operator).params)
+
 
+def has_params(operator):
+    """Does the operator contain parameters?
+
+    Parameters
+    ----------
+    operator : LinOp
+        The operator to check.
+
+    Returns
+    -------
+    bool
+        True if any node of the operator is a parameter.
+    """
+    return len(get_expr_summary(operator).params) > 0
+
+
+def get_param_nodes(operator):
+    """Get the parameter nodes in the operator.
+
+    Parameters
+    ----------
+    operator : LinOp
+        The operator to extract the parameter nodes from.
+
+    Returns
+    -------
+    list
+        A list of (parameter node, is coefficient) pairs. A parameter
+        node is a coefficient if it is the data of another LinOp.
+    """
+    nodes = []
+    stack = [(operator, False)]
+    while stack:
+        node, is_coeff = stack.pop()
+        if node.type == lo.PARAM:
+            nodes.append((node, is_coeff))
+            continue
+        if isinstance(node.data, lo.LinOp):
+            stack.append((node.data, True))
+        stack.extend((arg, is_coeff) for arg in reversed(node.args))
+    return nodes
+
+
+def get_param_degree(operator):
+    """Get the degree of the operator as a polynomial in its parameter nodes.
+
+    Parameters
+    ----------
+    operator : LinOp
+        The operator to analyze.
+
+    Returns
+    -------
+    float
+        The polynomial degree, or infinity if the operator divides
+        by a parameter.
+    """
+    # Post-order traversal with an explicit stack, so deep trees do not
+    # hit the recursion limit. The degree of each visited node is pushed
+    # on degrees, after the degrees of its args and data.
+    degrees = []
+    stack = [(operator, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node.type == lo.PARAM:
+            degrees.append(1)
+        elif not expanded:
+            stack.append((node, True))
+            # Some LinOps multiply their argument by their data.
+            if isinstance(node.data, lo.LinOp):
+                stack.append((node.data, False))
+            stack.extend((arg, False) for arg in node.args)
+        else:
+            data_degree = 0
+            if isinstance(node.data, lo.LinOp):
+                data_degree = degrees.pop()
+            degree = 0
+            for _ in node.args:
+                degree = max(degree, degrees.pop())
+            if node.type == lo.DIV and data_degree > 0:
+                degree = np.inf
+            degrees.append(degree + data_degree)
+    return degrees[0]
 
 def copy_constr(constr, func):
     """Creates a copy of the constraint modified according to func.
@@ -680,22 +836,41 @@ def replace_params_with_consts(expr):
     expr : LinOp
         The expression to replace parameters in.
 
+    Returns
+    -------
+    LinOp
+        An LinOp identical to expr, but with the parameters replaced.
+    """
+    return replace_param_nodes(
+        expr,
+        lambda node: create_const(check_param_val(node.data), node.size)
+    )
+
+
+def replace_param_nodes(expr, func):
+    """Replaces the parameter nodes in the expression.
+
+    Parameters
+    ----------
+    expr : LinOp
+        The expression to replace parameters in.
+    func : function
+        Maps a parameter node to the LinOp that replaces it.
+
     Returns
     -------
     LinOp
         An LinOp identical to expr, but with the parameters replaced.
     """
     if expr.type == lo.PARAM:
-        return create_const(check_param_val(expr.data), expr.size)
+        return func(expr)
     else:
         new_args = []
         for arg in expr.args:
-            new_args.append(replace_params_with_consts(arg))
+            new_args.append(replace_param_nodes(arg, func))
         # Data could also be a parameter.
         if isinstance(expr.data, lo.LinOp) and expr.data.type == lo.PARAM:
-            data_lin_op = expr.data
-            val = check_param_val(data_lin_op.data)
-            data = create_const(val, data_lin_op.size)
+            data = func(expr.data)
         else:
             data = expr.data
         return lo.LinOp(expr.type, expr.size, new_args, data)
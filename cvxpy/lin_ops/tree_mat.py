@@ -19,15 +19,37 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 
 import cvxpy.interface as intf
 import cvxpy.lin_ops.lin_op as lo
-import copy
+import cvxpy.lin_ops.lin_utils as lu
+from cvxpy.expressions.leaf import Leaf
 import numpy as np
-from scipy.signal import fftconvolve
+import scipy.sparse as sp
+try:
+    from scipy.fftpack import next_fast_len
+except ImportError:
+    # Added in SciPy 0.18.
+    def next_fast_len(target):
+        """Returns the smallest 5-smooth integer >= target.
+        """
+        if target <= 6:
+            return max(target, 1)
+        best = 2**int(np.ceil(np.log2(target)))
+        p5 = 1
+        while p5 < best:
+            p35 = p5
+            while p35 < best:
+                # Smallest power of two making p35*p2 >= target.
+                quotient = -(-target // p35)
+                p2 = 2**int(np.ceil(np.log2(quotient))) if quotient > 1 else 1
+                best = min(best, p35*p2)
+                p35 *= 3
+            p5 *= 5
+        return best
 
 # Utility functions for treating an expression tree as a matrix
 # and multiplying by it and it's transpose.
 
 
-def mul(lin_op, val_dict, is_abs=False):
+def mul(lin_op, val_dict, is_abs=False, cache=None):
     """Multiply the expression tree by a vector.
 
     Parameters
@@ -38,12 +60,16 @@ def mul(lin_op, val_dict, is_abs=False):
         A map of variable id to value.
     is_abs : bool, optional
         Multiply by the absolute value of the matrix?
+    cache : CoeffCache, optional
+        The evaluated coefficients of the operators.
 
     Returns
     -------
     NumPy matrix
         The result of the multiplication.
     """
+    if cache is None:
+        cache = CoeffCache()
     # Look up the value for a variable.
     if lin_op.type is lo.VARIABLE:
         if lin_op.data in val_dict:
@@ -61,14 +87,14 @@ def mul(lin_op, val_dict, is_abs=False):
     else:
         eval_args = []
         for arg in lin_op.args:
-            eval_args.append(mul(arg, val_dict, is_abs))
+            eval_args.append(mul(arg, val_dict, is_abs, cache))
         if is_abs:
-            return op_abs_mul(lin_op, eval_args)
+            return op_abs_mul(lin_op, eval_args, cache)
         else:
-            return op_mul(lin_op, eval_args)
+            return op_mul(lin_op, eval_args, cache)
 
 
-def tmul(lin_op, value, is_abs=False):
+def tmul(lin_op, value, is_abs=False, cache=None):
     """Multiply the transpose of the expression tree by a vector.
 
     Parameters
@@ -79,12 +105,16 @@ def tmul(lin_op, value, is_abs=False):
         The vector to multiply by.
     is_abs : bool, optional
         Multiply by the absolute value of the matrix?
+    cache : CoeffCache, optional
+        The evaluated coefficients of the operators.
 
     Returns
     -------
     dict
         A map of variable id to value.
     """
+    if cache is None:
+        cache = CoeffCache()
     # Store the value as the variable.
     if lin_op.type is lo.VARIABLE:
         return {lin_op.data: value}
@@ -93,12 +123,12 @@ def tmul(lin_op, value, is_abs=False):
         return {}
     else:
         if is_abs:
-            result = op_abs_tmul(lin_op, value)
+            result = op_abs_tmul(lin_op, value, cache)
         else:
-            result = op_tmul(lin_op, value)
+            result = op_tmul(lin_op, value, cache)
         result_dicts = []
         for arg in lin_op.args:
-            result_dicts.append(tmul(arg, result, is_abs))
+            result_dicts.append(tmul(arg, result, is_abs, cache))
         # Sum repeated ids.
         return sum_dicts(result_dicts)
 
@@ -127,7 +157,7 @@ def sum_dicts(dicts):
     return sum_dict
 
 
-def op_mul(lin_op, args):
+def op_mul(lin_op, args, cache=None):
     """Applies the linear operator to the arguments.
 
     Parameters
@@ -136,6 +166,8 @@ def op_mul(lin_op, args):
         A linear operator.
     args : list
         The arguments to the operator.
+    cache : CoeffCache, optional
+        The evaluated coefficients of the operators.
 
     Returns
     -------
@@ -145,6 +177,8 @@ def op_mul(lin_op, args):
     # Constants convert directly to their value.
     if lin_op.type in [lo.SCALAR_CONST, lo.DENSE_CONST, lo.SPARSE_CONST]:
         result = lin_op.data
+    elif lin_op.type is lo.PARAM:
+        result = lin_op.data.value
     # No-op is not evaluated.
     elif lin_op.type is lo.NO_OP:
         return None
@@ -154,10 +188,10 @@ def op_mul(lin_op, args):
     elif lin_op.type is lo.NEG:
         result = -args[0]
     elif lin_op.type is lo.MUL:
-        coeff = mul(lin_op.data, {})
+        coeff = get_coeff(lin_op, cache=cache)
         result = coeff*args[0]
     elif lin_op.type is lo.DIV:
-        divisor = mul(lin_op.data, {})
+        divisor = get_coeff(lin_op, cache=cache)
         result = args[0]/divisor
     elif lin_op.type is lo.SUM_ENTRIES:
         result = np.sum(args[0])
@@ -166,8 +200,10 @@ def op_mul(lin_op, args):
         result = args[0][row_slc, col_slc]
     elif lin_op.type is lo.TRANSPOSE:
         result = args[0].T
+    elif lin_op.type is lo.RESHAPE:
+        result = np.reshape(args[0], lin_op.size, order='F')
     elif lin_op.type is lo.CONV:
-        result = conv_mul(lin_op, args[0])
+        result = conv_mul(lin_op, args[0], cache=cache)
     elif lin_op.type is lo.PROMOTE:
         result = np.ones(lin_op.size)*args[0]
     elif lin_op.type is lo.DIAG_VEC:
@@ -178,7 +214,7 @@ def op_mul(lin_op, args):
     return result
 
 
-def op_abs_mul(lin_op, args):
+def op_abs_mul(lin_op, args, cache=None):
     """Applies the absolute value of the linear operator to the arguments.
 
     Parameters
@@ -187,6 +223,8 @@ def op_abs_mul(lin_op, args):
         A linear operator.
     args : list
         The arguments to the operator.
+    cache : CoeffCache, optional
+        The evaluated coefficients of the operators.
 
     Returns
     -------
@@ -196,23 +234,25 @@ def op_abs_mul(lin_op, args):
     # Constants convert directly to their absolute value.
     if lin_op.type in [lo.SCALAR_CONST, lo.DENSE_CONST, lo.SPARSE_CONST]:
         result = np.abs(lin_op.data)
+    elif lin_op.type is lo.PARAM:
+        result = np.abs(lin_op.data.value)
     elif lin_op.type is lo.NEG:
         result = args[0]
     # Absolute value of coefficient.
     elif lin_op.type is lo.MUL:
-        coeff = mul(lin_op.data, {}, True)
+        coeff = get_coeff(lin_op, True, cache=cache)
         result = coeff*args[0]
     elif lin_op.type is lo.DIV:
-        divisor = mul(lin_op.data, {}, True)
+        divisor = get_coeff(lin_op, True, cache=cache)
         result = args[0]/divisor
     elif lin_op.type is lo.CONV:
-        result = conv_mul(lin_op, args[0], is_abs=True)
+        result = conv_mul(lin_op, args[0], is_abs=True, cache=cache)
     else:
-        result = op_mul(lin_op, args)
+        result = op_mul(lin_op, args, cache)
     return result
 
 
-def op_tmul(lin_op, value):
+def op_tmul(lin_op, value, cache=None):
     """Applies the transpose of the linear operator to the arguments.
 
     Parameters
@@ -221,6 +261,8 @@ def op_tmul(lin_op, value):
         A linear operator.
     value : NumPy matrix
         A numeric value to apply the operator's transpose to.
+    cache : CoeffCache, optional
+        The evaluated coefficients of the operators.
 
     Returns
     -------
@@ -232,14 +274,9 @@ def op_tmul(lin_op, value):
     elif lin_op.type is lo.NEG:
         result = -value
     elif lin_op.type is lo.MUL:
-        coeff = mul(lin_op.data, {})
-        # Scalar coefficient, no need to transpose.
-        if np.isscalar(coeff):
-            result = coeff*value
-        else:
-            result = coeff.T*value
+        result = get_coeff(lin_op, transpose=True, cache=cache)*value
     elif lin_op.type is lo.DIV:
-        divisor = mul(lin_op.data, {})
+        divisor = get_coeff(lin_op, cache=cache)
         result = value/divisor
     elif lin_op.type is lo.SUM_ENTRIES:
         result = np.mat(np.ones(lin_op.args[0].size))*value
@@ -249,6 +286,8 @@ def op_tmul(lin_op, value):
         result[row_slc, col_slc] = value
     elif lin_op.type is lo.TRANSPOSE:
         result = value.T
+    elif lin_op.type is lo.RESHAPE:
+        result = np.reshape(value, lin_op.args[0].size, order='F')
     elif lin_op.type is lo.PROMOTE:
         result = np.ones(lin_op.size[0]).dot(value)
     elif lin_op.type is lo.DIAG_VEC:
@@ -257,13 +296,13 @@ def op_tmul(lin_op, value):
         if isinstance(result, np.matrix):
             result = result.A[0]
     elif lin_op.type is lo.CONV:
-        result = conv_mul(lin_op, value, transpose=True)
+        result = conv_mul(lin_op, value, transpose=True, cache=cache)
     else:
         raise Exception("Unknown linear operator.")
     return result
 
 
-def op_abs_tmul(lin_op, value):
+def op_abs_tmul(lin_op, value, cache=None):
     """Applies the linear operator |A.T| to the arguments.
 
     Parameters
@@ -272,6 +311,8 @@ def op_abs_tmul(lin_op, value):
         A linear operator.
     value : NumPy matrix
         A numeric value to apply the operator's transpose to.
+    cache : CoeffCache, optional
+        The evaluated coefficients of the operators.
 
     Returns
     -------
@@ -282,54 +323,217 @@ def op_abs_tmul(lin_op, value):
         result = value
     # Absolute value of coefficient.
     elif lin_op.type is lo.MUL:
-        coeff = mul(lin_op.data, {}, True)
-        # Scalar coefficient, no need to transpose.
-        if np.isscalar(coeff):
-            result = coeff*value
-        else:
-            result = coeff.T*value
+        result = get_coeff(lin_op, True, True, cache)*value
     elif lin_op.type is lo.DIV:
-        divisor = mul(lin_op.data, {}, True)
+        divisor = get_coeff(lin_op, True, cache=cache)
         result = value/divisor
     elif lin_op.type is lo.CONV:
-        result = conv_mul(lin_op, value, True, True)
+        result = conv_mul(lin_op, value, True, True, cache)
     else:
-        result = op_tmul(lin_op, value)
+        result = op_tmul(lin_op, value, cache)
     return result
 
 
-def conv_mul(lin_op, rh_val, transpose=False, is_abs=False):
+def get_coeff(lin_op, is_abs=False, transpose=False, cache=None):
+    """Returns the evaluated coefficient of a MUL, DIV or CONV operator.
+
+    Parameters
+    ----------
+    lin_op : LinOp
+        A MUL, DIV or CONV operator.
+    is_abs : bool, optional
+        Return the absolute value of the coefficient?
+    transpose : bool, optional
+        Return the coefficient for the transpose of the operator?
+    cache : CoeffCache, optional
+        The cache to look the coefficient up in.
+
+    Returns
+    -------
+    NumPy matrix, SciPy sparse matrix, or scalar
+        The coefficient.
+    """
+    if cache is None:
+        cache = CoeffCache()
+    forms = cache.get_forms(lin_op, is_abs)
+    if transpose not in forms:
+        coeff = forms[False]
+        # Scalar coefficient, no need to transpose.
+        if np.isscalar(coeff):
+            forms[True] = coeff
+        elif sp.issparse(coeff):
+            forms[True] = coeff.T.tocsr()
+        else:
+            forms[True] = coeff.T
+    return forms[transpose]
+
+
+def get_conv_kernel(lin_op, is_abs=False, cache=None):
+    """Returns the spectrum of the kernel of a CONV operator.
+
+    Parameters
+    ----------
+    lin_op : LinOp
+        A CONV operator.
+    is_abs : bool, optional
+        Use the absolute value of the kernel?
+    cache : CoeffCache, optional
+        The cache to look the kernel up in.
+
+    Returns
+    -------
+    ConvKernel
+        The kernel padded for the argument of the operator.
+    """
+    if cache is None:
+        cache = CoeffCache()
+    forms = cache.get_forms(lin_op, is_abs)
+    # The padding depends on the argument, which may differ between
+    # operators that share a kernel.
+    arg_len = lin_op.args[0].size[0]
+    key = (lo.CONV, arg_len)
+    if key not in forms:
+        forms[key] = ConvKernel(forms[False], arg_len)
+    return forms[key]
+
+
+class CoeffCache(object):
+    """The evaluated coefficients of the MUL, DIV and CONV operators.
+
+    A cache belongs to the caller that multiplies by a set of expression
+    trees, e.g., a MulPlan, and is dropped along with it. The coefficients
+    of an operator are evaluated again once the value of a variable or
+    parameter changes, as tracked by Leaf.VALUE_VERSION.
+    """
+
+    def __init__(self):
+        # Map of (id of coefficient LinOp, is_abs) to (coefficient LinOp,
+        # version or None if constant, forms). The entry keeps the LinOp
+        # alive, so its id is not reused while the cache exists.
+        self._entries = {}
+
+    def get_forms(self, lin_op, is_abs):
+        """Returns the evaluated forms of the coefficient of an operator.
+
+        Parameters
+        ----------
+        lin_op : LinOp
+            A MUL, DIV or CONV operator.
+        is_abs : bool
+            Use the absolute value of the coefficient?
+
+        Returns
+        -------
+        dict
+            A map of form to value. False and True map to the coefficient
+            and its transpose, and (lo.CONV, argument length) to its
+            ConvKernel.
+        """
+        data = lin_op.data
+        key = (id(data), is_abs)
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] in (None, Leaf.VALUE_VERSION):
+            return entry[2]
+        version = Leaf.VALUE_VERSION if lu.has_params(data) else None
+        forms = {False: mul(data, {}, is_abs, self)}
+        self._entries[key] = (data, version, forms)
+        return forms
+
+
+def conv_mul(lin_op, rh_val, transpose=False, is_abs=False, cache=None):
     """Multiply by a convolution operator.
 
-    arameters
+    Parameters
     ----------
     lin_op : LinOp
         The root linear operator.
     rh_val : NDArray
-        The vector being convolved.
+        The vector being convolved, or a batch of vectors as columns.
     transpose : bool
         Is the transpose of convolution being applied?
     is_abs : bool
         Is the absolute value of convolution being applied?
+    cache : CoeffCache, optional
+        The cache to look the kernel up in.
 
     Returns
     -------
     NumPy NDArray
         The convolution.
     """
-    constant = mul(lin_op.data, {}, is_abs)
-    # Convert to 2D
-    constant, rh_val = map(intf.from_1D_to_2D, [constant, rh_val])
+    kernel = get_conv_kernel(lin_op, is_abs, cache)
     if transpose:
-        constant = np.flipud(constant)
-        # rh_val always larger than constant.
-        return fftconvolve(rh_val, constant, mode='valid')
+        return kernel.tmul(rh_val)
     else:
-        # First argument must be larger.
-        if constant.size >= rh_val.size:
-            return fftconvolve(constant, rh_val, mode='full')
-        else:
-            return fftconvolve(rh_val, constant, mode='full')
+        return kernel.mul(rh_val)
+
+
+class ConvKernel(object):
+    """The spectrum of a convolution kernel at a fixed padded size.
+
+    The full convolution of the kernel with a vector of length n and the
+    valid correlation (the transpose) of the kernel with a vector of length
+    n + k - 1 both fit in a transform of length n + k - 1 without wrapping
+    around, so each product is a single rfft/irfft pair.
+
+    Attributes
+    ----------
+    kernel_len : int
+        The length k of the kernel.
+    arg_len : int
+        The length n of the vector being convolved.
+    fft_len : int
+        The padded transform length.
+    spectrum : NDArray
+        The real FFT of the kernel at fft_len.
+    """
+
+    def __init__(self, kernel, arg_len):
+        kernel = np.asarray(kernel, dtype=float).ravel()
+        self.kernel_len = kernel.size
+        self.arg_len = arg_len
+        self.fft_len = next_fast_len(self.kernel_len + arg_len - 1)
+        self.spectrum = np.fft.rfft(kernel, self.fft_len)
+        self._adjoint = self.spectrum.conj()
+
+    def mul(self, rh_val):
+        """Convolves the kernel with rh_val.
+
+        Parameters
+        ----------
+        rh_val : NDArray
+            A vector of length n or an n by batch array.
+
+        Returns
+        -------
+        NDArray
+            A (n + k - 1) by 1 or by batch array.
+        """
+        out_len = self.kernel_len + self.arg_len - 1
+        return self._apply(self.spectrum, rh_val, out_len)
+
+    def tmul(self, rh_val):
+        """Correlates the kernel with rh_val.
+
+        Parameters
+        ----------
+        rh_val : NDArray
+            A vector of length n + k - 1 or an (n + k - 1) by batch array.
+
+        Returns
+        -------
+        NDArray
+            An n by 1 or by batch array.
+        """
+        return self._apply(self._adjoint, rh_val, self.arg_len)
+
+    def _apply(self, spectrum, rh_val, out_len):
+        rh_val = np.asarray(rh_val, dtype=float)
+        if rh_val.ndim < 2:
+            rh_val = rh_val.reshape((-1, 1))
+        rh_fft = np.fft.rfft(rh_val, self.fft_len, axis=0)
+        rh_fft *= spectrum[:, None]
+        return np.fft.irfft(rh_fft, self.fft_len, axis=0)[:out_len]
 
 
 def get_constant(lin_op):
@@ -371,6 +575,9 @@ def get_constr_constant(constraints):
 def prune_constants(constraints):
     """Returns a new list of constraints with constant terms removed.
 
+    The constraints are not modified. Subtrees without constant branches
+    and all the constant data are shared with the original constraints.
+
     Parameters
     ----------
     constraints : list
@@ -384,18 +591,19 @@ def prune_constants(constraints):
     pruned_constraints = []
     for constr in constraints:
         constr_type = type(constr)
-        expr = copy.deepcopy(constr.expr)
-        is_constant = prune_expr(expr)
+        expr = prune_expr(constr.expr)
         # Replace a constant root with a NO_OP.
-        if is_constant:
-            expr = lo.LinOp(lo.NO_OP, expr.size, [], None)
+        if expr is None:
+            expr = lo.LinOp(lo.NO_OP, constr.expr.size, [], None)
         pruned = constr_type(expr, constr.constr_id, constr.size)
         pruned_constraints.append(pruned)
     return pruned_constraints
 
 
 def prune_expr(lin_op):
-    """Prunes constant branches from the expression.
+    """Returns the expression with its constant branches removed.
+
+    Only the nodes on a path to a removed branch are rebuilt.
 
     Parameters
     ----------
@@ -404,24 +612,34 @@ def prune_expr(lin_op):
 
     Returns
     -------
-    bool
-        Were all the expression's arguments pruned?
+    LinOp
+        The pruned expression, or None if the whole expression is constant.
     """
-    if lin_op.type is lo.VARIABLE:
-        return False
-    elif lin_op.type in [lo.SCALAR_CONST,
-                         lo.DENSE_CONST,
-                         lo.SPARSE_CONST,
-                         lo.PARAM]:
-        return True
-
-    pruned_args = []
-    is_constant = True
-    for arg in lin_op.args:
-        arg_constant = prune_expr(arg)
-        if not arg_constant:
-            is_constant = False
-            pruned_args.append(arg)
-    # Overwrite old args with only non-constant args.
-    lin_op.args[:] = pruned_args[:]
-    return is_constant
+    # Map of id(LinOp) to the pruned LinOp, or None if it is constant.
+    pruned = {}
+    stack = [(lin_op, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in pruned:
+            continue
+        if node.type is lo.VARIABLE:
+            pruned[id(node)] = node
+        elif node.type in [lo.SCALAR_CONST,
+                           lo.DENSE_CONST,
+                           lo.SPARSE_CONST,
+                           lo.PARAM]:
+            pruned[id(node)] = None
+        elif not expanded:
+            stack.append((node, True))
+            stack.extend((arg, False) for arg in node.args)
+        else:
+            args = [pruned[id(arg)] for arg in node.args]
+            new_args = [arg for arg in args if arg is not None]
+            if len(new_args) == 0:
+                pruned[id(node)] = None
+            elif all(new is old for new, old in zip(args, node.args)):
+                pruned[id(node)] = node
+            else:
+                pruned[id(node)] = lo.LinOp(node.type, node.size,
+                                            new_args, node.data)
+    return pruned[id(lin_op)]
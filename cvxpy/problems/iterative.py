@@ -19,150 +19,341 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 
 # Methods for SCS iterative solver.
 
-from cvxpy.lin_ops.tree_mat import mul, tmul, sum_dicts
+import cvxpy.lin_ops.lin_op as lo
+from cvxpy.lin_ops.tree_mat import (mul, get_coeff, get_conv_kernel,
+                                    CoeffCache)
 import numpy as np
+import scipy.sparse as sp
 
 
 def get_mul_funcs(sym_data):
+    plan = MulPlan(sym_data.constraints, sym_data.var_offsets,
+                   sym_data.var_sizes)
 
     def accAmul(x, y, is_abs=False):
         # y += A*x
-        rows = y.shape[0]
-        var_dict = vec_to_dict(x, sym_data.var_offsets,
-                               sym_data.var_sizes)
-        y += constr_mul(sym_data.constraints, var_dict, rows, is_abs)
+        plan.mul(x, y, is_abs)
 
     def accATmul(x, y, is_abs=False):
         # y += A.T*x
-        terms = constr_unpack(sym_data.constraints, x)
-        val_dict = constr_tmul(sym_data.constraints, terms, is_abs)
-        y += dict_to_vec(val_dict, sym_data.var_offsets,
-                         sym_data.var_sizes, sym_data.x_length)
+        plan.tmul(x, y, is_abs)
 
     return (accAmul, accATmul)
 
 
-def constr_unpack(constraints, vector):
-    """Unpacks a vector into a list of values for constraints.
-    """
-    values = []
-    offset = 0
-    for constr in constraints:
-        rows, cols = constr.size
-        val = np.zeros((rows, cols))
-        for col in range(cols):
-            val[:, col] = vector[offset:offset+rows]
-            offset += rows
-        values.append(val)
-    return values
-
+class MulPlan(object):
+    """A compiled plan for multiplying by the constraints matrix.
 
-def vec_to_dict(vector, var_offsets, var_sizes):
-    """Converts a vector to a map of variable id to value.
+    The LinOp trees of the constraints are flattened once into a list of
+    kernels that read and write a fixed list of registers, so a product
+    is a loop over the kernels with no recursion and no dicts. The
+    coefficients of the operators are evaluated when the plan is compiled.
 
     Parameters
     ----------
-    vector : NumPy matrix
-        The vector of values.
+    constraints : list
+        A list of linear constraints, with the constant terms pruned.
     var_offsets : dict
         A map of variable id to offset in the vector.
     var_sizes : dict
         A map of variable id to variable size.
-
-    Returns
-    -------
-    dict
-        A map of variable id to variable value.
     """
-    val_dict = {}
-    for id_, offset in var_offsets.items():
-        size = var_sizes[id_]
-        value = np.zeros(size)
-        offset = var_offsets[id_]
-        for col in range(size[1]):
-            value[:, col] = vector[offset:size[0]+offset]
-            offset += size[0]
-        val_dict[id_] = value
-    return val_dict
 
+    def __init__(self, constraints, var_offsets, var_sizes):
+        self.constraints = constraints
+        self.var_offsets = var_offsets
+        self.var_sizes = var_sizes
+        self.constr_offsets = []
+        offset = 0
+        for constr in constraints:
+            self.constr_offsets.append(offset)
+            offset += constr.size[0]*constr.size[1]
+        # Compiled plans for A and |A|, keyed on is_abs.
+        self._mul_plans = {}
+        self._tmul_plans = {}
+        # The coefficients shared by the plans.
+        self._coeffs = CoeffCache()
 
-def dict_to_vec(val_dict, var_offsets, var_sizes, vec_len):
-    """Converts a map of variable id to value to a vector.
+    def mul(self, x, y, is_abs=False):
+        """Adds A*x to y.
 
-    Parameters
-    ----------
-    val_dict : dict
-        A map of variable id to value.
-    var_offsets : dict
-        A map of variable id to offset in the vector.
-    var_sizes : dict
-        A map of variable id to variable size.
-    vector : NumPy matrix
-        The vector to store the values in.
+        Parameters
+        ----------
+        x : NumPy array
+            The vector to multiply.
+        y : NumPy array
+            The vector the product is added to.
+        is_abs : bool, optional
+            Multiply by the absolute value of the matrix (and of x)?
+        """
+        if is_abs not in self._mul_plans:
+            self._mul_plans[is_abs] = self._compile_mul(is_abs)
+        inputs, steps, outputs, regs = self._mul_plans[is_abs]
+        for reg, offset, size in inputs:
+            value = _view(x, offset, size)
+            regs[reg] = np.abs(value) if is_abs else value
+        for reg, kernel in steps:
+            regs[reg] = kernel(regs)
+        for reg, offset, size in outputs:
+            view = _view(y, offset, size)
+            view += regs[reg]
+
+    def tmul(self, x, y, is_abs=False):
+        """Adds A.T*x to y.
+
+        Parameters
+        ----------
+        x : NumPy array
+            The vector to multiply.
+        y : NumPy array
+            The vector the product is added to.
+        is_abs : bool, optional
+            Multiply by the absolute value of the matrix?
+        """
+        if is_abs not in self._tmul_plans:
+            self._tmul_plans[is_abs] = self._compile_tmul(is_abs)
+        inputs, steps, outputs, regs = self._tmul_plans[is_abs]
+        for reg, offset, size in inputs:
+            regs[reg] = _view(x, offset, size)
+        for reg, kernel in steps:
+            regs[reg] = kernel(regs)
+        for reg, offset, size in outputs:
+            view = _view(y, offset, size)
+            view += regs[reg]
+
+    def _compile_mul(self, is_abs):
+        """Flattens the constraints into kernels for A*x.
+
+        Shared subtrees are evaluated once.
+
+        Returns
+        -------
+        tuple
+            (inputs, steps, outputs, registers)
+        """
+        inputs = []
+        steps = []
+        outputs = []
+        node_regs = {}
+        var_regs = {}
+        num_regs = 0
+        for constr, constr_offset in zip(self.constraints,
+                                         self.constr_offsets):
+            # Post-order traversal of the expression tree.
+            stack = [(constr.expr, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if id(node) in node_regs:
+                    continue
+                if node.type is lo.VARIABLE and node.data in var_regs:
+                    node_regs[id(node)] = var_regs[node.data]
+                elif node.type is lo.VARIABLE and node.data in self.var_offsets:
+                    var_regs[node.data] = num_regs
+                    node_regs[id(node)] = num_regs
+                    inputs.append((num_regs, self.var_offsets[node.data],
+                                   self.var_sizes[node.data]))
+                    num_regs += 1
+                elif expanded or not node.args:
+                    arg_regs = [node_regs[id(arg)] for arg in node.args]
+                    steps.append((num_regs,
+                                  _mul_kernel(node, arg_regs, is_abs,
+                                              self._coeffs)))
+                    node_regs[id(node)] = num_regs
+                    num_regs += 1
+                else:
+                    stack.append((node, True))
+                    for arg in reversed(node.args):
+                        stack.append((arg, False))
+            outputs.append((node_regs[id(constr.expr)], constr_offset,
+                            constr.size))
+        return (inputs, steps, outputs, [None]*num_regs)
+
+    def _compile_tmul(self, is_abs):
+        """Flattens the constraints into kernels for A.T*x.
+
+        Returns
+        -------
+        tuple
+            (inputs, steps, outputs, registers)
+        """
+        inputs = []
+        steps = []
+        outputs = []
+        num_regs = 0
+        for constr, constr_offset in zip(self.constraints,
+                                         self.constr_offsets):
+            inputs.append((num_regs, constr_offset, constr.size))
+            # Pre-order traversal with the register holding the value
+            # passed down to each node.
+            stack = [(constr.expr, num_regs)]
+            num_regs += 1
+            while stack:
+                node, in_reg = stack.pop()
+                if node.type is lo.VARIABLE:
+                    if node.data in self.var_offsets:
+                        outputs.append((in_reg, self.var_offsets[node.data],
+                                        self.var_sizes[node.data]))
+                    continue
+                # Constants and NO_OPs have no variables.
+                elif not node.args:
+                    continue
+                kernel = _tmul_kernel(node, in_reg, is_abs, self._coeffs)
+                if kernel is None:
+                    out_reg = in_reg
+                else:
+                    out_reg = num_regs
+                    steps.append((out_reg, kernel))
+                    num_regs += 1
+                for arg in reversed(node.args):
+                    stack.append((arg, out_reg))
+        return (inputs, steps, outputs, [None]*num_regs)
+
+
+def _view(vector, offset, size):
+    """Returns a column-major view of part of a vector as a 2D array.
+    """
+    rows, cols = size
+    return vector[offset:offset + rows*cols].reshape((rows, cols), order='F')
+
+
+def _as_array(coeff):
+    """Converts a coefficient into a NumPy array, CSR matrix or scalar.
     """
-    # TODO take in vector.
-    vector = np.zeros(vec_len)
-    for id_, value in val_dict.items():
-        size = var_sizes[id_]
-        offset = var_offsets[id_]
-        for col in range(size[1]):
-            # Handle scalars separately.
-            if np.isscalar(value):
-                vector[offset:size[0]+offset] = value
-            else:
-                vector[offset:size[0]+offset] = np.squeeze(value[:, col])
-            offset += size[0]
-    return vector
-
-
-def constr_mul(constraints, var_dict, vec_size, is_abs):
-    """Multiplies a vector by the matrix implied by the constraints.
+    if sp.issparse(coeff):
+        return coeff.tocsr()
+    elif np.isscalar(coeff):
+        return coeff
+    return np.asarray(coeff)
+
+
+def _mul_kernel(lin_op, arg_regs, is_abs, cache):
+    """Returns a function that applies an operator to its argument registers.
 
     Parameters
     ----------
-    constraints : list
-        A list of linear constraints.
-    var_dict : dict
-        A dictionary mapping variable id to value.
-    vec_size : int
-        The length of the product vector.
+    lin_op : LinOp
+        A linear operator.
+    arg_regs : list
+        The registers holding the values of the arguments.
     is_abs : bool
-        Multiply by the absolute value of the matrix?
+        Apply the absolute value of the operator?
+    cache : CoeffCache
+        The evaluated coefficients of the operators.
+
+    Returns
+    -------
+    function
+        A function of the registers.
     """
-    product = np.zeros(vec_size)
-    offset = 0
-    for constr in constraints:
-        result = mul(constr.expr, var_dict, is_abs)
-        rows, cols = constr.size
-        for col in range(cols):
-            # Handle scalars separately.
-            if np.isscalar(result):
-                product[offset:offset+rows] = result
-            else:
-                product[offset:offset+rows] = np.squeeze(result[:, col])
-            offset += rows
+    if lin_op.type in [lo.SCALAR_CONST, lo.DENSE_CONST, lo.SPARSE_CONST]:
+        value = _as_array(mul(lin_op, {}, is_abs, cache))
+        if sp.issparse(value):
+            value = value.toarray()
+        return lambda regs: value
+    # Variables without an offset default to zero.
+    elif lin_op.type in [lo.NO_OP, lo.VARIABLE]:
+        zeros = np.zeros(lin_op.size)
+        return lambda regs: zeros
+    elif lin_op.type is lo.SUM:
+        def sum_kernel(regs):
+            result = regs[arg_regs[0]]
+            for reg in arg_regs[1:]:
+                result = result + regs[reg]
+            return result
+        return sum_kernel
 
-    return product
+    arg = arg_regs[0] if arg_regs else None
+    if lin_op.type is lo.NEG:
+        if is_abs:
+            return lambda regs: regs[arg]
+        return lambda regs: -regs[arg]
+    elif lin_op.type is lo.MUL:
+        coeff = _as_array(get_coeff(lin_op, is_abs, cache=cache))
+        if np.isscalar(coeff):
+            return lambda regs: coeff*regs[arg]
+        return lambda regs: coeff.dot(regs[arg])
+    elif lin_op.type is lo.DIV:
+        divisor = _as_array(get_coeff(lin_op, is_abs, cache=cache))
+        return lambda regs: regs[arg]/divisor
+    elif lin_op.type is lo.SUM_ENTRIES:
+        return lambda regs: regs[arg].sum(keepdims=True)
+    elif lin_op.type is lo.INDEX:
+        row_slc, col_slc = lin_op.data
+        return lambda regs: regs[arg][row_slc, col_slc]
+    elif lin_op.type is lo.TRANSPOSE:
+        return lambda regs: regs[arg].T
+    elif lin_op.type is lo.RESHAPE:
+        return lambda regs: regs[arg].reshape(lin_op.size, order='F')
+    elif lin_op.type is lo.CONV:
+        kernel = get_conv_kernel(lin_op, is_abs, cache)
+        return lambda regs: kernel.mul(regs[arg])
+    elif lin_op.type is lo.PROMOTE:
+        ones = np.ones(lin_op.size)
+        return lambda regs: ones*regs[arg]
+    elif lin_op.type is lo.DIAG_VEC:
+        return lambda regs: np.diag(regs[arg].ravel())
+    else:
+        raise Exception("Unknown linear operator.")
 
 
-def constr_tmul(constraints, values, is_abs):
-    """Multiplies a vector by the transpose of the constraints matrix.
+def _tmul_kernel(lin_op, in_reg, is_abs, cache):
+    """Returns a function that applies an operator's transpose to a register.
 
     Parameters
     ----------
-    constraints : list
-        A list of linear constraints.
-    values : list
-        A list of NumPy matrices.
+    lin_op : LinOp
+        A linear operator.
+    in_reg : int
+        The register holding the value to apply the transpose to.
     is_abs : bool
-        Multiply by the absolute value of the matrix?
+        Apply the absolute value of the operator?
+    cache : CoeffCache
+        The evaluated coefficients of the operators.
 
     Returns
     -------
-    dict
-        A mapping of variable id to value.
+    function or None
+        A function of the registers, or None if the operator's transpose
+        is the identity.
     """
-    products = []
-    for constr, val in zip(constraints, values):
-        products.append(tmul(constr.expr, val, is_abs))
-    return sum_dicts(products)
+    if lin_op.type is lo.SUM:
+        return None
+    elif lin_op.type is lo.NEG:
+        if is_abs:
+            return None
+        return lambda regs: -regs[in_reg]
+    elif lin_op.type is lo.MUL:
+        coeff_t = _as_array(get_coeff(lin_op, is_abs, True, cache))
+        # Scalar coefficient, no need to transpose.
+        if np.isscalar(coeff_t):
+            return lambda regs: coeff_t*regs[in_reg]
+        return lambda regs: coeff_t.dot(regs[in_reg])
+    elif lin_op.type is lo.DIV:
+        divisor = _as_array(get_coeff(lin_op, is_abs, cache=cache))
+        return lambda regs: regs[in_reg]/divisor
+    elif lin_op.type is lo.SUM_ENTRIES:
+        ones = np.ones(lin_op.args[0].size)
+        return lambda regs: ones*regs[in_reg]
+    elif lin_op.type is lo.INDEX:
+        row_slc, col_slc = lin_op.data
+        # Only the indexed entries of the buffer are ever written.
+        buf = np.zeros(lin_op.args[0].size)
+
+        def index_kernel(regs):
+            buf[row_slc, col_slc] = regs[in_reg]
+            return buf
+        return index_kernel
+    elif lin_op.type is lo.TRANSPOSE:
+        return lambda regs: regs[in_reg].T
+    elif lin_op.type is lo.RESHAPE:
+        arg_size = lin_op.args[0].size
+        return lambda regs: regs[in_reg].reshape(arg_size, order='F')
+    elif lin_op.type is lo.PROMOTE:
+        return lambda regs: regs[in_reg].sum(keepdims=True)
+    elif lin_op.type is lo.DIAG_VEC:
+        return lambda regs: np.diag(regs[in_reg])[:, None]
+    elif lin_op.type is lo.CONV:
+        kernel = get_conv_kernel(lin_op, is_abs, cache)
+        return lambda regs: kernel.tmul(regs[in_reg])
+    else:
+        raise Exception("Unknown linear operator.")
@@ -93,7 +93,12 @@ class Minimize(u.Canonical):
     def canonicalize(self):
         """Pass on the target expression's objective and constraints.
         """
-        return self.args[0].canonical_form
+        return (self.canonical_node[0], u.canonical_constraints([self]))
+
+    def canonicalize_node(self):
+        """Pass on the target expression's objective.
+        """
+        return (self.args[0].canonical_node[0], [], [self.args[0]])
 
     def variables(self):
         """Returns the variables in the objective.
@@ -146,11 +151,11 @@ class Maximize(Minimize):
         else:
             raise Exception("Problem does not follow DCP rules.")
 
-    def canonicalize(self):
+    def canonicalize_node(self):
         """Negates the target expression's objective.
         """
-        obj, constraints = super(Maximize, self).canonicalize()
-        return (lu.neg_expr(obj), constraints)
+        obj, constraints, children = super(Maximize, self).canonicalize_node()
+        return (lu.neg_expr(obj), constraints, children)
 
     def is_dcp(self):
         """The objective must be concave.
@@ -22,6 +22,7 @@ import cvxpy.utilities as u
 import cvxpy.interface as intf
 from cvxpy.error import SolverError, DCPError
 from cvxpy.constraints import EqConstraint, LeqConstraint, PSDConstraint
+from cvxpy.expressions.leaf import Leaf
 from cvxpy.problems.objective import Minimize, Maximize
 from cvxpy.problems.solvers.solver import Solver
 from cvxpy.problems.solvers.utilities import SOLVERS
@@ -33,16 +34,22 @@ import cvxpy
 
 import multiprocess as multiprocessing
 import numpy as np
-from collections import namedtuple
+import scipy.sparse as sp
+import weakref
+from collections import namedtuple, OrderedDict
 
-# Used in self._cached_data to check if problem's objective or constraints have
-# changed.
-CachedProblem = namedtuple('CachedProblem', ['objective', 'constraints'])
+# Used in self._leaf_cache to check if the problem's objective or constraints
+# have changed.
+LeafCache = namedtuple('LeafCache', ['objective', 'constraints', 'leaves'])
 
 # Used by pool.map to send solve result back.
 SolveResult = namedtuple(
     'SolveResult', ['opt_value', 'status', 'primal_values', 'dual_values'])
 
+# Returned by Problem.solve_batch.
+BatchResult = namedtuple(
+    'BatchResult', ['values', 'statuses', 'primal_values'])
+
 
 class Problem(u.Canonical):
     """A convex optimization problem.
@@ -69,13 +76,20 @@ class Problem(u.Canonical):
         self.constraints = constraints
         self._value = None
         self._status = None
+        # The variables, parameters and constants in the problem.
+        self._leaf_cache = LeafCache(None, [], {})
         # Cached processed data for each solver.
         self._cached_data = {}
         self._reset_cache()
         # List of separable (sub)problems
         self._separable_problems = None
-        # Information about the size of the problem and its constituent parts
-        self._size_metrics = SizeMetrics(self)
+        # Worker pool holding copies of the separable problems, and the
+        # finalizer that shuts it down if the problem is garbage collected.
+        self._pool = None
+        self._pool_finalizer = None
+        # Information about the size of the problem and its constituent parts,
+        # computed on first access.
+        self._size_metrics = None
         # Benchmarks reported by the solver:
         self._solver_stats = None
 
@@ -84,7 +98,8 @@ class Problem(u.Canonical):
         """
         for solver_name in SOLVERS.keys():
             self._cached_data[solver_name] = ProblemData()
-        self._cached_data[s.PARALLEL] = CachedProblem(None, None)
+        # The components of the objective terms and constraints.
+        self._cached_data[s.PARALLEL] = cvxpy.transforms.SeparableTerms()
 
     @property
     def value(self):
@@ -120,49 +135,81 @@ class Problem(u.Canonical):
             (affine objective,
              constraints dict)
         """
-        canon_constr = []
-        obj, constr = self.objective.canonical_form
-        canon_constr += constr
-
-        for constr in self.constraints:
-            canon_constr += constr.canonical_form[1]
-
+        # Shared subexpressions only contribute their constraints once.
+        obj = self.objective.canonical_node[0]
+        canon_constr = u.canonical_constraints([self.objective] +
+                                               self.constraints)
         return (obj, canon_constr)
 
     def variables(self):
         """Returns a list of the variables in the problem.
         """
-        vars_ = self.objective.variables()
-        for constr in self.constraints:
-            vars_ += constr.variables()
-        # Remove duplicates.
-        return list(set(vars_))
+        return self._leaves('variables')
 
     def parameters(self):
         """Returns a list of the parameters in the problem.
         """
-        params = self.objective.parameters()
-        for constr in self.constraints:
-            params += constr.parameters()
-        # Remove duplicates.
-        return list(set(params))
+        return self._leaves('parameters')
 
     def constants(self):
         """Returns a list of the constants in the problem.
         """
-        const_dict = {}
-        constants_ = self.objective.constants()
-        for constr in self.constraints:
-            constants_ += constr.constants()
-        # Remove duplicates.
-        # Note that numpy matrices are not hashable, so we use the buildin function id
-        const_dict = {id(constant): constant for constant in constants_}
-        return list(const_dict.values())
+        return self._leaves('constants')
+
+    def _leaves(self, leaf_type):
+        """Returns the leaves of the given type in the problem.
+
+        The leaves are listed in order of first appearance, objective first.
+        They are cached until the objective or a constraint is replaced.
+
+        Parameters
+        ----------
+        leaf_type : str
+            'variables', 'parameters', or 'constants'.
+
+        Returns
+        -------
+        list
+            A new list of the leaves.
+        """
+        leaves = self._check_leaf_cache()
+        if leaf_type not in leaves:
+            leaf_list = getattr(self.objective, leaf_type)()
+            for constr in self.constraints:
+                leaf_list += getattr(constr, leaf_type)()
+            # Remove duplicates.
+            # Note that numpy matrices are not hashable, so we use the buildin function id
+            leaf_dict = OrderedDict((id(leaf), leaf) for leaf in leaf_list)
+            leaves[leaf_type] = list(leaf_dict.values())
+        return list(leaves[leaf_type])
+
+    def _check_leaf_cache(self):
+        """Clears the cached leaves and size metrics if the objective or a
+           constraint was replaced.
+
+        Returns
+        -------
+        dict
+            The cached leaves, keyed by type.
+        """
+        objective, constraints, leaves = self._leaf_cache
+        if (self.objective is not objective or
+                len(self.constraints) != len(constraints) or
+                any(new is not old for new, old in zip(self.constraints,
+                                                       constraints))):
+            self._leaf_cache = LeafCache(self.objective,
+                                         list(self.constraints), {})
+            self._size_metrics = None
+            leaves = self._leaf_cache.leaves
+        return leaves
 
     @property
     def size_metrics(self):
         """Returns an object containing information about the size of the problem.
         """
+        self._check_leaf_cache()
+        if self._size_metrics is None:
+            self._size_metrics = SizeMetrics(self)
         return self._size_metrics
 
     @property
@@ -229,15 +276,21 @@ class Problem(u.Canonical):
         objective, constraints = self.canonicalize()
         # Raise an error if the solver cannot handle the problem.
         SOLVERS[solver].validate_solver(constraints)
-        return SOLVERS[solver].get_problem_data(objective, constraints,
+        data = SOLVERS[solver].get_problem_data(objective, constraints,
                                                 self._cached_data)
+        # Cached sparse matrices share their index arrays between solves,
+        # so the caller gets a copy it can change in place.
+        return {key: value.copy() if sp.issparse(value) else value
+                for key, value in data.items()}
 
     def _solve(self,
                solver=None,
                ignore_dcp=False,
                warm_start=False,
                verbose=False,
-               parallel=False, **kwargs):
+               parallel=False,
+               save_duals=True,
+               compress_leq=False, **kwargs):
         """Solves a DCP compliant optimization problem.
 
         Saves the values of primal and dual variables in the variable
@@ -256,6 +309,14 @@ class Problem(u.Canonical):
             Overrides the default of hiding solver output.
         parallel : bool, optional
             If problem is separable, solve in parallel.
+        save_duals : bool, optional
+            Should the dual values be saved in the constraints? If False,
+            the constraints' dual values are set to None. Ignored when
+            solving in parallel.
+        compress_leq : bool, optional
+            Remove inequality constraints that are positive multiples of
+            another inequality constraint before calling the solver?
+            Ignored when solving in parallel or with LS.
         kwargs : dict, optional
             A dict of options that will be passed to the specific solver.
             In general, these options will override any default settings
@@ -285,26 +346,64 @@ class Problem(u.Canonical):
             results_dict = solver.solve(objective, constraints,
                                         self._cached_data, warm_start, verbose,
                                         kwargs)
-            self._update_problem_state(results_dict, sym_data, solver)
+            self._update_problem_state(results_dict, sym_data, solver,
+                                       save_duals)
             return self.value
 
-        # Standard cone problem
-        objective, constraints = self.canonicalize()
-
         # Solve in parallel
         if parallel:
-            # Check if the objective or constraint has changed
-
-            if (objective != self._cached_data[s.PARALLEL].objective or
-                    constraints != self._cached_data[s.PARALLEL].constraints):
-                self._separable_problems = cvxpy.transforms.get_separable_problems(self)
-                self._cached_data[s.PARALLEL] = CachedProblem(objective,
-                                                              constraints)
+            # Check if the objective or constraints have changed.
+            separable_terms = self._cached_data[s.PARALLEL]
+            if not separable_terms.matches(self):
+                self._separable_problems = cvxpy.transforms.get_separable_problems(
+                    self, separable_terms)
+                self._close_pool()
             if len(self._separable_problems) > 1:
                 return self._parallel_solve(solver, ignore_dcp, warm_start,
                                             verbose, **kwargs)
 
-        # Choose a solver/check the chosen solver.
+        # Standard cone problem
+        objective, constraints = self.canonicalize()
+
+        solver = self._get_solver(solver, constraints)
+        sym_data = solver.get_sym_data(objective, constraints,
+                                       self._cached_data)
+        # Presolve couldn't solve the problem.
+        if sym_data.presolve_status is None:
+            # The flag only applies to this solve.
+            prob_data = self._cached_data[solver.name()]
+            prob_data.compress_leq = compress_leq
+            try:
+                results_dict = solver.solve(objective, constraints,
+                                            self._cached_data, warm_start,
+                                            verbose, kwargs)
+            finally:
+                prob_data.compress_leq = False
+            solver.expand_leq_duals(results_dict, self._cached_data,
+                                    solver.name())
+        # Presolve determined problem was unbounded or infeasible.
+        else:
+            results_dict = {s.STATUS: sym_data.presolve_status}
+        self._update_problem_state(results_dict, sym_data, solver,
+                                   save_duals)
+        return self.value
+
+    @staticmethod
+    def _get_solver(solver, constraints):
+        """Chooses a solver or checks the chosen solver.
+
+        Parameters
+        ----------
+        solver : str or None
+            The name of the solver, or None to choose one.
+        constraints : list
+            The canonicalized constraints.
+
+        Returns
+        -------
+        Solver
+            The solver interface.
+        """
         if solver is None:
             solver_name = Solver.choose_solver(constraints)
             solver = SOLVERS[solver_name]
@@ -313,19 +412,162 @@ class Problem(u.Canonical):
             solver.validate_solver(constraints)
         else:
             raise SolverError("Unknown solver.")
+        return solver
+
+    def solve_batch(self, param_values,
+                    solver=None,
+                    ignore_dcp=False,
+                    warm_start=True,
+                    verbose=False,
+                    processes=None, **kwargs):
+        """Solves the problem for many assignments of parameter values.
+
+        The problem is checked and canonicalized once, and the values of
+        the parameterized problem data are refreshed for each assignment.
+        The results are returned as arrays; the values of the variables,
+        constraints, parameters and the problem itself are not changed.
+
+        Parameters
+        ----------
+        param_values : list
+            A list of dicts mapping Parameter to value.
+        solver : str, optional
+            The solver to use.
+        ignore_dcp : bool, optional
+            Overrides the default of raising an exception if the problem is not
+            DCP.
+        warm_start : bool, optional
+            Should each solve be warm started from the previous one?
+        verbose : bool, optional
+            Overrides the default of hiding solver output.
+        processes : int, optional
+            The number of worker processes. Each process solves a contiguous
+            chunk of the assignments. Defaults to solving in this process.
+        kwargs : dict, optional
+            A dict of options that will be passed to the specific solver.
+
+        Returns
+        -------
+        BatchResult
+            A namedtuple of the optimal values (NumPy array), the statuses
+            (list), and a dict mapping each variable to a NumPy array of
+            its values with shape (len(param_values), rows, cols).
+            Values without a solution are NaN.
+        """
+        if not self.is_dcp():
+            if ignore_dcp:
+                print("Problem does not follow DCP rules. "
+                      "Solving a convex relaxation.")
+            else:
+                raise DCPError("Problem does not follow DCP rules.")
+        if solver == s.LS:
+            raise SolverError("The solver %s does not support batch solves." % s.LS)
+
+        if processes is None or processes <= 1 or len(param_values) <= 1:
+            values, statuses, primal_values = self._solve_items(
+                param_values, solver, warm_start, verbose, kwargs)
+        else:
+            def _solve_chunk(chunk_args):
+                """Solves a chunk of the assignments in a worker process.
+                """
+                problem, chunk = chunk_args
+                return problem._solve_items(chunk, solver, warm_start,
+                                            verbose, kwargs)
+
+            bounds = np.linspace(0, len(param_values),
+                                 min(processes, len(param_values)) + 1)
+            bounds = bounds.astype(int)
+            # The problem is pickled with each chunk so the Parameter keys
+            # refer to the worker's copy of the problem. Its symbolic data
+            # and matrix caches pickle their LinOps as LinOpArenas.
+            chunks = [(self, param_values[start:end])
+                      for start, end in zip(bounds[:-1], bounds[1:])]
+            pool = multiprocessing.Pool(processes=len(chunks))
+            chunk_results = pool.map(_solve_chunk, chunks)
+            pool.close()
+            pool.join()
+            values = np.concatenate([res[0] for res in chunk_results])
+            statuses = sum([res[1] for res in chunk_results], [])
+            primal_values = {}
+            for var_id in chunk_results[0][2]:
+                primal_values[var_id] = np.concatenate(
+                    [res[2][var_id] for res in chunk_results])
+        return BatchResult(values, statuses,
+                           {var: primal_values[var.id]
+                            for var in self.variables()})
+
+    def _solve_items(self, param_values, solver, warm_start, verbose, kwargs):
+        """Solves the problem for each assignment of parameter values.
+
+        Parameters
+        ----------
+        param_values : list
+            A list of dicts mapping Parameter to value.
+        solver : str or None
+            The solver to use.
+        warm_start : bool
+            Should each solve be warm started from the previous one?
+        verbose : bool
+            Should the solver print output?
+        kwargs : dict
+            Additional arguments for the solver.
 
+        Returns
+        -------
+        tuple
+            (optimal values, statuses, map of variable id to stacked values)
+        """
+        objective, constraints = self.canonicalize()
+        solver = self._get_solver(solver, constraints)
         sym_data = solver.get_sym_data(objective, constraints,
                                        self._cached_data)
-        # Presolve couldn't solve the problem.
-        if sym_data.presolve_status is None:
-            results_dict = solver.solve(objective, constraints,
-                                        self._cached_data, warm_start, verbose,
-                                        kwargs)
-        # Presolve determined problem was unbounded or infeasible.
-        else:
-            results_dict = {s.STATUS: sym_data.presolve_status}
-        self._update_problem_state(results_dict, sym_data, solver)
-        return self.value
+        num_items = len(param_values)
+        values = np.empty(num_items)
+        statuses = []
+        primal = np.full((num_items, sym_data.x_length), np.nan)
+        old_values = {param: param.value for param in self.parameters()}
+        try:
+            for idx, assignment in enumerate(param_values):
+                for param, value in assignment.items():
+                    param.value = value
+                if sym_data.presolve_status is None:
+                    results_dict = solver.solve(objective, constraints,
+                                                self._cached_data,
+                                                warm_start, verbose,
+                                                dict(kwargs))
+                    status = results_dict[s.STATUS]
+                else:
+                    status = sym_data.presolve_status
+                if status in s.SOLUTION_PRESENT:
+                    primal[idx] = np.asarray(results_dict[s.PRIMAL]).ravel()
+                    values[idx] = self.objective.primal_to_result(
+                        results_dict[s.VALUE])
+                elif status in [s.INFEASIBLE, s.INFEASIBLE_INACCURATE]:
+                    values[idx] = self.objective.primal_to_result(np.inf)
+                elif status in [s.UNBOUNDED, s.UNBOUNDED_INACCURATE]:
+                    values[idx] = self.objective.primal_to_result(-np.inf)
+                else:
+                    values[idx] = np.nan
+                statuses.append(status)
+        finally:
+            for param, value in old_values.items():
+                param._value = value
+            Leaf.values_changed()
+        # Slice each variable out of the stacked primal vectors.
+        primal_values = {}
+        failed = np.array([status not in s.SOLUTION_PRESENT
+                           for status in statuses], dtype=bool)
+        for var in self.variables():
+            rows, cols = var.size
+            if var.id in sym_data.var_offsets:
+                offset = sym_data.var_offsets[var.id]
+                block = primal[:, offset:offset + rows*cols]
+                primal_values[var.id] = block.reshape(
+                    (num_items, cols, rows)).transpose(0, 2, 1)
+            else:  # The variable was multiplied by zero.
+                primal_values[var.id] = np.zeros((num_items, rows, cols))
+                primal_values[var.id][failed] = np.nan
+        return values, statuses, primal_values
 
     def _parallel_solve(self,
                         solver=None,
@@ -359,24 +601,25 @@ class Problem(u.Canonical):
             The optimal value for the problem, or a string indicating
             why the problem could not be solved.
         """
-        def _solve_problem(problem):
-            """Solve a problem and then return the optimal value, status,
-            primal values, and dual values.
-            """
-            opt_value = problem.solve(solver=solver,
-                                      ignore_dcp=ignore_dcp,
-                                      warm_start=warm_start,
-                                      verbose=verbose,
-                                      parallel=False, **kwargs)
-            status = problem.status
-            primal_values = [var.value for var in problem.variables()]
-            dual_values = [constr.dual_value for constr in problem.constraints]
-            return SolveResult(opt_value, status, primal_values, dual_values)
-
-        pool = multiprocessing.Pool(processes=multiprocessing.cpu_count())
-        solve_results = pool.map(_solve_problem, self._separable_problems)
-        pool.close()
-        pool.join()
+        if self._pool is None:
+            # The workers receive the subproblems once, when they start.
+            # Each worker keeps the compiled data of the subproblems between
+            # calls, so later calls only send the parameter values.
+            processes = min(multiprocessing.cpu_count(),
+                            len(self._separable_problems))
+            self._pool = multiprocessing.Pool(
+                processes=processes,
+                initializer=_init_subproblems,
+                initargs=(self._separable_problems,))
+            self._pool_finalizer = weakref.finalize(self,
+                                                    self._pool.terminate)
+        solve_args = []
+        for index, subproblem in enumerate(self._separable_problems):
+            param_values = [(param.id, param.value)
+                            for param in subproblem.parameters()]
+            solve_args.append((index, param_values, solver, ignore_dcp,
+                               warm_start, verbose, kwargs))
+        solve_results = self._pool.map(_solve_subproblem, solve_args)
         statuses = {solve_result.status for solve_result in solve_results}
         # Check if at least one subproblem is infeasible or inaccurate
         for status in s.INF_OR_UNB:
@@ -386,12 +629,12 @@ class Problem(u.Canonical):
         else:
             for subproblem, solve_result in zip(self._separable_problems,
                                                 solve_results):
-                for var, primal_value in zip(subproblem.variables(),
-                                             solve_result.primal_values):
-                    var.save_value(primal_value)
+                for var in subproblem.variables():
+                    var.save_value(_from_buffer(
+                        solve_result.primal_values[var.id]))
                 for constr, dual_value in zip(subproblem.constraints,
-                                              solve_results):
-                    constr.save_value(dual_value)
+                                              solve_result.dual_values):
+                    constr.save_value(_from_buffer(dual_value))
             self._value = sum(solve_result.opt_value
                               for solve_result in solve_results)
             if s.OPTIMAL_INACCURATE in statuses:
@@ -400,7 +643,39 @@ class Problem(u.Canonical):
                 self._status = s.OPTIMAL
         return self._value
 
-    def _update_problem_state(self, results_dict, sym_data, solver):
+    def close(self):
+        """Shuts down the worker processes kept for parallel solves.
+
+        The workers are started again by the next parallel solve. They are
+        also shut down when the problem is garbage collected, or at exit.
+        """
+        self._close_pool()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _close_pool(self):
+        """Shuts down the worker pool for the separable problems.
+        """
+        if self._pool is not None:
+            # Calling the finalizer terminates the pool and detaches it.
+            self._pool_finalizer()
+            self._pool = None
+            self._pool_finalizer = None
+
+    def __getstate__(self):
+        """The worker pool is not pickled.
+        """
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        state['_pool_finalizer'] = None
+        return state
+
+    def _update_problem_state(self, results_dict, sym_data, solver,
+                              save_duals=True):
         """Updates the problem state given the solver results.
 
         Updates problem.status, problem.value and value of
@@ -414,19 +689,25 @@ class Problem(u.Canonical):
             The symbolic data for the problem.
         solver : Solver
             The solver type used to obtain the results.
+        save_duals : bool, optional
+            Should the dual values be saved in the constraints?
         """
         if results_dict[s.STATUS] in s.SOLUTION_PRESENT:
             self._save_values(results_dict[s.PRIMAL], self.variables(),
                               sym_data.var_offsets)
-            # Not all solvers provide dual variables.
-            if s.EQ_DUAL in results_dict:
-                self._save_dual_values(results_dict[s.EQ_DUAL],
-                                       sym_data.constr_map[s.EQ],
-                                       [EqConstraint])
-            if s.INEQ_DUAL in results_dict:
-                self._save_dual_values(results_dict[s.INEQ_DUAL],
-                                       sym_data.constr_map[s.LEQ],
-                                       [LeqConstraint, PSDConstraint])
+            if not save_duals:
+                for constr in self.constraints:
+                    constr.save_value(None)
+            else:
+                # Not all solvers provide dual variables.
+                if s.EQ_DUAL in results_dict:
+                    self._save_dual_values(results_dict[s.EQ_DUAL],
+                                           sym_data.constr_map[s.EQ],
+                                           [EqConstraint])
+                if s.INEQ_DUAL in results_dict:
+                    self._save_dual_values(results_dict[s.INEQ_DUAL],
+                                           sym_data.constr_map[s.LEQ],
+                                           [LeqConstraint, PSDConstraint])
             # Correct optimal value if the objective was Maximize.
             value = results_dict[s.VALUE]
             self._value = self.objective.primal_to_result(value)
@@ -522,24 +803,19 @@ class Problem(u.Canonical):
         offset_map : dict
             A map of object id to offset in the results vector.
         """
-        if len(result_vec) > 0:
-            # Cast to desired matrix type.
-            result_vec = intf.DEFAULT_INTF.const_to_matrix(result_vec)
-        for obj in objects:
-            rows, cols = obj.size
-            if obj.id in offset_map:
-                offset = offset_map[obj.id]
-                # Handle scalars
-                if (rows, cols) == (1, 1):
-                    value = intf.index(result_vec, (offset, 0))
-                else:
-                    value = intf.DEFAULT_INTF.zeros(rows, cols)
-                    intf.DEFAULT_INTF.block_add(
-                        value, result_vec[offset:offset + rows * cols], 0, 0,
-                        rows, cols)
-                offset += rows * cols
-            else:  # The variable was multiplied by zero.
+        # A single copy of the results, so the values don't alias the
+        # solver's output. Each value is a view into the copy.
+        result_vec = np.array(result_vec, dtype=np.float64).ravel()
+        table = [(obj, offset_map.get(obj.id), obj.size) for obj in objects]
+        for obj, offset, (rows, cols) in table:
+            if offset is None:  # The variable was multiplied by zero.
                 value = intf.DEFAULT_INTF.zeros(rows, cols)
+            # Handle scalars
+            elif (rows, cols) == (1, 1):
+                value = float(result_vec[offset])
+            else:
+                block = result_vec[offset:offset + rows*cols]
+                value = np.asmatrix(block.reshape((rows, cols), order='F'))
             obj.save_value(value)
 
     def __str__(self):
@@ -629,6 +905,66 @@ class SolverStats(object):
             self.num_iters = results_dict[s.NUM_ITERS]
 
 
+# The separable problems held by a worker process.
+_worker_subproblems = None
+
+
+def _init_subproblems(subproblems):
+    """Stores the separable problems in a worker process.
+    """
+    global _worker_subproblems
+    _worker_subproblems = subproblems
+
+
+def _solve_subproblem(solve_args):
+    """Solves a separable problem in a worker process.
+
+    Parameters
+    ----------
+    solve_args : tuple
+        The index of the subproblem, a list of (parameter id, value) pairs,
+        and the arguments to Problem.solve.
+
+    Returns
+    -------
+    SolveResult
+        The primal values are keyed by variable id. The values are NumPy
+        arrays or scalars.
+    """
+    index, param_values, solver, ignore_dcp, warm_start, verbose, kwargs = \
+        solve_args
+    problem = _worker_subproblems[index]
+    params = {param.id: param for param in problem.parameters()}
+    for param_id, value in param_values:
+        params[param_id].value = value
+    opt_value = problem.solve(solver=solver,
+                              ignore_dcp=ignore_dcp,
+                              warm_start=warm_start,
+                              verbose=verbose,
+                              parallel=False, **kwargs)
+    primal_values = {var.id: _to_buffer(var.value)
+                     for var in problem.variables()}
+    dual_values = [_to_buffer(constr.dual_value)
+                   for constr in problem.constraints]
+    return SolveResult(opt_value, problem.status, primal_values, dual_values)
+
+
+def _to_buffer(value):
+    """Converts a matrix value into a NumPy array for pickling.
+    """
+    if isinstance(value, np.matrix):
+        return value.A
+    return value
+
+
+def _from_buffer(value):
+    """Converts a value from _to_buffer back into the default matrix type.
+    """
+    if isinstance(value, np.ndarray):
+        return intf.DEFAULT_INTF.const_to_matrix(value)
+    return value
+
+
 class SizeMetrics(object):
     """Reports various metrics regarding the problem
 
@@ -16,22 +16,76 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
+import heapq
 import scipy.sparse as sp
 import numpy as np
 
 
-def get_row_nnz(mat, row):
-    """Return the number of nonzeros in row.
+def _duplicate_rows(A, vals, key, rows, eps):
+    """Finds the rows of A that repeat an earlier row.
+
+    Rows are grouped by hashing their sparsity pattern, rounded values and
+    key, and candidate matches are checked entry by entry.
+
+    Parameters
+    ----------
+    A : SciPy CSR matrix
+        The matrix, in canonical format.
+    vals : NumPy 1D array
+        The normalized entries of A, in the order of A.data.
+    key : NumPy 1D array
+        An additional value per row that must also match.
+    rows : NumPy 1D array
+        The rows to compare.
+    eps : float
+        Standard for considering two numbers equivalent.
+
+    Returns
+    -------
+    NumPy 1D array
+        The rows that match an earlier row.
     """
-    return mat.indptr[row+1] - mat.indptr[row]
+    num_rows = A.shape[0]
+    row_nnz = np.diff(A.indptr)
+    entry_rows = np.repeat(np.arange(num_rows), row_nnz)
+    # Hash the sparsity pattern and rounded values of each row.
+    with np.errstate(over='ignore'):
+        entry_hash = A.indices.astype(np.uint64)*np.uint64(0x9E3779B97F4A7C15)
+        entry_hash ^= np.round(vals, 10).view(np.uint64)
+        entry_hash *= np.uint64(0xC2B2AE3D27D4EB4F)
+    row_hash = np.zeros(num_rows, dtype=np.uint64)
+    np.add.at(row_hash, entry_rows, entry_hash)
+    rounded_key = np.round(key, 10)
+    # Group rows with the same hashes, the first row of each group is kept.
+    order = rows[np.lexsort((rows, rounded_key[rows], row_nnz[rows],
+                             row_hash[rows]))]
+    new_group = np.ones(order.size, dtype=bool)
+    new_group[1:] = (np.diff(row_hash[order]) != 0) | \
+        (np.diff(row_nnz[order]) != 0) | (np.diff(rounded_key[order]) != 0)
+    leaders = order[new_group][np.cumsum(new_group) - 1]
+    dup = order[~new_group]
+    dup_leaders = leaders[~new_group]
+    # Check each row against the first row of its group entry by entry.
+    nnz = row_nnz[dup]
+    offsets = np.arange(nnz.sum()) - np.repeat(np.cumsum(nnz) - nnz, nnz)
+    dup_entries = np.repeat(A.indptr[dup], nnz) + offsets
+    leader_entries = np.repeat(A.indptr[dup_leaders], nnz) + offsets
+    entry_match = (A.indices[dup_entries] == A.indices[leader_entries]) & \
+        (np.abs(vals[dup_entries] - vals[leader_entries]) < eps)
+    row_match = np.abs(key[dup] - key[dup_leaders]) < eps
+    mismatched = np.repeat(np.arange(dup.size), nnz)[~entry_match]
+    row_match[mismatched] = False
+    return dup[row_match]
 
 
 def compress_matrix(A, b, equil_eps=1e-10):
     """Compresses A and b by eliminating redundant rows.
 
-    Identifies rows that are multiples of another row.
-    Reduces A and b to C = PA, d = Pb, where P has one
-    nonzero per row.
+    Identifies rows of A x <= b that are positive multiples of another row,
+    including the entry of b. Reduces A and b to C = PA, d = Pb, where P
+    selects the rows to keep. Rows are grouped by hashing their sparsity
+    pattern and normalized values, and candidate matches are checked
+    exactly.
 
     Parameters
     ----------
@@ -47,60 +101,206 @@ def compress_matrix(A, b, equil_eps=1e-10):
     tuple
         The tuple (A, b, P) where A and b are compressed according to P.
     """
-    # Data for compression matrix.
-    P_V = []
-    P_I = []
-    P_J = []
-    # List of rows to keep.
-    row_to_keep = []
-    # A map of sparsity pattern to row list.
-    sparsity_to_row = {}
-    prev_ptr = A.indptr[0]
-    for row_num in range(A.shape[0]):
-        keep_row = True
-        ptr = A.indptr[row_num+1]
-        pattern = tuple(A.indices[prev_ptr:ptr])
-        # Eliminate empty rows.
-        nnz = ptr - prev_ptr
-        if nnz == 0 or np.linalg.norm(A.data[prev_ptr:ptr]) < equil_eps:
-            keep_row = False
-            P_V.append(0.)
-            P_I.append(row_num)
-            P_J.append(0)
-        # Sparsity pattern is the same or there was a false collision.
-        # Check rows have the same number of nonzeros.
-        elif pattern in sparsity_to_row and nnz == \
-                get_row_nnz(A, sparsity_to_row[pattern][0]):
-            # Now test if one row is a multiple of another.
-            row_matches = sparsity_to_row[pattern]
-            for row_match in row_matches:
-                cur_vals = A.data[prev_ptr:ptr]
-                prev_match_ptr = A.indptr[row_match]
-                match_ptr = A.indptr[row_match+1]
-                match_vals = A.data[prev_match_ptr:match_ptr]
-                # Ratio should be constant.
-                ratio = cur_vals/match_vals
-                if np.ptp(ratio) < equil_eps and \
-                   abs(ratio[0] - b[row_num]/b[row_match]) < equil_eps:
-                    keep_row = False
-                    P_V.append(ratio[0])
-                    P_I.append(row_num)
-                    P_J.append(row_match)
-            if keep_row:
-                sparsity_to_row[pattern].append(row_num)
-        # Pattern doesn't match anything present.
-        else:
-            sparsity_to_row[pattern] = [row_num]
-
-        if keep_row:
-            row_to_keep.append(row_num)
-            P_V.append(1.)
-            P_I.append(row_num)
-            P_J.append(len(row_to_keep)-1)
-
-    # Compress A and b.
-    cols = max(len(row_to_keep), 1)
-    P = sp.coo_matrix((P_V, (P_I, P_J)), (A.shape[0], cols))
-    A_compr = A[row_to_keep, :]
-    b_compr = b[row_to_keep]
-    return (A_compr, b_compr, P)
+    A = sp.csr_matrix(A)
+    # Rows are scaled by their first stored entry, which must be nonzero.
+    if not A.has_canonical_format or not A.data.all():
+        A = A.copy()
+        A.sum_duplicates()
+        A.eliminate_zeros()
+    b = np.asarray(b, dtype=float).ravel()
+    num_rows = A.shape[0]
+    row_nnz = np.diff(A.indptr)
+    entry_rows = np.repeat(np.arange(num_rows), row_nnz)
+    norms = np.sqrt(np.bincount(entry_rows, A.data**2, minlength=num_rows))
+    # Empty rows are redundant unless they are infeasible.
+    empty = (norms < equil_eps) & (b >= 0)
+    candidates = norms >= equil_eps
+    # Scale each row by the magnitude of its first entry.
+    scale = np.ones(num_rows)
+    scale[candidates] = np.abs(A.data[A.indptr[:-1][candidates]])
+    vals = A.data/scale[entry_rows]
+    b_vals = b/scale
+    rows = np.flatnonzero(candidates)
+    dup = _duplicate_rows(A, vals, b_vals, rows, equil_eps)
+    keep = ~empty
+    keep[dup] = False
+    rows_to_keep = np.flatnonzero(keep)
+    P = sp.csr_matrix((np.ones(rows_to_keep.size), rows_to_keep,
+                       np.arange(rows_to_keep.size + 1)),
+                      (rows_to_keep.size, num_rows))
+    return (A[rows_to_keep, :], b[rows_to_keep], P)
+
+
+def compress_leq(G, h, leq_dim, offset=0):
+    """Compresses the <= rows of an inequality system.
+
+    Parameters
+    ----------
+    G : SciPy sparse matrix
+        The constraints matrix.
+    h : NumPy array
+        The vector associated with the constraints matrix.
+    leq_dim : int
+        The number of <= rows.
+    offset : int, optional
+        The index of the first <= row.
+
+    Returns
+    -------
+    tuple
+        The tuple (G, h, P) where P compresses the <= rows.
+    """
+    G = sp.csr_matrix(G)
+    h = np.asarray(h).ravel()
+    end = offset + leq_dim
+    G_leq, h_leq, P = compress_matrix(G[offset:end, :], h[offset:end])
+    G = sp.vstack([G[:offset, :], G_leq, G[end:, :]]).tocsr()
+    h = np.hstack([h[:offset], h_leq, h[end:]])
+    return G, h, P
+
+
+def independent_rows(A, tol=1e-10):
+    """Finds a set of rows of A that span the row space of A.
+
+    Singleton rows and rows that are multiples of another row are handled
+    structurally. The remaining rows are scaled to unit norm and reduced
+    by sparse Gaussian elimination with threshold pivoting, which skips
+    the rows that reduce to zero.
+
+    Parameters
+    ----------
+    A : SciPy sparse matrix
+        The matrix whose rows are selected.
+    tol : float, optional
+        Relative tolerance. Entries smaller than tol times the largest
+        entry are ignored, and a scaled row is dependent if it reduces
+        to entries below tol.
+
+    Returns
+    -------
+    tuple
+        (the sorted indices of the independent rows, a pivot column for
+         each of those rows). The square submatrix of A with these rows
+         and columns is nonsingular.
+
+    Raises
+    ------
+    RuntimeError
+        If a row reduces to entries too close to tol to tell whether
+        it is dependent.
+    """
+    A = sp.csr_matrix(A, dtype=float, copy=True)
+    A.sum_duplicates()
+    if A.nnz > 0:
+        A.data[np.abs(A.data) < tol*np.abs(A.data).max()] = 0
+    A.eliminate_zeros()
+    pivot_cols = np.full(A.shape[0], -1, dtype=np.int64)
+    # Singleton rows each fix a variable, keep one row per variable.
+    row_nnz = np.diff(A.indptr)
+    singletons = np.flatnonzero(row_nnz == 1)
+    fixed_cols, first = np.unique(A.indices[A.indptr[singletons]],
+                                  return_index=True)
+    pivot_cols[singletons[first]] = fixed_cols
+    # Remove the fixed variables from the other rows.
+    free = np.ones(A.shape[1])
+    free[fixed_cols] = 0
+    rows = np.flatnonzero(row_nnz > 1)
+    B = A[rows].dot(sp.diags(free, 0)).tocsr()
+    B.eliminate_zeros()
+    nonempty = np.diff(B.indptr) > 0
+    rows = rows[nonempty]
+    B = B[nonempty]
+    B.sort_indices()
+    if rows.size > 0:
+        # Scale each row to unit norm with a positive first entry
+        # and drop duplicate rows.
+        entry_rows = np.repeat(np.arange(B.shape[0]), np.diff(B.indptr))
+        norms = np.sqrt(np.bincount(entry_rows, B.data**2))
+        scale = np.sign(B.data[B.indptr[:-1]])/norms
+        B.data *= scale[entry_rows]
+        dup = _duplicate_rows(B, B.data, np.zeros(B.shape[0]),
+                              np.arange(B.shape[0]), tol)
+        unique = np.ones(B.shape[0], dtype=bool)
+        unique[dup] = False
+        rows = rows[unique]
+        B = B[unique]
+        pivot_cols[rows] = _eliminate_rows(B, tol)
+    keep = np.flatnonzero(pivot_cols >= 0)
+    return keep, pivot_cols[keep]
+
+
+def _eliminate_rows(B, tol, thresh=0.1):
+    """Reduces the rows of B in order against the independent rows before them.
+
+    Each row is reduced by the earlier pivot rows, in the order they were
+    chosen. A row that reduces to zero is dependent. Otherwise its pivot
+    is the entry with the fewest nonzeros in its column among the entries
+    at least thresh times the largest, which keeps the pivot rows sparse.
+
+    Parameters
+    ----------
+    B : SciPy CSR matrix
+        A matrix with rows of unit norm.
+    tol : float
+        A row is dependent if its reduced entries are below tol.
+    thresh : float, optional
+        The pivoting threshold.
+
+    Returns
+    -------
+    NumPy 1D array
+        The pivot column of each row, or -1 if the row is dependent.
+
+    Raises
+    ------
+    RuntimeError
+        If a reduced row is too close to tol to tell whether it is dependent.
+    """
+    col_count = np.bincount(B.indices, minlength=B.shape[1])
+    indptr = B.indptr.tolist()
+    indices = B.indices.tolist()
+    data = B.data.tolist()
+    pivots = np.full(B.shape[0], -1, dtype=np.int64)
+    # Map of pivot column to the index of its pivot row in pivot_rows.
+    pivot_of = {}
+    # (pivot column, row as a map of column to value) in order.
+    pivot_rows = []
+    for i in range(B.shape[0]):
+        start, end = indptr[i], indptr[i+1]
+        row = dict(zip(indices[start:end], data[start:end]))
+        # The pivot rows only have entries in the pivot columns of later
+        # pivot rows, so reducing in pivot order terminates.
+        heap = [pivot_of[col] for col in row if col in pivot_of]
+        heapq.heapify(heap)
+        queued = set(heap)
+        while heap:
+            col, pivot_row = pivot_rows[heapq.heappop(heap)]
+            coeff = row.pop(col, 0.0)/pivot_row[col]
+            if coeff == 0.0:
+                continue
+            for other, val in pivot_row.items():
+                if other == col:
+                    continue
+                row[other] = row.get(other, 0.0) - coeff*val
+                idx = pivot_of.get(other)
+                if idx is not None and idx not in queued:
+                    queued.add(idx)
+                    heapq.heappush(heap, idx)
+        if not row:
+            continue
+        cols = np.fromiter(row.keys(), np.int64, len(row))
+        vals = np.abs(np.fromiter(row.values(), float, len(row)))
+        largest = vals.max()
+        if 1e-2*tol < largest < 1e2*tol:
+            raise RuntimeError("The rank of A is ambiguous at this tolerance.")
+        elif largest <= tol:
+            continue
+        candidates = cols[vals >= thresh*largest]
+        col = int(candidates[np.argmin(col_count[candidates])])
+        # Drop the rounding errors left by the reduction.
+        row = {other: val for other, val in row.items()
+               if abs(val) > tol*largest}
+        pivots[i] = col
+        pivot_of[col] = len(pivot_rows)
+        pivot_rows.append((col, row))
+    return pivots
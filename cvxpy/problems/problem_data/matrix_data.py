@@ -18,41 +18,238 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import cvxpy.interface as intf
+import cvxpy.lin_ops as lo
 import cvxpy.lin_ops.lin_utils as lu
+from cvxpy.problems.problem_data.param_map import ParamMap
+import numpy as np
 import scipy.sparse as sp
 import canonInterface
 
 
+class COOBuffer(object):
+    """A growable (V, I, J) triplet backed by NumPy arrays.
+
+    Entries are copied into preallocated float64/int64 buffers that
+    grow geometrically, so no Python objects are created per nonzero.
+
+    Attributes
+    ----------
+    nnz : int
+        The number of entries stored.
+    """
+    # The minimum number of entries allocated when the buffer grows.
+    MIN_CHUNK = 1024
+
+    def __init__(self):
+        self.nnz = 0
+        self._V = np.empty(0, dtype=np.float64)
+        self._I = np.empty(0, dtype=np.int64)
+        self._J = np.empty(0, dtype=np.int64)
+
+    def __len__(self):
+        return self.nnz
+
+    def _reserve(self, capacity):
+        """Grows the buffers so they hold at least capacity entries.
+        """
+        if capacity <= self._V.size:
+            return
+        new_size = max(capacity, 2*self._V.size, self.MIN_CHUNK)
+        for name, dtype in [("_V", np.float64),
+                            ("_I", np.int64),
+                            ("_J", np.int64)]:
+            old = getattr(self, name)
+            new = np.empty(new_size, dtype=dtype)
+            new[:self.nnz] = old[:self.nnz]
+            setattr(self, name, new)
+
+    def extend(self, V, row_idx, col_idx):
+        """Appends the entries of a (V, I, J) triplet.
+
+        Parameters
+        ----------
+        V : array_like
+            The values.
+        row_idx : array_like
+            The row indices.
+        col_idx : array_like
+            The column indices.
+        """
+        count = len(V)
+        if count == 0:
+            return
+        self._reserve(self.nnz + count)
+        end = self.nnz + count
+        self._V[self.nnz:end] = V
+        self._I[self.nnz:end] = row_idx
+        self._J[self.nnz:end] = col_idx
+        self.nnz = end
+
+    def clear(self):
+        """Discards the stored entries but keeps the allocated buffers.
+        """
+        self.nnz = 0
+
+    @property
+    def coo_tup(self):
+        """The (V, I, J) triplet of the stored entries as array views.
+        """
+        return (self._V[:self.nnz], self._I[:self.nnz], self._J[:self.nnz])
+
+    @staticmethod
+    def join(buffers):
+        """Concatenates the entries of several buffers.
+
+        Parameters
+        ----------
+        buffers : list
+            A list of COOBuffer objects.
+
+        Returns
+        -------
+        tuple
+            A (V, I, J) triplet of NumPy arrays.
+        """
+        tups = [buf.coo_tup for buf in buffers if buf.nnz > 0]
+        if len(tups) == 1:
+            return tups[0]
+        elif len(tups) == 0:
+            return COOBuffer().coo_tup
+        return tuple(np.concatenate(arrs) for arrs in zip(*tups))
+
+
+class SparsityPattern(object):
+    """A fixed CSC sparsity pattern for a matrix cache.
+
+    The pattern is the union of the cached entries and the entries
+    of a ParamMap, so only the data array changes between solves.
+    The indptr and indices arrays are shared by every matrix built
+    from the pattern, so they are read-only.
+
+    Attributes
+    ----------
+    indptr : array
+        The CSC column pointers.
+    indices : array
+        The CSC row indices.
+    base_data : array
+        The values of the cached entries.
+    param_pos : array
+        The position of each ParamMap entry in the data array.
+    size : tuple
+        The (rows, cols) dimensions of the matrix.
+    """
+
+    def __init__(self, coo_buf, param_map, size):
+        self.size = size
+        rows, cols = size
+        V, row_idx, col_idx = coo_buf.coo_tup
+        keys = col_idx*rows + row_idx
+        if param_map is not None:
+            keys = np.concatenate([keys, param_map.col_idx*rows +
+                                   param_map.row_idx])
+        pattern, pos = np.unique(keys, return_inverse=True)
+        self.base_data = np.bincount(pos[:len(V)], weights=V,
+                                     minlength=len(pattern)).astype(np.float64)
+        self.param_pos = pos[len(V):]
+        indptr = np.searchsorted(pattern // rows, np.arange(cols + 1))
+        # Let SciPy choose the index type once.
+        template = sp.csc_matrix((self.base_data, pattern % rows, indptr),
+                                 self.size)
+        self.indices = template.indices
+        self.indptr = template.indptr
+        self.indices.setflags(write=False)
+        self.indptr.setflags(write=False)
+
+    def to_csc(self, param_vals=None):
+        """Builds the matrix for the given ParamMap values.
+
+        Parameters
+        ----------
+        param_vals : array, optional
+            The values of the ParamMap entries.
+
+        Returns
+        -------
+        SciPy CSC matrix
+        """
+        data = self.base_data.copy()
+        if param_vals is not None:
+            data[self.param_pos] += param_vals
+        return sp.csc_matrix((data, self.indices, self.indptr), self.size)
+
+
 class MatrixCache(object):
     """A cached version of the matrix and vector pair in an affine constraint.
 
     Attributes
     ----------
-    coo_tup : tuple
-            A (V, I, J) triplet for the matrix.
-    param_coo_tup : tuple
-            A (V, I, J) triplet for the parameterized matrix.
+    coo_buf : COOBuffer
+            The (V, I, J) entries for the matrix.
+    param_coo_buf : COOBuffer
+            The (V, I, J) entries for the parameterized matrix.
     const_vec : array
         The vector offset.
+    param_const_vec : array
+        The vector offset for the parameterized constraints.
     constraints : list
         A list of constraints in the matrix.
+    param_constr : list
+        The constraints with parameters.
+    param_offsets : list
+        The row offsets of the constraints with parameters.
+    param_map : ParamMap or None
+        The compiled map from parameter values to the parameterized data.
+    param_evals : int
+        The number of times the parameterized data was evaluated.
+    pattern : SparsityPattern or None
+        The fixed sparsity pattern of the matrix, if there is one.
     size : tuple
         The (rows, cols) dimensions of the matrix.
     """
 
-    def __init__(self, coo_tup, const_vec, constraints, x_length):
-        self.coo_tup = coo_tup
+    def __init__(self, coo_buf, const_vec, constraints, x_length):
+        self.coo_buf = coo_buf
         self.const_vec = const_vec
         self.constraints = constraints
         rows = sum([c.size[0] * c.size[1] for c in constraints])
         cols = x_length
         self.size = (rows, cols)
-        self.param_coo_tup = ([], [], [])
+        self.param_coo_buf = COOBuffer()
+        self.param_const_vec = None
+        self.param_constr = []
+        self.param_offsets = []
+        self.param_map = None
+        self.param_evals = 0
+        self.pattern = None
 
     def reset_param_data(self):
         """Clear old parameter data.
         """
-        self.param_coo_tup = ([], [], [])
+        self.param_coo_buf.clear()
+        self.param_const_vec = None
+
+    def has_stable_pattern(self):
+        """Is the sparsity pattern the same for all parameter values?
+        """
+        return not self.param_constr or self.param_map is not None
+
+    def __getstate__(self):
+        """Stores the constraints in a LinOpArena, as SymData does.
+        """
+        state = self.__dict__.copy()
+        state["_packed"], (state["constraints"], state["param_constr"]) = \
+            lo.constrs_to_arena([self.constraints, self.param_constr])
+        return state
+
+    def __setstate__(self, state):
+        """Rebuilds the constraints from the LinOpArena.
+        """
+        _, (state["constraints"], state["param_constr"]) = \
+            lo.constrs_from_arena(state.pop("_packed"),
+                                  [state["constraints"],
+                                   state["param_constr"]])
+        self.__dict__.update(state)
 
 
 class MatrixData(object):
@@ -138,12 +335,11 @@ class MatrixData(object):
             The number of columns in the matrix.
         Returns
         -------
-        ((V, I, J), array)
+        MatrixCache
         """
         rows = sum([c.size[0] * c.size[1] for c in constraints])
-        COO = ([], [], [])
         const_vec = self.vec_intf.zeros(rows, 1)
-        return MatrixCache(COO, const_vec, constraints, x_length)
+        return MatrixCache(COOBuffer(), const_vec, constraints, x_length)
 
     def _lin_matrix(self, mat_cache, caching=False):
         """Computes a matrix and vector representing a list of constraints.
@@ -160,21 +356,29 @@ class MatrixData(object):
         caching : bool
             Is the data being cached?
         """
-        active_constr = []
-        constr_offsets = []
-        vert_offset = 0
-        for constr in mat_cache.constraints:
-            # Process the constraint if it has a parameter and not caching
-            # or it doesn't have a parameter and caching.
-            has_param = len(lu.get_expr_params(constr.expr)) > 0
-            if (has_param and not caching) or (not has_param and caching):
-                # If parameterized, convert the parameters into constant nodes.
-                if has_param:
-                    constr = lu.copy_constr(constr,
+        if caching:
+            active_constr = []
+            constr_offsets = []
+            vert_offset = 0
+            for constr in mat_cache.constraints:
+                # Parameterized constraints are evaluated on every solve.
+                if lu.has_params(constr.expr):
+                    mat_cache.param_constr.append(constr)
+                    mat_cache.param_offsets.append(vert_offset)
+                else:
+                    active_constr.append(constr)
+                    constr_offsets.append(vert_offset)
+                vert_offset += constr.size[0]*constr.size[1]
+            coo_buf = mat_cache.coo_buf
+            vec = mat_cache.const_vec
+        else:
+            # Convert the parameters into constant nodes.
+            active_constr = [lu.copy_constr(constr,
                                             lu.replace_params_with_consts)
-                active_constr.append(constr)
-                constr_offsets.append(vert_offset)
-            vert_offset += constr.size[0]*constr.size[1]
+                             for constr in mat_cache.param_constr]
+            constr_offsets = mat_cache.param_offsets
+            coo_buf = mat_cache.param_coo_buf
+            vec = mat_cache.param_const_vec
         # Convert the constraints into a matrix and vector offset
         # and add them to the matrix cache.
         if len(active_constr) > 0:
@@ -183,12 +387,60 @@ class MatrixData(object):
                 self.sym_data.var_offsets,
                 constr_offsets
             )
-            # Convert the constant offset to the correct data type.
-            conv_vec = self.vec_intf.const_to_matrix(const_vec,
-                                                     convert_scalars=True)
-            mat_cache.const_vec[:const_vec.size] += conv_vec
-            for i, vals in enumerate([V, I, J]):
-                mat_cache.coo_tup[i].extend(vals)
+            self._add_to_cache(V, I, J, const_vec, coo_buf, vec)
+
+    def _add_to_cache(self, V, row_idx, col_idx, const_vec, coo_buf, vec):
+        """Adds a (V, I, J) triplet and a constant offset to a matrix cache.
+
+        Parameters
+        ----------
+        V, row_idx, col_idx : array
+            The entries of the matrix.
+        const_vec : array
+            The constant offset, as a column vector.
+        coo_buf : COOBuffer
+            The cached matrix entries.
+        vec : array
+            The cached vector offset.
+        """
+        # Convert the constant offset to the correct data type.
+        conv_vec = self.vec_intf.const_to_matrix(const_vec,
+                                                 convert_scalars=True)
+        vec[:const_vec.size] += conv_vec
+        coo_buf.extend(V, row_idx, col_idx)
+
+    def _param_matrix(self, mat_cache):
+        """Evaluates the parameterized constraints of a matrix cache.
+
+        The first evaluation walks the LinOp trees. On later evaluations
+        the constraints are compiled into a ParamMap if they are affine
+        in the parameters, and the ParamMap is used from then on.
+
+        Parameters
+        ----------
+        mat_cache : MatrixCache
+            The cached version of the matrix-vector pair.
+        """
+        mat_cache.reset_param_data()
+        mat_cache.param_const_vec = self.vec_intf.zeros(mat_cache.size[0], 1)
+        if not mat_cache.param_constr:
+            return
+        if mat_cache.param_evals == 1 and \
+           ParamMap.is_affine(mat_cache.param_constr):
+            param_map = ParamMap(mat_cache.param_constr,
+                                 mat_cache.param_offsets,
+                                 self.sym_data.var_offsets,
+                                 mat_cache.size)
+            if param_map.compiled:
+                mat_cache.param_map = param_map
+        mat_cache.param_evals += 1
+        if mat_cache.param_map is None:
+            self._lin_matrix(mat_cache)
+        else:
+            V, I, J, const_vec = mat_cache.param_map.evaluate()
+            self._add_to_cache(V, I, J, const_vec,
+                               mat_cache.param_coo_buf,
+                               mat_cache.param_const_vec)
 
     def _cache_to_matrix(self, mat_cache):
         """Converts the cached representation of the constraints matrix.
@@ -203,23 +455,35 @@ class MatrixData(object):
         A (matrix, vector) tuple.
         """
         # Get parameter values.
-        param_cache = self._init_matrix_cache(mat_cache.constraints,
-                                              mat_cache.size[0])
-        self._lin_matrix(param_cache)
+        self._param_matrix(mat_cache)
         rows, cols = mat_cache.size
         # Create the constraints matrix.
+        # If the sparsity pattern is fixed, compute the CSC structure once
+        # and only refresh the data array.
+        if mat_cache.pattern is None and mat_cache.has_stable_pattern():
+            mat_cache.pattern = SparsityPattern(mat_cache.coo_buf,
+                                                mat_cache.param_map,
+                                                mat_cache.size)
+        if mat_cache.pattern is not None:
+            param_vals = None
+            if mat_cache.param_map is not None:
+                param_vals = mat_cache.param_coo_buf.coo_tup[0]
+            matrix = mat_cache.pattern.to_csc(param_vals)
+            matrix = self.matrix_intf.const_to_matrix(matrix,
+                                                      convert_scalars=True)
+            combo_vec = mat_cache.const_vec + mat_cache.param_const_vec
+            return (matrix, -intf.from_2D_to_1D(combo_vec))
         # Combine the cached data with the parameter data.
-        V, I, J = mat_cache.coo_tup
-        Vp, Ip, Jp = param_cache.coo_tup
-        if len(V) + len(Vp) > 0:
-            matrix = sp.coo_matrix((V + Vp, (I + Ip, J + Jp)), (rows, cols))
+        V, I, J = COOBuffer.join([mat_cache.coo_buf, mat_cache.param_coo_buf])
+        if len(V) > 0:
+            matrix = sp.coo_matrix((V, (I, J)), (rows, cols))
             # Convert the constraints matrix to the correct type.
             matrix = self.matrix_intf.const_to_matrix(matrix,
                                                       convert_scalars=True)
         else:  # Empty matrix.
             matrix = self.matrix_intf.zeros(rows, cols)
         # Convert 2D ND arrays to 1D
-        combo_vec = mat_cache.const_vec + param_cache.const_vec
+        combo_vec = mat_cache.const_vec + mat_cache.param_const_vec
         const_vec = intf.from_2D_to_1D(combo_vec)
         return (matrix, -const_vec)
 
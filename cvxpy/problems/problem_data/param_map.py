@@ -0,0 +1,294 @@
+"""
+Copyright 2013 Steven Diamond
+
+This file is part of CVXPY.
+
+CVXPY is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CVXPY is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import cvxpy.interface as intf
+import cvxpy.lin_ops.lin_utils as lu
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+import canonInterface
+
+
+class ParamMap(object):
+    """A linear map from parameter values to parameterized constraint data.
+
+    If the coefficients of the constraints are affine in the parameters,
+    the nonzeros of the constraints matrix and the constant vector are
+    T*[1; theta], where theta stacks the (column-major) parameter values.
+    T is recorded once, so evaluating the constraints for new parameter
+    values is a sparse matrix-vector product with no LinOp tree walks.
+
+    Parameters that only appear as terms are compiled as extra variables,
+    since their coefficients are the columns of T. Parameters that
+    multiply other terms are compiled by probing one entry at a time.
+
+    Attributes
+    ----------
+    params : list
+        The parameters (or functions of parameters) stacked in theta.
+    param_offsets : list
+        The offset of each parameter in theta.
+    size : tuple
+        The (rows, cols) dimensions of the constraints matrix.
+    row_idx : array
+        The row indices of the nonzeros, in column-major order.
+    col_idx : array
+        The column indices of the nonzeros, in column-major order.
+    mat_map : SciPy CSR matrix
+        Maps [1; theta] to the values of the nonzeros.
+    vec_map : SciPy CSR matrix
+        Maps [1; theta] to the constant vector.
+    compiled : bool
+        Was the map recorded? False if probing would be too expensive.
+    """
+    # Upper bound on the number of entries generated while probing.
+    MAX_PROBE_NNZ = 10**7
+    # The number of probes converted into a matrix at once.
+    PROBE_BATCH = 256
+
+    def __init__(self, constraints, constr_offsets, var_offsets, size):
+        self.size = size
+        rows, cols = size
+        # Collect the parameter nodes, keyed on the wrapped parameter.
+        nodes = OrderedDict()
+        is_coeff = {}
+        param_constr = {}
+        for idx, constr in enumerate(constraints):
+            for node, coeff in lu.get_param_nodes(constr.expr):
+                key = id(node.data)
+                if key not in nodes:
+                    nodes[key] = node
+                    is_coeff[key] = False
+                    param_constr[key] = []
+                is_coeff[key] = is_coeff[key] or coeff
+                if not param_constr[key] or param_constr[key][-1] != idx:
+                    param_constr[key].append(idx)
+
+        self.params = [node.data for node in nodes.values()]
+        self.param_offsets = []
+        theta_offsets = {}
+        theta_length = 0
+        for key, node in nodes.items():
+            self.param_offsets.append(theta_length)
+            theta_offsets[key] = theta_length
+            theta_length += node.size[0]*node.size[1]
+        self.theta_length = theta_length
+
+        # Parameters that are only terms are replaced with variables
+        # placed after the true variables.
+        id_to_col = dict(var_offsets)
+        term_vars = {}
+        for key, node in nodes.items():
+            if not is_coeff[key]:
+                term_var = lu.create_var(node.size)
+                term_vars[key] = term_var
+                id_to_col[term_var.data] = cols + theta_offsets[key]
+
+        # Entries of T as (row, col, value) for the matrix and vector.
+        mat_entries = []
+        vec_entries = []
+        base_constr = [self._substitute(c, term_vars)
+                       for c in constraints]
+        V, row_idx, col_idx, const_vec = canonInterface.get_problem_matrix(
+            base_constr, id_to_col, constr_offsets)
+        row_idx = row_idx.astype(np.int64)
+        col_idx = col_idx.astype(np.int64)
+        const_vec = self._pad(const_vec, rows)
+        is_term = col_idx >= cols
+        base_keys = col_idx[~is_term]*rows + row_idx[~is_term]
+        base_vals = V[~is_term]
+        mat_entries.append((base_keys, 0, base_vals))
+        vec_entries.append((row_idx[is_term], 1 + col_idx[is_term] - cols,
+                            V[is_term]))
+        vec_rows = np.arange(rows, dtype=np.int64)
+        vec_entries.append((vec_rows, 0, const_vec))
+
+        # Probe the coefficient parameters one entry at a time.
+        constr_rows = [np.arange(offset, offset + c.size[0]*c.size[1])
+                       for c, offset in zip(constraints, constr_offsets)]
+        probe_nnz = 0
+        probes = []
+        for key, node in nodes.items():
+            if not is_coeff[key]:
+                continue
+            row_mask = np.zeros(rows, dtype=bool)
+            for idx in param_constr[key]:
+                row_mask[constr_rows[idx]] = True
+            local = row_mask[base_keys % rows]
+            base_local = (base_keys[local], base_vals[local])
+            vec_local = (vec_rows[row_mask], const_vec[row_mask])
+            entries = node.size[0]*node.size[1]
+            probe_nnz += entries*(len(base_local[0]) + 1)
+            if probe_nnz > self.MAX_PROBE_NNZ:
+                self.compiled = False
+                return
+            sub_constr = [constraints[idx] for idx in param_constr[key]]
+            sub_offsets = [constr_offsets[idx] for idx in param_constr[key]]
+            for k in range(entries):
+                probes.append((key, k, 1 + theta_offsets[key] + k, sub_constr,
+                               sub_offsets, base_local, vec_local))
+
+        for start in range(0, len(probes), self.PROBE_BATCH):
+            batch = probes[start:start + self.PROBE_BATCH]
+            self._run_probes(batch, id_to_col, term_vars,
+                             mat_entries, vec_entries)
+
+        # Fix the sparsity pattern in column-major order.
+        keys = np.concatenate([entry[0] for entry in mat_entries])
+        pattern, pos = np.unique(keys, return_inverse=True)
+        self.row_idx = pattern % rows
+        self.col_idx = pattern // rows
+        map_cols = np.concatenate([np.broadcast_arrays(entry[1], entry[0])[0]
+                                   for entry in mat_entries])
+        map_vals = np.concatenate([entry[2] for entry in mat_entries])
+        self.mat_map = sp.coo_matrix((map_vals, (pos, map_cols)),
+                                     (len(pattern), 1 + theta_length)).tocsr()
+        vec_rows = np.concatenate([entry[0] for entry in vec_entries])
+        vec_cols = np.concatenate([np.broadcast_arrays(entry[1], entry[0])[0]
+                                   for entry in vec_entries])
+        vec_vals = np.concatenate([entry[2] for entry in vec_entries])
+        self.vec_map = sp.coo_matrix((vec_vals, (vec_rows, vec_cols)),
+                                     (rows, 1 + theta_length)).tocsr()
+        self.compiled = True
+
+    @staticmethod
+    def is_affine(constraints):
+        """Are the constraints affine in their parameter nodes?
+
+        Parameters
+        ----------
+        constraints : list
+            A list of LinEqConstr/LinLeqConstr.
+
+        Returns
+        -------
+        bool
+        """
+        return all(lu.get_param_degree(c.expr) <= 1 for c in constraints)
+
+    def _run_probes(self, batch, id_to_col, term_vars,
+                    mat_entries, vec_entries):
+        """Evaluates a batch of probes and records the differences from
+           the base entries.
+
+        Each probe gets its own block of rows in a single matrix.
+        """
+        rows, cols = self.size
+        probe_constr = []
+        probe_offsets = []
+        for idx, (key, k, _, sub_constr, sub_offsets, _, _) in \
+                enumerate(batch):
+            for constr, offset in zip(sub_constr, sub_offsets):
+                probe_constr.append(self._substitute(constr, term_vars,
+                                                     (key, k)))
+                probe_offsets.append(idx*rows + offset)
+        V, row_idx, col_idx, const_vec = canonInterface.get_problem_matrix(
+            probe_constr, id_to_col, probe_offsets)
+        row_idx = row_idx.astype(np.int64)
+        col_idx = col_idx.astype(np.int64)
+        const_vec = self._pad(const_vec, len(batch)*rows)
+        # Drop the entries for the term parameters, which don't change.
+        keep = col_idx < cols
+        V, row_idx, col_idx = V[keep], row_idx[keep], col_idx[keep]
+        probe_idx = row_idx // rows
+        order = np.argsort(probe_idx, kind="mergesort")
+        bounds = np.searchsorted(probe_idx[order],
+                                 np.arange(len(batch) + 1))
+        for idx, (_, _, col, _, _, base_local, vec_local) in \
+                enumerate(batch):
+            sel = order[bounds[idx]:bounds[idx + 1]]
+            keys = col_idx[sel]*rows + row_idx[sel] % rows
+            mat_entries.append((keys, col, V[sel]))
+            mat_entries.append((base_local[0], col, -base_local[1]))
+            vec_rows, vec_vals = vec_local
+            probe_vec = const_vec[idx*rows + vec_rows]
+            vec_entries.append((vec_rows, col, probe_vec - vec_vals))
+
+    @staticmethod
+    def _pad(const_vec, length):
+        """Pads the constant vector from the canonicalizer with zeros.
+        """
+        padded = np.zeros(length)
+        padded[:const_vec.size] = const_vec.ravel()
+        return padded
+
+    @staticmethod
+    def _substitute(constr, term_vars, unit=None):
+        """Replaces the parameter nodes in a constraint.
+
+        Term parameters become variables and coefficient parameters
+        become zero, except for the probed entry.
+
+        Parameters
+        ----------
+        constr : LinConstraint
+            The constraint to modify.
+        term_vars : dict
+            A map of parameter key to the variable replacing it.
+        unit : tuple, optional
+            A (parameter key, entry index) pair for the entry set to one.
+
+        Returns
+        -------
+        LinConstraint
+        """
+        def replace(node):
+            key = id(node.data)
+            if key in term_vars:
+                return term_vars[key]
+            rows, cols = node.size
+            value = 1.0 if unit is not None and unit[0] == key else 0.0
+            if (rows, cols) == (1, 1):
+                return lu.create_const(value, node.size)
+            entries = [unit[1]] if value else []
+            mat = sp.coo_matrix(([value]*len(entries),
+                                 ([k % rows for k in entries],
+                                  [k // rows for k in entries])),
+                                (rows, cols))
+            return lu.create_const(mat, node.size, sparse=True)
+        return lu.copy_constr(constr,
+                              lambda expr: lu.replace_param_nodes(expr,
+                                                                  replace))
+
+    def get_theta(self):
+        """Returns [1; theta] for the current parameter values.
+        """
+        theta = np.empty(1 + self.theta_length)
+        theta[0] = 1
+        for param, offset in zip(self.params, self.param_offsets):
+            value = lu.check_param_val(param)
+            value = intf.DEFAULT_INTF.const_to_matrix(value,
+                                                      convert_scalars=True)
+            value = np.asarray(value).ravel(order="F")
+            theta[1 + offset:1 + offset + value.size] = value
+        return theta
+
+    def evaluate(self):
+        """Evaluates the constraints for the current parameter values.
+
+        Returns
+        -------
+        tuple
+            (V, I, J, const_vec), as returned by
+            canonInterface.get_problem_matrix.
+        """
+        theta = self.get_theta()
+        V = self.mat_map.dot(theta)
+        const_vec = self.vec_map.dot(theta).reshape(-1, 1)
+        return V, self.row_idx, self.col_idx, const_vec
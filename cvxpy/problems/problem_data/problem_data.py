@@ -29,9 +29,17 @@ class ProblemData(object):
         The numerical data for the problem.
     prev_result : dict
         The result of the last solve.
+    compress_leq : bool
+        Should redundant <= rows be removed before calling the solver?
+        Only set for the duration of a solve.
+    leq_compression : SciPy sparse matrix
+        The matrix that compressed the <= rows of the last problem data,
+        or None.
     """
 
     def __init__(self):
         self.sym_data = None
         self.matrix_data = None
         self.prev_result = None
+        self.compress_leq = False
+        self.leq_compression = None
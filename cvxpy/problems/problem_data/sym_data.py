@@ -25,6 +25,7 @@ from cvxpy.constraints import SOC, SDP, ExpCone, BoolConstr, IntConstr
 from toolz.itertoolz import unique
 from collections import OrderedDict
 import canonInterface
+import numpy as np
 
 
 class SymData(object):
@@ -135,8 +136,8 @@ class SymData(object):
         for key in [s.EQ, s.LEQ]:
             new_constraints = []
             for constr in constr_map[key]:
-                vars_ = lu.get_expr_vars(constr.expr)
-                if len(vars_) == 0 and not lu.get_expr_params(constr.expr):
+                summary = lu.get_expr_summary(constr.expr)
+                if len(summary.vars) == 0 and len(summary.params) == 0:
                     V, I, J, coeff = canonInterface.get_problem_matrix([constr])
                     is_pos, is_neg = intf.sign(coeff)
                     # For equality constraint, coeff must be zero.
@@ -171,6 +172,7 @@ class SymData(object):
         dims = {}
         dims[s.EQ_DIM] = sum(c.size[0]*c.size[1] for c in constr_map[s.EQ])
         dims[s.LEQ_DIM] = sum(c.size[0]*c.size[1] for c in constr_map[s.LEQ])
+        # Second-order cones are added as (count, cone_size) blocks.
         dims[s.SOC_DIM] = []
         dims[s.SDP_DIM] = []
         dims[s.EXP_DIM] = 0
@@ -182,6 +184,11 @@ class SymData(object):
                 for constr in constr_map[constr_type]:
                     constr.format(constr_map[s.EQ], constr_map[s.LEQ],
                                   dims, solver)
+        # Expand the blocks into the size of each cone.
+        blocks = dims[s.SOC_DIM]
+        if blocks:
+            counts, cone_sizes = zip(*blocks)
+            dims[s.SOC_DIM] = np.repeat(cone_sizes, counts).tolist()
 
         return dims
 
@@ -227,3 +234,34 @@ class SymData(object):
             vert_offset += var_size[0]*var_size[1]
 
         return (var_offsets, var_sizes, vert_offset)
+
+    def __getstate__(self):
+        """Stores the linear expressions in a single LinOpArena.
+
+        Pickling the arena does not recurse on deep expressions, and nodes
+        shared between the objective and the constraints stay shared.
+        Each linear constraint is replaced by its index in the arena.
+        """
+        state = self.__dict__.copy()
+        keys = list(self.constr_map.keys())
+        packed, ref_lists = lo.constrs_to_arena(
+            [self.constraints] + [self.constr_map[key] for key in keys],
+            [self.objective])
+        state["objective"] = None
+        state["constraints"] = ref_lists[0]
+        state["constr_map"] = dict(zip(keys, ref_lists[1:]))
+        state["_packed"] = packed
+        return state
+
+    def __setstate__(self, state):
+        """Rebuilds the linear expressions from the LinOpArena.
+        """
+        keys = list(state["constr_map"].keys())
+        exprs, constr_lists = lo.constrs_from_arena(
+            state.pop("_packed"),
+            [state["constraints"]] + [state["constr_map"][key]
+                                      for key in keys])
+        state["objective"] = exprs[0]
+        state["constraints"] = constr_lists[0]
+        state["constr_map"] = dict(zip(keys, constr_lists[1:]))
+        self.__dict__.update(state)
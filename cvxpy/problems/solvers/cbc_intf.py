@@ -99,6 +99,13 @@ class CBC(Solver):
         """
         return (constr_map[s.EQ] + constr_map[s.LEQ], [], [])
 
+    def leq_rows(self, data):
+        """Locates the <= constraints in the problem data.
+
+        The <= constraints follow the equality constraints in A.
+        """
+        return (s.A, s.B, data[s.DIMS][s.EQ_DIM])
+
     def solve(self, objective, constraints, cached_data,
               warm_start, verbose, solver_opts):
         """Returns the result of the call to the solver.
@@ -19,11 +19,13 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 
 import cvxpy.interface as intf
 import cvxpy.settings as s
-from cvxpy.problems.problem_data.compr_matrix import compress_matrix
+from cvxpy.problems.problem_data.compr_matrix import (
+    compress_leq, independent_rows)
 from cvxpy.problems.solvers.solver import Solver
 from cvxpy.problems.kktsolver import get_kktsolver
+import scipy.linalg
 import scipy.sparse as sp
-import scipy
+from scipy.sparse.linalg import splu
 import numpy as np
 import copy
 
@@ -135,6 +137,11 @@ class CVXOPT(Solver):
         """
         import cvxopt
         import cvxopt.solvers
+        # User chosen KKT solver option.
+        kktsolver = self.get_kktsolver_opt(solver_opts)
+        # remove_redundant_rows already compresses the <= rows.
+        if kktsolver != s.ROBUST_KKTSOLVER:
+            cached_data[self.name()].compress_leq = False
         data = super(CVXOPT, self).get_problem_data(objective, constraints,
                                                     cached_data)
         # Save old data in case need to use robust solver.
@@ -145,8 +152,6 @@ class CVXOPT(Solver):
                 data[s.DIMS][key] = [int(v) for v in val]
             else:
                 data[s.DIMS][key] = int(val)
-        # User chosen KKT solver option.
-        kktsolver = self.get_kktsolver_opt(solver_opts)
         # Cannot have redundant rows unless using robust LDL kktsolver.
         if kktsolver != s.ROBUST_KKTSOLVER:
             # Will detect infeasibility.
@@ -280,41 +285,21 @@ class CVXOPT(Solver):
         h = data[s.H]
         # Remove redundant rows in A.
         if A.shape[0] > 0:
-            # The pivoting improves robustness.
-            Q, R, P = scipy.linalg.qr(A.todense(), pivoting=True)
-            rows_to_keep = []
-            for i in range(R.shape[0]):
-                if np.linalg.norm(R[i, :]) > 1e-10:
-                    rows_to_keep.append(i)
-            R = R[rows_to_keep, :]
-            Q = Q[:, rows_to_keep]
-            # Invert P from col -> var to var -> col.
-            Pinv = np.zeros(P.size, dtype='int')
-            for i in range(P.size):
-                Pinv[P[i]] = i
-            # Rearrage R.
-            R = R[:, Pinv]
-            A = R
-            b_old = b
-            b = Q.T.dot(b)
-            # If b is not in the range of Q,
-            # the problem is infeasible.
-            if not np.allclose(b_old, Q.dot(b)):
+            A = sp.csr_matrix(A)
+            b = np.asarray(b).ravel()
+            try:
+                A, b, Q, feasible = CVXOPT._sparse_row_basis(A, b)
+            except RuntimeError:
+                A, b, Q, feasible = CVXOPT._dense_row_basis(A, b)
+            if not feasible:
                 return s.INFEASIBLE
             dims[s.EQ_DIM] = int(b.shape[0])
-            data["Q"] = intf.dense2cvxopt(Q)
+            data["Q"] = Q
         # Remove obviously redundant rows in G's <= constraints.
         if dims[s.LEQ_DIM] > 0:
-            G = G.tocsr()
-            G_leq = G[:dims[s.LEQ_DIM], :]
-            h_leq = h[:dims[s.LEQ_DIM]].ravel()
-            G_other = G[dims[s.LEQ_DIM]:, :]
-            h_other = h[dims[s.LEQ_DIM]:].ravel()
-            G_leq, h_leq, P_leq = compress_matrix(G_leq, h_leq)
-            dims[s.LEQ_DIM] = int(h_leq.shape[0])
+            G, h, P_leq = compress_leq(G, h, dims[s.LEQ_DIM])
+            dims[s.LEQ_DIM] = int(P_leq.shape[0])
             data["P_leq"] = intf.sparse2cvxopt(P_leq)
-            G = sp.vstack([G_leq, G_other])
-            h = np.hstack([h_leq, h_other])
         # Convert A, b, G, h to CVXOPT matrices.
         data[s.A] = A
         data[s.G] = G
@@ -322,6 +307,90 @@ class CVXOPT(Solver):
         data[s.H] = h
         return s.OPTIMAL
 
+    @staticmethod
+    def _sparse_row_basis(A, b, tol=1e-10):
+        """Selects independent rows of A x = b with sparse factorizations.
+
+        Parameters
+        ----------
+        A : SciPy CSR matrix
+            The equality constraints matrix.
+        b : NumPy 1D array
+            The equality constraints vector.
+        tol : float, optional
+            Relative tolerance for dependent rows.
+
+        Returns
+        -------
+        tuple
+            The reduced A and b, the CVXOPT matrix Q that maps the reduced
+            duals to the original constraints, and whether A x = b
+            is feasible.
+
+        Raises
+        ------
+        RuntimeError
+            If the rank of A cannot be determined reliably.
+        """
+        rows, cols = independent_rows(A, tol)
+        A_red = A[rows, :]
+        b_red = b[rows]
+        x = np.zeros(A.shape[1])
+        if rows.size > 0:
+            # Each selected row has its own pivot column, and the
+            # selected rows and pivot columns form a nonsingular matrix.
+            # Solve with those columns.
+            basis = A_red[:, cols].tocsc()
+            basis_lu = splu(basis)
+            # Two steps of iterative refinement.
+            x_basis = np.zeros(cols.size)
+            for _ in range(2):
+                residual = b_red - basis.dot(x_basis)
+                x_basis += basis_lu.solve(residual)
+            if not np.all(np.isfinite(x_basis)):
+                raise RuntimeError("The basic solution is not finite.")
+            x[cols] = x_basis
+        # If b is not in the range of A,
+        # the problem is infeasible.
+        feasible = np.allclose(A.dot(x), b)
+        Q = sp.coo_matrix((np.ones(rows.size),
+                           (rows, np.arange(rows.size))),
+                          (A.shape[0], rows.size))
+        return A_red, b_red, intf.sparse2cvxopt(Q), feasible
+
+    @staticmethod
+    def _dense_row_basis(A, b, tol=1e-10):
+        """Reduces A x = b to an equivalent system with a pivoted QR.
+
+        Parameters
+        ----------
+        A : SciPy sparse matrix
+            The equality constraints matrix.
+        b : NumPy 1D array
+            The equality constraints vector.
+        tol : float, optional
+            Absolute tolerance for the norms of the rows of R.
+
+        Returns
+        -------
+        tuple
+            The reduced A and b, the CVXOPT matrix Q that maps the reduced
+            duals to the original constraints, and whether A x = b
+            is feasible.
+        """
+        # The pivoting improves robustness.
+        Q, R, P = scipy.linalg.qr(A.toarray(), pivoting=True)
+        rows_to_keep = np.linalg.norm(R, axis=1) > tol
+        R = R[rows_to_keep, :]
+        Q = Q[:, rows_to_keep]
+        # Invert P from col -> var to var -> col.
+        R = R[:, np.argsort(P)]
+        b_red = Q.T.dot(b)
+        # If b is not in the range of Q,
+        # the problem is infeasible.
+        feasible = np.allclose(b, Q.dot(b_red))
+        return sp.csr_matrix(R), b_red, intf.dense2cvxopt(Q), feasible
+
     @staticmethod
     def _restore_solver_options(old_options):
         import cvxopt.solvers
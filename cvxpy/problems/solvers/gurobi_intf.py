@@ -21,8 +21,8 @@ import cvxpy.interface as intf
 import cvxpy.settings as s
 import cvxpy.lin_ops.lin_utils as lu
 import numpy as np
+import copy
 from cvxpy.problems.solvers.solver import Solver
-from scipy.sparse import dok_matrix
 
 
 class GUROBI(Solver):
@@ -88,12 +88,19 @@ class GUROBI(Solver):
         """
         return (constr_map[s.EQ] + constr_map[s.LEQ], [], [])
 
+    def leq_rows(self, data):
+        """Locates the <= constraints in the problem data.
+
+        The <= constraints follow the equality constraints in A.
+        """
+        return (s.A, s.B, data[s.DIMS][s.EQ_DIM])
+
     @staticmethod
     def _param_in_constr(constraints):
         """Do any of the constraints contain parameters?
         """
         for constr in constraints:
-            if len(lu.get_expr_params(constr.expr)) > 0:
+            if lu.has_params(constr.expr):
                 return True
         return False
 
@@ -128,17 +135,20 @@ class GUROBI(Solver):
 
         c = data[s.C]
         b = data[s.B]
-        A = dok_matrix(data[s.A])
-        # Save the dok_matrix.
+        A = data[s.A].tocsr()
+        A.sum_duplicates()
+        # Save the CSR matrix.
         data[s.A] = A
+        dims = data[s.DIMS]
 
         n = c.shape[0]
 
         solver_cache = cached_data[self.name()]
 
-        # TODO warmstart with SOC constraints.
-        if warm_start and solver_cache.prev_result is not None \
-           and len(data[s.DIMS][s.SOC_DIM]) == 0:
+        # The previous model can only be updated if the problem data
+        # has the same shape, e.g., no rows were compressed away.
+        if warm_start and solver_cache.prev_result is not None and \
+           self.same_structure(solver_cache.prev_result, c, A, b, dims):
             model = solver_cache.prev_result["model"]
             variables = solver_cache.prev_result["variables"]
             gur_constrs = solver_cache.prev_result["gur_constrs"]
@@ -147,12 +157,8 @@ class GUROBI(Solver):
             b_prev = solver_cache.prev_result["b"]
 
             # If there is a parameter in the objective, it may have changed.
-            if len(lu.get_expr_params(objective)) > 0:
-                c_diff = c - c_prev
-
-                I_unique = list(set(np.where(c_diff)[0]))
-
-                for i in I_unique:
+            if lu.has_params(objective):
+                for i in np.flatnonzero(c != c_prev):
                     variables[i].Obj = c[i]
             else:
                 # Stay consistent with Gurobi's representation of the problem
@@ -165,39 +171,8 @@ class GUROBI(Solver):
             # If there is a parameter in the constraints,
             # A or b may have changed.
             if self._param_in_constr(all_constrs):
-                A_diff = dok_matrix(A - A_prev)
-                b_diff = b - b_prev
-
-                # Figure out which rows of A and elements of b have changed
-                try:
-                    I, _ = zip(*[x for x in A_diff.iterkeys()])
-                except ValueError:
-                    I = []
-                I_unique = list(set(I) | set(np.where(b_diff)[0]))
-
-                nonzero_locs = gurobipy.tuplelist([x for x in A.iterkeys()])
-
-                # Update locations which have changed
-                for i in I_unique:
-
-                    # Remove old constraint if it exists
-                    if gur_constrs[i] is not None:
-                        model.remove(gur_constrs[i])
-                        gur_constrs[i] = None
-
-                    # Add new constraint
-                    if len(nonzero_locs.select(i, "*")) > 0:
-                        expr_list = []
-                        for loc in nonzero_locs.select(i, "*"):
-                            expr_list.append((A[loc], variables[loc[1]]))
-                        expr = gurobipy.LinExpr(expr_list)
-                        if i < data[s.DIMS][s.EQ_DIM]:
-                            ctype = gurobipy.GRB.EQUAL
-                        elif data[s.DIMS][s.EQ_DIM] <= i \
-                                < data[s.DIMS][s.EQ_DIM] + data[s.DIMS][s.LEQ_DIM]:
-                            ctype = gurobipy.GRB.LESS_EQUAL
-                        gur_constrs[i] = model.addConstr(expr, ctype, b[i])
-
+                self.update_model_lin_constrs(model, variables, gur_constrs,
+                                              dims, A, b, A_prev, b_prev)
                 model.update()
             else:
                 # Stay consistent with Gurobi's representation of the problem
@@ -226,25 +201,23 @@ class GUROBI(Solver):
                 )
             model.update()
 
-            nonzero_locs = gurobipy.tuplelist([x for x in A.iterkeys()])
             eq_constrs = self.add_model_lin_constr(model, variables,
-                                                   range(data[s.DIMS][s.EQ_DIM]),
+                                                   range(dims[s.EQ_DIM]),
                                                    gurobipy.GRB.EQUAL,
-                                                   nonzero_locs, A, b)
-            leq_start = data[s.DIMS][s.EQ_DIM]
-            leq_end = data[s.DIMS][s.EQ_DIM] + data[s.DIMS][s.LEQ_DIM]
+                                                   A, b)
+            leq_start = dims[s.EQ_DIM]
+            leq_end = dims[s.EQ_DIM] + dims[s.LEQ_DIM]
             ineq_constrs = self.add_model_lin_constr(model, variables,
                                                      range(leq_start, leq_end),
                                                      gurobipy.GRB.LESS_EQUAL,
-                                                     nonzero_locs, A, b)
+                                                     A, b)
             soc_start = leq_end
             soc_constrs = []
             new_leq_constrs = []
-            for constr_len in data[s.DIMS][s.SOC_DIM]:
+            for constr_len in dims[s.SOC_DIM]:
                 soc_end = soc_start + constr_len
                 soc_constr, new_leq, new_vars = self.add_model_soc_constr(
-                    model, variables, range(soc_start, soc_end),
-                    nonzero_locs, A, b
+                    model, variables, range(soc_start, soc_end), A, b
                 )
                 soc_constrs.append(soc_constr)
                 new_leq_constrs += new_leq
@@ -295,9 +268,33 @@ class GUROBI(Solver):
 
         return self.format_results(results_dict, data, cached_data)
 
+    @staticmethod
+    def row_expr(variables, mat, row):
+        """Returns the linear expression given by a row of a CSR matrix.
+
+        Parameters
+        ----------
+        variables : list
+            The problem variables.
+        mat : SciPy CSR matrix
+            The matrix representing the constraints.
+        row : int
+            The row of the matrix.
+
+        Returns
+        -------
+        GUROBI LinExpr
+            The expression, or None if the row is empty.
+        """
+        import gurobipy
+        start, end = mat.indptr[row], mat.indptr[row + 1]
+        if start == end:
+            return None
+        return gurobipy.LinExpr(mat.data[start:end].tolist(),
+                                [variables[j] for j in mat.indices[start:end]])
+
     def add_model_lin_constr(self, model, variables,
-                             rows, ctype,
-                             nonzero_locs, mat, vec):
+                             rows, ctype, mat, vec):
         """Adds EQ/LEQ constraints to the model using the data from mat and vec.
 
         Parameters
@@ -310,9 +307,7 @@ class GUROBI(Solver):
             The rows to be constrained.
         ctype : GUROBI constraint type
             The type of constraint.
-        nonzero_locs : GUROBI tuplelist
-            A list of all the nonzero locations.
-        mat : SciPy COO matrix
+        mat : SciPy CSR matrix
             The matrix representing the constraints.
         vec : NDArray
             The constant part of the constraints.
@@ -322,16 +317,11 @@ class GUROBI(Solver):
         list
             A list of constraints.
         """
-        import gurobipy
         constr = []
         for i in rows:
-            expr_list = []
-            for loc in nonzero_locs.select(i, "*"):
-                expr_list.append((mat[loc], variables[loc[1]]))
+            expr = self.row_expr(variables, mat, i)
             # Ignore empty constraints.
-            if len(expr_list) > 0:
-                expr = gurobipy.LinExpr(expr_list)
-
+            if expr is not None:
                 constr.append(
                     model.addConstr(expr, ctype, vec[i])
                 )
@@ -340,9 +330,13 @@ class GUROBI(Solver):
         return constr
 
     def add_model_soc_constr(self, model, variables,
-                             rows, nonzero_locs, mat, vec):
+                             rows, mat, vec):
         """Adds SOC constraint to the model using the data from mat and vec.
 
+        Each row i of the cone gets an auxiliary variable s_i and the linear
+        constraint s_i + mat[i, :]*x == vec[i], so the coefficients of mat
+        can later be updated in place.
+
         Parameters
         ----------
         model : GUROBI model
@@ -351,9 +345,7 @@ class GUROBI(Solver):
             The problem variables.
         rows : range
             The rows to be constrained.
-        nonzero_locs : GUROBI tuplelist
-            A list of all the nonzero locations.
-        mat : SciPy COO matrix
+        mat : SciPy CSR matrix
             The matrix representing the constraints.
         vec : NDArray
             The constant part of the constraints.
@@ -364,16 +356,6 @@ class GUROBI(Solver):
             A tuple of (QConstr, list of Constr, and list of variables).
         """
         import gurobipy
-        # Assume first expression (i.e. t) is nonzero.
-        lin_expr_list = []
-        soc_vars = []
-        for i in rows:
-            expr_list = []
-            for loc in nonzero_locs.select(i, "*"):
-                expr_list.append((mat[loc], variables[loc[1]]))
-            # Ignore empty constraints.
-            lin_expr_list.append(vec[i] - gurobipy.LinExpr(expr_list))
-
         # Make a variable and equality constraint for each term.
         soc_vars = [
             model.addVar(
@@ -395,9 +377,13 @@ class GUROBI(Solver):
         model.update()
 
         new_lin_constrs = []
-        for i, _ in enumerate(lin_expr_list):
+        for soc_var, i in zip(soc_vars, rows):
+            expr = gurobipy.LinExpr(soc_var)
+            row_expr = self.row_expr(variables, mat, i)
+            if row_expr is not None:
+                expr += row_expr
             new_lin_constrs += [
-                model.addConstr(soc_vars[i] == lin_expr_list[i])
+                model.addConstr(expr, gurobipy.GRB.EQUAL, vec[i])
             ]
 
         t_term = soc_vars[0]*soc_vars[0]
@@ -406,6 +392,116 @@ class GUROBI(Solver):
                 new_lin_constrs,
                 soc_vars)
 
+    @staticmethod
+    def same_structure(prev_result, c, A, b, dims):
+        """Checks whether the problem data has the shape of the previous data.
+
+        Parameters
+        ----------
+        prev_result : dict
+            The data the cached model was built with.
+        c : NDArray
+            The new objective vector.
+        A : SciPy CSR matrix
+            The new constraint matrix.
+        b : NDArray
+            The new constant part of the constraints.
+        dims : dict
+            The new dimensions of the cones.
+
+        Returns
+        -------
+        bool
+            True if the cached model can be updated in place.
+        """
+        return prev_result["c"].shape == c.shape and \
+            prev_result["A"].shape == A.shape and \
+            prev_result["b"].shape == b.shape and \
+            prev_result["dims"] == dims
+
+    @staticmethod
+    def changed_coeffs(mat, mat_prev):
+        """Finds the entries of mat that differ from mat_prev.
+
+        Parameters
+        ----------
+        mat : SciPy CSR matrix
+            The new matrix, in canonical format.
+        mat_prev : SciPy CSR matrix
+            The previous matrix, in canonical format.
+
+        Returns
+        -------
+        tuple
+            (rows, columns, new values) of the changed entries.
+        """
+        if np.array_equal(mat.indptr, mat_prev.indptr) and \
+           np.array_equal(mat.indices, mat_prev.indices):
+            # Same sparsity pattern, so compare the stored values directly.
+            idx = np.flatnonzero(mat.data != mat_prev.data)
+            rows = np.repeat(np.arange(mat.shape[0]), np.diff(mat.indptr))
+            return rows[idx], mat.indices[idx], mat.data[idx]
+        diff = (mat - mat_prev).tocoo()
+        keep = diff.data != 0
+        rows, cols = diff.row[keep], diff.col[keep]
+        vals = np.asarray(mat[rows, cols]).ravel()
+        return rows, cols, vals
+
+    def update_model_lin_constrs(self, model, variables, gur_constrs,
+                                 dims, mat, vec, mat_prev, vec_prev):
+        """Updates the linear constraints of the model in place.
+
+        Changed coefficients are set with chgCoeff and changed constants
+        through the RHS attribute. This covers the linear rows that feed
+        the SOC constraints.
+
+        Parameters
+        ----------
+        model : GUROBI model
+            The problem model.
+        variables : list
+            The problem variables.
+        gur_constrs : list
+            The GUROBI constraints, which are updated in place.
+        dims : dict
+            The dimensions of the cones.
+        mat : SciPy CSR matrix
+            The new constraint matrix.
+        vec : NDArray
+            The new constant part of the constraints.
+        mat_prev : SciPy CSR matrix
+            The constraint matrix the model was built with.
+        vec_prev : NDArray
+            The constant part the model was built with.
+        """
+        import gurobipy
+        rows, cols, vals = self.changed_coeffs(mat, mat_prev)
+        vec_rows = np.flatnonzero(vec != vec_prev)
+        # The linear constraints for the SOC rows come after the QConstrs.
+        lin_end = dims[s.EQ_DIM] + dims[s.LEQ_DIM]
+        offset = len(dims[s.SOC_DIM])
+
+        def constr_idx(i):
+            return i if i < lin_end else i + offset
+
+        # Empty EQ/LEQ rows have no constraint yet, so add one instead.
+        added = []
+        for i in np.union1d(rows, vec_rows):
+            if gur_constrs[constr_idx(i)] is None:
+                if i < dims[s.EQ_DIM]:
+                    ctype = gurobipy.GRB.EQUAL
+                else:
+                    ctype = gurobipy.GRB.LESS_EQUAL
+                gur_constrs[constr_idx(i)], = self.add_model_lin_constr(
+                    model, variables, [i], ctype, mat, vec)
+                added.append(i)
+
+        keep = ~np.in1d(rows, added)
+        for i, j, val in zip(rows[keep], cols[keep], vals[keep]):
+            model.chgCoeff(gur_constrs[constr_idx(i)], variables[j], val)
+        for i in np.setdiff1d(vec_rows, added):
+            gur_constrs[constr_idx(i)].RHS = vec[i]
+
     def format_results(self, results_dict, data, cached_data):
         """Converts the solver output into standard form.
 
@@ -433,6 +529,7 @@ class GUROBI(Solver):
                 "c": data[s.C],
                 "A": data[s.A],
                 "b": data[s.B],
+                "dims": copy.deepcopy(dims),
             }
         new_results = {}
         new_results[s.STATUS] = results_dict['status']
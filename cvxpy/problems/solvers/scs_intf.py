@@ -18,6 +18,7 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import cvxpy.settings as s
+import cvxpy.utilities.tri_utils as tri_utils
 from cvxpy.problems.solvers.ecos_intf import ECOS
 import numpy as np
 
@@ -69,6 +70,13 @@ class SCS(ECOS):
         """
         return (constr_map[s.EQ] + constr_map[s.LEQ], [], [])
 
+    def leq_rows(self, data):
+        """Locates the <= constraints in the problem data.
+
+        The <= constraints follow the equality constraints in A.
+        """
+        return (s.A, s.B, data[s.DIMS][s.EQ_DIM])
+
     def solve(self, objective, constraints, cached_data,
               warm_start, verbose, solver_opts):
         """Returns the result of the call to the solver.
@@ -102,7 +110,9 @@ class SCS(ECOS):
         scs_args = {"c": data[s.C], "A": data[s.A], "b": data[s.B]}
         # If warm_starting, add old primal and dual variables.
         solver_cache = cached_data[self.name()]
-        if warm_start and solver_cache.prev_result is not None:
+        # The number of rows changes if the <= rows are compressed.
+        if warm_start and solver_cache.prev_result is not None and \
+           solver_cache.prev_result["y"].size == data[s.A].shape[0]:
             scs_args["x"] = solver_cache.prev_result["x"]
             scs_args["y"] = solver_cache.prev_result["y"]
             scs_args["s"] = solver_cache.prev_result["s"]
@@ -174,13 +184,4 @@ class SCS(ECOS):
         """Expands n*(n+1)//2 lower triangular to full matrix,
         with off-diagonal entries scaled by 1/sqrt(2).
         """
-        full = np.zeros((n, n))
-        for col in range(n):
-            for row in range(col, n):
-                idx = row - col + n*(n+1)//2 - (n-col)*(n-col+1)//2
-                if row != col:
-                    full[row, col] = lower_tri[idx]/np.sqrt(2)
-                    full[col, row] = lower_tri[idx]/np.sqrt(2)
-                else:
-                    full[row, col] = lower_tri[idx]
-        return np.reshape(full, n*n, order='F')
+        return tri_utils.tri_to_full(lower_tri, n)
@@ -22,6 +22,8 @@ from cvxpy.error import SolverError
 import cvxpy.settings as s
 from cvxpy.problems.problem_data.matrix_data import MatrixData
 from cvxpy.problems.problem_data.sym_data import SymData
+from cvxpy.problems.problem_data.compr_matrix import compress_leq
+import numpy as np
 
 
 class Solver(object):
@@ -240,8 +242,54 @@ class Solver(object):
                                                    sym_data.var_sizes)
         data[s.BOOL_IDX] = bool_idx
         data[s.INT_IDX] = int_idx
+        prob_data = cached_data[self.name()]
+        prob_data.leq_compression = None
+        if prob_data.compress_leq and data[s.DIMS][s.LEQ_DIM] > 0:
+            mat, vec, offset = self.leq_rows(data)
+            data[mat], data[vec], P = compress_leq(data[mat], data[vec],
+                                                   data[s.DIMS][s.LEQ_DIM],
+                                                   offset)
+            data[s.DIMS][s.LEQ_DIM] = int(P.shape[0])
+            prob_data.leq_compression = P
         return data
 
+    def leq_rows(self, data):
+        """Locates the <= constraints in the problem data.
+
+        Parameters
+        ----------
+        data : dict
+            The arguments needed for the solver.
+
+        Returns
+        -------
+        tuple
+            (key of the matrix, key of the vector, index of the first row)
+        """
+        return (s.G, s.H, 0)
+
+    @staticmethod
+    def expand_leq_duals(results_dict, cached_data, solver_name):
+        """Maps the duals of compressed <= rows back to the original rows.
+
+        The removed rows get a dual value of zero.
+
+        Parameters
+        ----------
+        results_dict : dict
+            The solver output in standard form.
+        cached_data : dict
+            A map of solver name to cached problem data.
+        solver_name : str
+            The name of the solver that produced the output.
+        """
+        P = cached_data[solver_name].leq_compression
+        if P is not None and results_dict.get(s.INEQ_DUAL) is not None:
+            dual = np.asarray(results_dict[s.INEQ_DUAL]).ravel()
+            leq_dual = P.T.dot(dual[:P.shape[0]])
+            results_dict[s.INEQ_DUAL] = np.hstack([leq_dual,
+                                                   dual[P.shape[0]:]])
+
     def nonlin_constr(self):
         """Returns whether nonlinear constraints are needed.
         """
@@ -919,3 +919,90 @@ class TestAtoms(BaseTest):
         c[0] = -1
         self.assertAlmostEqual(expr.value, 3)
         assert expr.is_dcp()
+
+    def test_curvature_computed_once(self):
+        """Test that curvature and sign are stored on each atom.
+        """
+        calls = []
+        exprs = [abs(self.x[0] + i) for i in range(200)]
+        for expr in exprs:
+            expr.is_atom_convex = lambda: calls.append(1) or True
+        prob = Problem(Minimize(sum(exprs)))
+        self.assertTrue(prob.is_dcp())
+        num_calls = len(calls)
+        self.assertEqual(num_calls, len(exprs))
+        self.assertTrue(prob.is_dcp())
+        self.assertEqual(len(calls), num_calls)
+        for expr in exprs:
+            self.assertTrue(expr.is_positive())
+            self.assertFalse(expr.is_negative())
+        # Equality constraints check is_affine, which needs is_constant.
+        expr = sum(exprs)
+        variables = expr.variables
+        expr.variables = lambda: calls.append(1) or variables()
+        prob = Problem(Minimize(0), [expr == 0])
+        self.assertFalse(prob.is_dcp())
+        num_calls = len(calls)
+        self.assertFalse(prob.is_dcp())
+        self.assertEqual(len(calls), num_calls)
+        self.assertEqual(expr.curvature, s.CONVEX)
+        num_calls = len(calls)
+        self.assertEqual(expr.curvature, s.CONVEX)
+        self.assertEqual(len(calls), num_calls)
+
+    def test_value_cached(self):
+        """Test that atom values are reused until a leaf value changes.
+        """
+        from cvxpy.atoms.atom import evaluate
+        calls = []
+        shared = abs(self.x)
+        numeric = shared.numeric
+        shared.numeric = lambda values: calls.append(1) or numeric(values)
+        p = Parameter()
+        exprs = [sum_entries(shared), p*max_entries(shared), shared + 1]
+        self.x.value = [1, -2]
+        p.value = 2
+        vals = evaluate(exprs)
+        self.assertAlmostEqual(vals[0], 3)
+        self.assertAlmostEqual(vals[1], 4)
+        self.assertItemsAlmostEqual(vals[2], [2, 3])
+        self.assertEqual(len(calls), 1)
+        self.assertAlmostEqual(exprs[0].value, 3)
+        self.assertEqual(len(calls), 1)
+
+        # Changing any variable or parameter value invalidates the values.
+        p.value = 3
+        self.assertAlmostEqual(exprs[1].value, 6)
+        self.x.value = [3, 0]
+        self.assertItemsAlmostEqual(exprs[2].value, [4, 1])
+        self.assertItemsAlmostEqual(shared.value, [3, 0])
+        self.assertEqual(len(calls), 3)
+
+        # Changing a returned value does not change the cached value.
+        val = exprs[2].value
+        val += 100
+        self.assertItemsAlmostEqual(exprs[2].value, [4, 1])
+
+        # Leaf values can be changed in place, then assigned again.
+        q = Parameter(2)
+        q.value = [1, 2]
+        self.assertItemsAlmostEqual((q + 1).value, [2, 3])
+        q.value[0] = 10
+        q.value = q.value
+        self.assertItemsAlmostEqual((q + 1).value, [11, 3])
+        self.x.value[0] = 5
+        self.x.value = self.x.value
+        self.assertItemsAlmostEqual((self.x + 1).value, [6, 1])
+        # Leaf values do not change through the array they were assigned from.
+        new_val = np.matrix([[1.], [2.]])
+        q.value = new_val
+        new_val[0] = 10
+        self.assertItemsAlmostEqual((q + 1).value, [2, 3])
+        self.x.value = new_val
+        new_val[0] = 20
+        self.assertItemsAlmostEqual((self.x + 1).value, [11, 3])
+
+        # Values after a solve.
+        prob = Problem(Minimize(sum_entries(shared)), [self.x >= 1])
+        prob.solve()
+        self.assertAlmostEqual(exprs[0].value, 2)
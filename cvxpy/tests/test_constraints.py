@@ -232,6 +232,23 @@ class TestConstraints(BaseTest):
         constr = SOC(scalar_exp, [exp])
         self.assertEqual(constr.size, (3, 1))
 
+    def test_format_elemwise(self):
+        """Test interleaving the elementwise cones.
+        """
+        from cvxpy.constraints.utilities import format_elemwise
+        from cvxpy.lin_ops.tree_mat import mul
+        x, y, z = [Variable(2, 2) for _ in range(3)]
+        vals = {var.id: np.reshape(np.arange(4) + 10*i, (2, 2), order='F')
+                for i, var in enumerate([x, y, z])}
+        args = [var.canonical_form[0] for var in [x, y, z]]
+        constr = format_elemwise(args)[0]
+        self.assertEqual(constr.size, (6, 2))
+        result = mul(constr.expr, vals)
+        interleaved = np.array([[0, 10, 20, 1, 11, 21],
+                                [2, 12, 22, 3, 13, 23]]).T
+        # The constraint is stored as -expr <= 0.
+        self.assertItemsAlmostEqual(result, -interleaved)
+
     def test_chained_constraints(self):
         """Tests that chaining constraints raises an error.
         """
@@ -159,3 +159,115 @@ class test_lin_ops(BaseTest):
         self.assertEqual(expr.size, (1, 1))
         self.assertEqual(len(expr.args), 1)
         self.assertEqual(expr.type, lo.SUM_ENTRIES)
+
+    def test_deep_expr(self):
+        """Test getting vars and params from a very deep expression.
+        """
+        size = (1, 1)
+        x = create_var(size)
+        P = Parameter()
+        param = create_param(P, size)
+        expr = mul_expr(param, x, size)
+        for _ in range(5*sys.getrecursionlimit()):
+            expr = sum_expr([expr, create_const(1.0, size)])
+        self.assertEqual(get_expr_vars(expr), [(x.data, size)])
+        self.assertEqual(get_expr_params(expr), [P])
+        self.assertTrue(has_params(expr))
+        self.assertEqual(get_param_nodes(expr), [(param, True)])
+        self.assertEqual(get_param_degree(expr), 1)
+        self.assertEqual(get_param_degree(mul_expr(param, expr, size)), 2)
+        self.assertEqual(get_param_degree(div_expr(x, expr)), np.inf)
+        self.assertFalse(has_params(x))
+        summary = get_expr_summary(expr)
+        self.assertEqual(summary.vars, ((x.data, size),))
+        self.assertEqual(summary.params, (P,))
+
+    def test_arena(self):
+        """Test storing LinOps in flat arrays.
+        """
+        import copy
+        import pickle
+        from cvxpy.lin_ops.lin_arena import LinOpArena, to_arena, from_arena
+        size = (2, 2)
+        x = create_var(size)
+        A = create_const(np.ones(size), size)
+        prod = mul_expr(A, x, size)
+        # prod is shared between the two trees.
+        expr = sum_expr([prod, neg_expr(prod)])
+        arena = LinOpArena.from_lin_ops([expr, prod])
+        self.assertEqual(len(arena), 5)
+        self.assertEqual(arena.opcodes[arena.roots[0]], OPCODES[SUM])
+        new_expr, new_prod = arena.to_lin_ops()
+        self.assertEqual(new_expr.type, SUM)
+        self.assertEqual(new_expr.size, size)
+        self.assertIs(new_expr.args[0], new_prod)
+        self.assertIs(new_expr.args[1].args[0], new_prod)
+        self.assertEqual(new_prod.data.type, DENSE_CONST)
+        self.assertItemsAlmostEqual(new_prod.data.data, np.ones(size))
+        self.assertEqual(new_prod.args[0].data, x.data)
+
+        # Pickling and copying the arena of a deep tree does not recurse.
+        for _ in range(5*sys.getrecursionlimit()):
+            expr = neg_expr(expr)
+        arena = to_arena([expr, prod])
+        for new_arena in [pickle.loads(pickle.dumps(arena)),
+                          copy.deepcopy(arena)]:
+            new_expr, new_prod = from_arena(new_arena)
+            self.assertEqual(get_expr_vars(new_expr), [(x.data, size)]*2)
+            node = new_expr
+            while node.type == NEG:
+                node = node.args[0]
+            self.assertIs(node.args[0], new_prod)
+        # LinOps pickle on their own as well.
+        self.assertEqual(pickle.loads(pickle.dumps(x)), x)
+
+    def test_lin_op_node(self):
+        """Test the compact LinOp node.
+        """
+        x = create_var((2, 1))
+        expr = neg_expr(x)
+        self.assertEqual(expr.opcode, OPCODES[NEG])
+        self.assertTrue(expr.type is NEG)
+        self.assertFalse(hasattr(expr, "__dict__"))
+        self.assertEqual(expr, LinOp(NEG, (2, 1), [x], None))
+        self.assertNotEqual(expr, LinOp(NEG, (2, 1), [neg_expr(x)], None))
+        with self.assertRaises(KeyError):
+            LinOp("unknown", (2, 1), [], None)
+
+    def test_sym_data_pickle(self):
+        """Test pickling the symbolic data of a problem.
+        """
+        import pickle
+        import cvxpy.settings as s
+        from cvxpy import Variable, Problem, Minimize, norm
+        from cvxpy.problems.problem_data.sym_data import SymData
+        from cvxpy.problems.solvers.utilities import SOLVERS
+        x = Variable(2)
+        prob = Problem(Minimize(norm(x)), [x >= 1, x[0] == 2])
+        objective, constraints = prob.canonicalize()
+        sym_data = SymData(objective, constraints, SOLVERS[s.ECOS])
+        new_data = pickle.loads(pickle.dumps(sym_data))
+        self.assertEqual(new_data.dims, sym_data.dims)
+        self.assertEqual(new_data.var_offsets, sym_data.var_offsets)
+        self.assertEqual(len(new_data.constraints), len(constraints))
+        for key, constr_list in sym_data.constr_map.items():
+            new_list = new_data.constr_map[key]
+            self.assertEqual([type(c) for c in new_list],
+                             [type(c) for c in constr_list])
+        # The constraint map refers to the same constraint objects
+        # as the list of constraints.
+        def shared(data):
+            ids = {id(c) for c in data.constraints}
+            lin_constrs = data.constr_map[s.EQ] + data.constr_map[s.LEQ]
+            return [id(c) in ids for c in lin_constrs]
+        self.assertEqual(shared(new_data), shared(sym_data))
+        self.assertTrue(any(shared(new_data)))
+        self.assertEqual(new_data.objective, sym_data.objective)
+
+        # The matrix caches store their constraints in arenas as well.
+        prob.solve(solver=s.ECOS)
+        mat_cache = prob._cached_data[s.ECOS].matrix_data.ineq_cache
+        new_cache = pickle.loads(pickle.dumps(mat_cache))
+        self.assertEqual([c.expr for c in new_cache.constraints],
+                         [c.expr for c in mat_cache.constraints])
+        self.assertEqual(new_cache.size, mat_cache.size)
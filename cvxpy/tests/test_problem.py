@@ -88,6 +88,18 @@ class TestProblem(BaseTest):
         else:
             self.assertCountEqual(vars_, ref)
 
+        # The variables are cached in order of first appearance.
+        self.assertEqual(vars_, ref)
+        vars_.append(self.y)
+        self.assertEqual(p.variables(), ref)
+        # Replacing a constraint invalidates the cache.
+        p.constraints[1] = self.b <= 2
+        self.assertEqual(p.variables(), [self.a, self.x, self.b])
+        p.constraints.append(self.y >= 0)
+        self.assertEqual(p.variables(), [self.a, self.x, self.b, self.y])
+        p.objective = Minimize(self.z[0])
+        self.assertEqual(p.variables(), [self.z, self.a, self.x, self.b, self.y])
+
     def test_parameters(self):
         """Test the parameters method.
         """
@@ -169,6 +181,14 @@ class TestProblem(BaseTest):
         ref = max(p3.size)
         self.assertEqual(max_data_dim, ref)
 
+        # The metrics are computed on first access and after the
+        # constraints change.
+        p = Problem(Minimize(self.a), [self.a >= 1])
+        self.assertEqual(p._size_metrics, None)
+        self.assertEqual(p.size_metrics.num_scalar_leq_constr, 1)
+        p.constraints.append(self.x <= 1)
+        self.assertEqual(p.size_metrics.num_scalar_leq_constr, 3)
+
     def test_solver_stats(self):
         """Test the solver_stats method.
         """
@@ -200,6 +220,11 @@ class TestProblem(BaseTest):
         self.assertEqual(data["A"].shape, (0, 3))
         self.assertEqual(data["G"].shape, (3, 3))
 
+        # Blocks of same-size cones.
+        expr = sum_entries(norm(self.C, 2, axis=1)) + norm(Variable(4))
+        data = Problem(Minimize(expr)).get_problem_data(s.ECOS)
+        self.assertEqual(sorted(data["dims"]["q"]), [3, 3, 3, 5])
+
         if s.CVXOPT in installed_solvers():
             import cvxopt
             data = Problem(Minimize(norm(self.x) + 3)).get_problem_data(s.CVXOPT)
@@ -400,6 +425,18 @@ class TestProblem(BaseTest):
         result = prob.solve(method="test")
         self.assertEqual(result, (0, 4))
 
+        # Shared subexpressions are only canonicalized into constraints once.
+        exp = abs(self.x - 1)
+        prob = Problem(Minimize(sum_entries(exp) + max_entries(exp)),
+                       [exp <= 3, exp + self.x <= 4])
+        _, constraints = prob.canonicalize()
+        constr_ids = [c.constr_id for c in constraints]
+        self.assertEqual(len(constr_ids), len(set(constr_ids)))
+        # Two for abs, one for max_entries and the two dual holders.
+        self.assertEqual(len(constraints), 2 + 1 + 2)
+        obj, constraints = exp.canonical_form
+        self.assertEqual(len(constraints), 2)
+
     # Test the is_dcp method.
     def test_is_dcp(self):
         p = Problem(Minimize(normInf(self.a)))
@@ -496,6 +533,16 @@ class TestProblem(BaseTest):
         # the first separable problem.
         self.assertTrue(len(problem._separable_problems) == 2)
 
+        # The worker pool is reused and sees new parameter values.
+        pool = problem._pool
+        p.value = 2
+        result = problem.solve(parallel=True)
+        self.assertAlmostEqual(result, 7.0)
+        self.assertTrue(problem._pool is pool)
+        self.assertAlmostEqual(problem.constraints[0].dual_value, 4, places=3)
+        self.assertAlmostEqual(problem.constraints[1].dual_value, 2, places=3)
+        p.value = 1
+
         # Ensure that parallel solver works with options.
         result = problem.solve(parallel=True, verbose=True, warm_start=True)
         self.assertAlmostEqual(result, 6.0)
@@ -507,10 +554,60 @@ class TestProblem(BaseTest):
         problem.objective = Minimize(square(self.a) + square(self.b))
         result = problem.solve(parallel=True)
         self.assertAlmostEqual(result, 5.0)
+        self.assertFalse(problem._pool is pool)
         self.assertEqual(problem.status, s.OPTIMAL)
         self.assertAlmostEqual(self.a.value, 1)
         self.assertAlmostEqual(self.b.value, 2)
 
+        # Closing the problem shuts down the workers.
+        pool = problem._pool
+        problem.close()
+        self.assertTrue(problem._pool is None)
+        with self.assertRaises(ValueError):
+            pool.map(abs, [1])
+        with problem:
+            result = problem.solve(parallel=True)
+            self.assertAlmostEqual(result, 5.0)
+            self.assertFalse(problem._pool is None)
+        self.assertTrue(problem._pool is None)
+
+        # The workers are shut down when the problem is garbage collected.
+        problem.solve(parallel=True)
+        finalizer = problem._pool_finalizer
+        self.assertTrue(finalizer.alive)
+        del problem
+        import gc
+        gc.collect()
+        self.assertFalse(finalizer.alive)
+
+    def test_separable_terms(self):
+        """Test the components of separable problems.
+        """
+        from cvxpy.transforms import get_separable_problems, SeparableTerms
+        problem = Problem(Minimize(square(self.a) + square(self.b) + norm(self.x) + 1),
+                          [self.b >= 2, self.a >= 1])
+        terms = SeparableTerms()
+        subproblems = get_separable_problems(problem, terms)
+        self.assertEqual(len(subproblems), 3)
+        self.assertEqual(terms.components(), [[0, 4], [1, 3], [2]])
+        self.assertTrue(terms.matches(problem))
+
+        # Appended constraints are merged into the components.
+        parent = terms._parent
+        problem.constraints.append(self.a + self.x[0] <= 5)
+        self.assertFalse(terms.matches(problem))
+        subproblems = get_separable_problems(problem, terms)
+        self.assertTrue(terms._parent is parent)
+        self.assertEqual(terms.components(), [[0, 2, 4, 5], [1, 3]])
+        self.assertEqual(len(subproblems), 2)
+        self.assertEqual(len(subproblems[0].constraints), 2)
+
+        # Replaced constraints rebuild the components.
+        problem.constraints[2] = self.b + self.x[0] <= 5
+        subproblems = get_separable_problems(problem, terms)
+        self.assertEqual(terms.components(), [[0, 4], [1, 2, 3, 5]])
+        self.assertAlmostEqual(sum(p.solve() for p in subproblems), problem.solve())
+
     # Test scalar LP problems.
     def test_scalar_lp(self):
         p = Problem(Minimize(3*self.a), [self.a >= 2])
@@ -680,6 +777,101 @@ class TestProblem(BaseTest):
             p.solve()
         self.assertEqual(str(cm.exception), "Problem has missing parameter value.")
 
+    def test_param_map(self):
+        """Test that re-solves with a compiled parameter map match fresh solves.
+        """
+        A = Parameter(3, 2)
+        b = Parameter(3)
+        gamma = Parameter(sign="positive")
+        def make_prob():
+            return Problem(Minimize(sum_squares(A*self.x - b) + gamma*norm(self.x, 1)),
+                           [self.x >= -2*b[0:2], self.x <= 5])
+        prob = make_prob()
+        numpy.random.seed(0)
+        for i in range(4):
+            A.value = numpy.random.randn(3, 2)
+            b.value = numpy.random.randn(3, 1)
+            gamma.value = i + 1
+            result = prob.solve(solver=s.ECOS)
+            x_val = self.x.value
+            fresh = make_prob()
+            self.assertAlmostEqual(result, fresh.solve(solver=s.ECOS))
+            self.assertItemsAlmostEqual(x_val, self.x.value)
+            data = prob.get_problem_data(s.ECOS)
+            fresh_data = make_prob().get_problem_data(s.ECOS)
+            for key in [s.C, s.A, s.G, s.H]:
+                self.assertItemsAlmostEqual(intf.DEFAULT_INTF.const_to_matrix(data[key]),
+                                            intf.DEFAULT_INTF.const_to_matrix(fresh_data[key]))
+        ineq_cache = prob._cached_data[s.ECOS].matrix_data.ineq_cache
+        self.assertNotEqual(ineq_cache.param_map, None)
+        # The CSC structure is shared between solves, but not with
+        # the matrices returned by get_problem_data.
+        pattern = ineq_cache.pattern
+        self.assertTrue(numpy.shares_memory(pattern.to_csc().indices,
+                                            pattern.indices))
+        self.assertFalse(pattern.indices.flags.writeable)
+        A.value = numpy.random.randn(3, 2)
+        new_data = prob.get_problem_data(s.ECOS)
+        self.assertFalse(numpy.shares_memory(new_data[s.G].indices, data[s.G].indices))
+        self.assertFalse(numpy.shares_memory(new_data[s.G].indptr, pattern.indptr))
+        # Changing the returned matrix in place does not affect later solves.
+        new_data[s.G].indices[:] = 0
+        new_data[s.G].indptr[:] = 0
+        data[s.G].data[:] = 0
+        data[s.G].eliminate_zeros()
+        result = prob.solve(solver=s.ECOS)
+        self.assertAlmostEqual(result, make_prob().solve(solver=s.ECOS))
+
+        # Constraints dividing by a parameter are not compiled.
+        prob = Problem(Minimize(gamma*self.a), [self.a/gamma >= 1])
+        self.assertAlmostEqual(prob.solve(solver=s.ECOS), 16)
+        gamma.value = 2
+        self.assertAlmostEqual(prob.solve(solver=s.ECOS), 4)
+        gamma.value = 3
+        self.assertAlmostEqual(prob.solve(solver=s.ECOS), 9)
+        ineq_cache = prob._cached_data[s.ECOS].matrix_data.ineq_cache
+        self.assertEqual(ineq_cache.param_map, None)
+
+    def test_solve_batch(self):
+        """Test solving a problem for many parameter values.
+        """
+        b = Parameter(2)
+        gamma = Parameter(sign="positive")
+        prob = Problem(Minimize(sum_squares(self.x - b) + gamma*norm(self.x, 1)),
+                       [self.x <= 1])
+        numpy.random.seed(0)
+        param_values = [{b: numpy.random.randn(2, 1), gamma: i + 1}
+                        for i in range(5)]
+        # The last problem is infeasible.
+        infeas = Problem(Minimize(gamma*self.a), [self.a >= b[0], self.a <= b[1]])
+        gamma.value = 7
+        for processes in [None, 2]:
+            batch = prob.solve_batch(param_values, solver=s.ECOS,
+                                     processes=processes)
+            self.assertEqual(gamma.value, 7)
+            self.assertEqual(batch.primal_values[self.x].shape, (5, 2, 1))
+            for i, vals in enumerate(param_values):
+                b.value = vals[b]
+                gamma.value = vals[gamma]
+                result = prob.solve(solver=s.ECOS)
+                self.assertEqual(batch.statuses[i], s.OPTIMAL)
+                self.assertAlmostEqual(batch.values[i], result)
+                self.assertItemsAlmostEqual(batch.primal_values[self.x][i],
+                                            self.x.value)
+            gamma.value = 7
+
+        batch = infeas.solve_batch([{b: [0, 1]}, {b: [1, 0]}], solver=s.ECOS)
+        self.assertEqual(batch.statuses, [s.OPTIMAL, s.INFEASIBLE])
+        self.assertAlmostEqual(batch.values[0], 0)
+        self.assertEqual(batch.values[1], numpy.inf)
+        self.assertTrue(numpy.isnan(batch.primal_values[self.a][1, 0, 0]))
+
+        # No variables reach the solver.
+        zero = Problem(Minimize(0*sum_entries(self.x) + gamma))
+        batch = zero.solve_batch([{gamma: 1}, {gamma: 2}], solver=s.ECOS)
+        self.assertItemsAlmostEqual(batch.values, [1, 2])
+        self.assertItemsAlmostEqual(batch.primal_values[self.x], numpy.zeros((2, 2, 1)))
+
     # Test problems with normInf
     def test_normInf(self):
         # Constant argument.
@@ -692,6 +884,7 @@ class TestProblem(BaseTest):
         result = p.solve()
         self.assertAlmostEqual(result, 2)
         self.assertAlmostEqual(self.a.value, 2)
+        self.assertTrue(type(self.a.value) is float)
 
         p = Problem(Minimize(3*normInf(self.a + 2*self.b) + self.c),
                     [self.a >= 2, self.b <= -1, self.c == 3])
@@ -864,6 +1057,21 @@ class TestProblem(BaseTest):
                 self.assertItemsAlmostEqual(p.constraints[1].dual_value, 4*[0], places=acc)
                 self.assertItemsAlmostEqual(p.constraints[2].dual_value, 6*[0], places=acc)
 
+    def test_save_duals(self):
+        """Test skipping the dual values.
+        """
+        p = Problem(Minimize(sum_entries(self.A)), [self.A >= [[1, 2], [3, 4]]])
+        p.solve(solver=s.ECOS)
+        self.assertItemsAlmostEqual(p.constraints[0].dual_value, 4*[1])
+        # Values are matrices in column-major order.
+        self.assertTrue(isinstance(self.A.value, numpy.matrix))
+        self.assertItemsAlmostEqual(self.A.value, [1, 2, 3, 4])
+        self.assertAlmostEqual(self.A.value[0, 1], 3)
+        result = p.solve(solver=s.ECOS, save_duals=False)
+        self.assertAlmostEqual(result, 10)
+        self.assertItemsAlmostEqual(self.A.value, [1, 2, 3, 4])
+        self.assertEqual(p.constraints[0].dual_value, None)
+
     # Test problems with indexing.
     def test_indexing(self):
         # Vector variables
@@ -924,6 +1132,50 @@ class TestProblem(BaseTest):
         self.assertAlmostEqual(result, 1)
         self.assertItemsAlmostEqual(self.x.value, [1, 1])
 
+    def test_coo_buffer(self):
+        """Test the growable triplet buffer used for the matrix caches.
+        """
+        from cvxpy.problems.problem_data.matrix_data import COOBuffer
+        # Empty buffers.
+        empty = COOBuffer()
+        self.assertEqual(len(empty), 0)
+        empty.extend([], [], [])
+        for arr in empty.coo_tup:
+            self.assertEqual(arr.size, 0)
+        for arr in COOBuffer.join([]) + COOBuffer.join([empty, COOBuffer()]):
+            self.assertEqual(arr.size, 0)
+
+        # Growth past the initial capacity keeps the earlier entries.
+        buf = COOBuffer()
+        total = 0
+        for chunk in [3, COOBuffer.MIN_CHUNK, 2*COOBuffer.MIN_CHUNK + 1]:
+            vals = numpy.arange(total, total + chunk)
+            buf.extend(vals, 2*vals, 3*vals)
+            total += chunk
+        self.assertEqual(len(buf), total)
+        V, I, J = buf.coo_tup
+        self.assertItemsAlmostEqual(V, numpy.arange(total))
+        self.assertItemsAlmostEqual(I, 2*numpy.arange(total))
+        self.assertItemsAlmostEqual(J, 3*numpy.arange(total))
+        self.assertEqual(V.dtype, numpy.float64)
+        self.assertEqual(I.dtype, numpy.int64)
+
+        # Joining several buffers, skipping empty ones.
+        other = COOBuffer()
+        other.extend([-1., -2.], [7, 8], [9, 10])
+        V, I, J = COOBuffer.join([buf, empty, other])
+        self.assertItemsAlmostEqual(V, list(range(total)) + [-1, -2])
+        self.assertItemsAlmostEqual(I[-2:], [7, 8])
+        self.assertItemsAlmostEqual(J[-2:], [9, 10])
+        V, I, J = COOBuffer.join([empty, other])
+        self.assertItemsAlmostEqual(V, [-1, -2])
+
+        # Clearing keeps the allocated buffers for reuse.
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+        buf.extend([5.], [1], [2])
+        self.assertItemsAlmostEqual(buf.coo_tup[0], [5])
+
     # Test problems with slicing.
     def test_slicing(self):
         p = Problem(Maximize(sum_entries(self.C)), [self.C[1:3, :] <= 2, self.C[0, :] == 1])
@@ -1135,6 +1387,111 @@ class TestProblem(BaseTest):
         result = p.solve(solver=s.ECOS)
         self.assertAlmostEqual(result, 0)
 
+        if s.CVXOPT in installed_solvers():
+            obj = Minimize(sum_entries(self.x))
+            constraints = [self.x == 2, self.x == 2, self.x.T == 2,
+                           self.x[0] == 2]
+            p = Problem(obj, constraints)
+            result = p.solve(solver=s.CVXOPT)
+            self.assertAlmostEqual(result, 4)
+            duals = sum(numpy.sum(c.dual_value) for c in constraints)
+            self.assertAlmostEqual(duals, -2)
+
+            # Rows dependent through a combination of other rows.
+            constraints = [self.x[0] + self.x[1] == 3, self.x[0] == 1,
+                           self.x[1] == 2]
+            p = Problem(obj, constraints)
+            result = p.solve(solver=s.CVXOPT)
+            self.assertAlmostEqual(result, 3)
+            constraints[0] = self.x[0] + self.x[1] == 4
+            p = Problem(obj, constraints)
+            p.solve(solver=s.CVXOPT)
+            self.assertEqual(p.status, s.INFEASIBLE)
+
+    def test_independent_rows(self):
+        """Test selecting a basis of the rows of an equality system.
+        """
+        from cvxpy.problems.problem_data.compr_matrix import independent_rows
+        from cvxpy.problems.solvers.cvxopt_intf import CVXOPT
+        import scipy.sparse as sp
+        numpy.random.seed(0)
+        base = numpy.random.randn(4, 6)
+        combos = numpy.random.randn(3, 4)
+        A = numpy.vstack([base, combos.dot(base), 1e-3*base[:1]])
+        rows, cols = independent_rows(sp.csr_matrix(A))
+        self.assertEqual(rows.size, 4)
+        self.assertEqual(numpy.linalg.matrix_rank(A[rows][:, cols]), 4)
+        # A variable shared by every row.
+        n = 50
+        A_shared = numpy.hstack([numpy.ones((n, 1)), numpy.eye(n)])
+        A_shared = numpy.vstack([A_shared, A_shared[:5].sum(axis=0)])
+        rows, cols = independent_rows(sp.csr_matrix(A_shared))
+        self.assertItemsAlmostEqual(rows, numpy.arange(n))
+        self.assertEqual(numpy.linalg.matrix_rank(A_shared[rows][:, cols]), n)
+        # The sparse path and the dense fallback agree.
+        if s.CVXOPT not in installed_solvers():
+            return
+        b = A.dot(numpy.ones(6))
+        for row_basis in [CVXOPT._sparse_row_basis, CVXOPT._dense_row_basis]:
+            A_red, b_red, Q, feasible = row_basis(sp.csr_matrix(A), b)
+            self.assertTrue(feasible)
+            self.assertEqual(A_red.shape[0], 4)
+            self.assertEqual(numpy.linalg.matrix_rank(
+                numpy.vstack([A_red.todense(), A])), 4)
+            b[0] += 1
+            self.assertFalse(row_basis(sp.csr_matrix(A), b)[3])
+            b[0] -= 1
+
+    def test_compress_leq(self):
+        """Test removing redundant inequality constraints before solving.
+        """
+        from cvxpy.problems.problem_data.compr_matrix import compress_matrix
+        import scipy.sparse as sp
+        G = sp.csr_matrix(numpy.array([[-1, 0], [0, -1], [-2, 0], [2, 0],
+                                       [0, -2], [-1, 0], [0, 0]]))
+        h = numpy.array([-2, -2, -4, 4, -3, -1, 1])
+        G_compr, h_compr, P = compress_matrix(G, h)
+        # Negative multiples, multiples with a different h and empty rows
+        # with h < 0 are kept.
+        self.assertItemsAlmostEqual(G_compr.todense(),
+                                    G[[0, 1, 3, 4, 5]].todense())
+        self.assertItemsAlmostEqual(h_compr, [-2, -2, 4, -3, -1])
+        self.assertItemsAlmostEqual((P*G).todense(), G_compr.todense())
+        # Explicit zeros are not used to scale the rows.
+        G_zeros = sp.csr_matrix((numpy.array([0., 1., 0., 2.]),
+                                 numpy.array([0, 1, 0, 1]),
+                                 numpy.array([0, 2, 4])), (2, 2))
+        G_compr, h_compr, P = compress_matrix(G_zeros, numpy.array([1, 2]))
+        self.assertItemsAlmostEqual(G_compr.todense(), [0, 1])
+        self.assertItemsAlmostEqual(h_compr, [1])
+
+        constraints = [self.x >= 2, 2*self.x >= 4, self.x[0] >= 1]
+        p = Problem(Minimize(sum_entries(self.x)), constraints)
+        for solver in [s.ECOS, s.SCS]:
+            result = p.solve(solver=solver, compress_leq=True)
+            self.assertAlmostEqual(result, 4, places=3)
+            self.assertItemsAlmostEqual(constraints[0].dual_value, [1, 1],
+                                        places=3)
+            self.assertItemsAlmostEqual(constraints[1].dual_value, [0, 0],
+                                        places=3)
+        result = p.solve(solver=s.SCS, warm_start=True)
+        self.assertAlmostEqual(result, 4, places=3)
+
+        # The flag does not carry over to later calls.
+        p.solve(solver=s.ECOS, compress_leq=True)
+        self.assertEqual(p.get_problem_data(s.ECOS)[s.G].shape[0], 5)
+        result = p.solve(solver=s.ECOS)
+        self.assertAlmostEqual(result, 4, places=3)
+        self.assertTrue(p._cached_data[s.ECOS].leq_compression is None)
+
+        # CVXOPT compresses the <= rows itself.
+        if s.CVXOPT in installed_solvers():
+            result = p.solve(solver=s.CVXOPT, compress_leq=True)
+            self.assertAlmostEqual(result, 4, places=3)
+            self.assertTrue(p._cached_data[s.CVXOPT].leq_compression is None)
+            self.assertItemsAlmostEqual(constraints[0].dual_value, [1, 1],
+                                        places=3)
+
     # Test that symmetry is enforced.
     def test_sdp_symmetry(self):
         # TODO should these raise exceptions?
@@ -188,6 +188,22 @@ class TestSCS(BaseTest):
         # TODO Probably a bad check. Ought to be the same.
         assert prob.solve(solver=SCS, warm_start=True, verbose=True) != result
 
+    def test_tri_to_full(self):
+        """Test the scaled lower triangular format of SDP cones.
+        """
+        from cvxpy.utilities import tri_utils
+        M = np.array([[1., 2.], [2., 3.]])
+        tri = tri_utils.scaled_lower_tri(2).dot(M.ravel(order='F'))
+        self.assertItemsAlmostEqual(tri, [1, 2*np.sqrt(2), 3], places=8)
+        self.assertItemsAlmostEqual(tri_utils.tri_to_full(tri, 2), M, places=8)
+        # Round trip for a larger matrix.
+        np.random.seed(0)
+        M = np.random.randn(5, 5)
+        M = M + M.T
+        vec = M.ravel(order='F')
+        tri = tri_utils.scaled_lower_tri(5).dot(vec)
+        self.assertItemsAlmostEqual(tri_utils.tri_to_full(tri, 5), vec, places=8)
+
     # def test_kl_div(self):
     #     """Test the kl_div atom.
     #     """
@@ -525,6 +525,123 @@ class TestSolvers(BaseTest):
                 prob.solve(solver=GUROBI, warm_start=True)
             self.assertEqual(str(cm.exception), "The solver %s is not installed." % GUROBI)
 
+    def test_gurobi_warm_start_socp(self):
+        """Make sure that warm starting Gurobi updates SOC constraints.
+        """
+        if GUROBI in installed_solvers():
+            import numpy as np
+
+            A = Parameter(2, 2)
+            b = Parameter(2)
+            A.value = np.eye(2)
+            b.value = np.array([3, 4])
+
+            prob = Problem(Minimize(norm(A*self.x - b)), [self.x[0] <= 1])
+            result = prob.solve(solver=GUROBI, warm_start=True)
+            self.assertAlmostEqual(result, 2)
+            self.assertItemsAlmostEqual(self.x.value, [1, 4])
+
+            A.value = 2*np.eye(2)
+            b.value = np.array([6, 2])
+            result = prob.solve(solver=GUROBI, warm_start=True)
+            self.assertAlmostEqual(result, 4)
+            self.assertItemsAlmostEqual(self.x.value, [1, 1])
+
+    def test_gurobi_changed_coeffs(self):
+        """Test finding the changed entries of the constraint matrix.
+        """
+        import numpy as np
+        import scipy.sparse as sp
+        from cvxpy.problems.solvers.gurobi_intf import GUROBI as GUROBI_SOLVER
+        A = sp.csr_matrix(np.array([[1., 0, 2], [0, 3, 0]]))
+        # Same sparsity pattern.
+        B = sp.csr_matrix(np.array([[1., 0, 5], [0, 3, 0]]))
+        rows, cols, vals = GUROBI_SOLVER.changed_coeffs(B, A)
+        self.assertItemsAlmostEqual(rows, [0])
+        self.assertItemsAlmostEqual(cols, [2])
+        self.assertItemsAlmostEqual(vals, [5])
+        rows, cols, vals = GUROBI_SOLVER.changed_coeffs(A, A)
+        self.assertEqual(len(rows), 0)
+        # Different sparsity pattern, including an entry set to zero.
+        C = sp.csr_matrix(np.array([[1., 4, 0], [0, 3, 0]]))
+        rows, cols, vals = GUROBI_SOLVER.changed_coeffs(C, A)
+        self.assertItemsAlmostEqual(rows, [0, 0])
+        self.assertItemsAlmostEqual(cols, [1, 2])
+        self.assertItemsAlmostEqual(vals, [4, 0])
+
+    def test_gurobi_update_model(self):
+        """Test updating a cached Gurobi model in place, with a mock model.
+        """
+        import sys
+        import types
+        import numpy as np
+        import scipy.sparse as sp
+        import cvxpy.settings as s
+        from cvxpy.problems.solvers.gurobi_intf import GUROBI as GUROBI_SOLVER
+
+        class MockConstr(object):
+            def __init__(self, expr, rhs):
+                self.expr = expr
+                self.RHS = rhs
+
+        class MockModel(object):
+            def __init__(self):
+                self.coeffs = []
+
+            def addConstr(self, expr, ctype, rhs):
+                return MockConstr(expr, rhs)
+
+            def chgCoeff(self, constr, var, val):
+                self.coeffs.append((constr, var, val))
+
+        class MockGRB(object):
+            EQUAL = "="
+            LESS_EQUAL = "<"
+
+        gurobipy = types.ModuleType("gurobipy")
+        gurobipy.GRB = MockGRB
+        gurobipy.LinExpr = lambda coeffs, variables: list(zip(coeffs,
+                                                              variables))
+        old_module = sys.modules.get("gurobipy")
+        sys.modules["gurobipy"] = gurobipy
+        try:
+            dims = {s.EQ_DIM: 1, s.LEQ_DIM: 2, s.SOC_DIM: [2]}
+            A_prev = sp.csr_matrix(np.array([[1., 0], [0, 0], [2, 1],
+                                             [1, 0], [0, 1]]))
+            b_prev = np.array([1., 0, 2, 0, 0])
+            A = sp.csr_matrix(np.array([[3., 0], [0, 1], [2, 1],
+                                        [1, 0], [0, 5]]))
+            b = np.array([1., 4, 2, 0, 6])
+            model = MockModel()
+            variables = ["x0", "x1"]
+            qconstr = "socp"
+            gur_constrs = [MockConstr(None, 1), None, MockConstr(None, 2),
+                           qconstr, MockConstr(None, 0),
+                           MockConstr(None, 0)]
+            solver = GUROBI_SOLVER()
+            prev_result = {"c": np.zeros(2), "A": A_prev, "b": b_prev,
+                           "dims": dims}
+            self.assertTrue(solver.same_structure(prev_result, np.zeros(2),
+                                                  A, b, dims))
+            self.assertFalse(solver.same_structure(prev_result, np.zeros(2),
+                                                   A[1:], b[1:], dims))
+            solver.update_model_lin_constrs(model, variables, gur_constrs,
+                                            dims, A, b, A_prev, b_prev)
+        finally:
+            if old_module is None:
+                del sys.modules["gurobipy"]
+            else:
+                sys.modules["gurobipy"] = old_module
+        # The empty LEQ row gets a new constraint.
+        self.assertEqual(gur_constrs[1].expr, [(1., "x1")])
+        self.assertEqual(gur_constrs[1].RHS, 4)
+        # The SOC rows are shifted past the QConstr.
+        self.assertIs(gur_constrs[3], qconstr)
+        self.assertEqual(model.coeffs, [(gur_constrs[0], "x0", 3),
+                                        (gur_constrs[5], "x1", 5)])
+        self.assertEqual(gur_constrs[5].RHS, 6)
+        self.assertEqual(gur_constrs[4].RHS, 0)
+
     def test_installed_solvers(self):
         """Test the list of installed solvers.
         """
@@ -19,7 +19,8 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 
 from cvxpy import *
 import cvxpy.settings as s
-from cvxpy.lin_ops.tree_mat import mul, tmul, prune_constants
+from cvxpy.lin_ops.tree_mat import (mul, tmul, prune_constants, get_coeff,
+                                    get_conv_kernel, CoeffCache)
 import cvxpy.problems.iterative as iterative
 from cvxpy.problems.solvers.utilities import SOLVERS
 from cvxpy.problems.problem_data.sym_data import SymData
@@ -243,6 +244,18 @@ class test_tree_mat(BaseTest):
         prod = mul(pruned[0].expr, {x.id: 1})
         self.assertItemsAlmostEqual(prod, np.zeros(A.shape[0]))
 
+        # The original constraints are not modified and unchanged
+        # subtrees are shared.
+        constraints = (A*x + 2 <= 2).canonical_form[1]
+        expr = constraints[0].expr
+        num_args = len(expr.args)
+        pruned = prune_constants(constraints)
+        self.assertEqual(len(expr.args), num_args)
+        self.assertIsNot(pruned[0].expr, expr)
+        self.assertEqual(pruned[0].expr.type, expr.type)
+        self.assertEqual(len(pruned[0].expr.args), 1)
+        self.assertIs(pruned[0].expr.args[0], expr.args[0])
+
     def test_mul_funcs(self):
         """Test functions to multiply by A, A.T
         """
@@ -271,3 +284,136 @@ class test_tree_mat(BaseTest):
         self.assertItemsAlmostEqual(A.T*vec, result)
         ATmul(vec, result)
         self.assertItemsAlmostEqual(2*A.T*vec, result)
+
+    def test_coeff_cache(self):
+        """Test caching the coefficients of operators.
+        """
+        x = Variable(2)
+        A = np.matrix("1 2; 3 4")
+        expr = (A*x).canonical_form[0]
+        cache = CoeffCache()
+        coeff = get_coeff(expr, cache=cache)
+        self.assertTrue(get_coeff(expr, cache=cache) is coeff)
+        self.assertItemsAlmostEqual(get_coeff(expr, True, True, cache), A.T)
+
+        # Coefficients are evaluated again when a parameter changes.
+        P = Parameter(2, 2)
+        P.value = A
+        expr = (P*x).canonical_form[0]
+        val_dict = {x.id: np.mat(np.ones((2, 1)))}
+        self.assertItemsAlmostEqual(mul(expr, val_dict), A*np.ones((2, 1)))
+        self.assertItemsAlmostEqual(tmul(expr, np.mat([[1], [0]]))[x.id], [1, 2])
+        P.value = -2*A
+        self.assertItemsAlmostEqual(mul(expr, val_dict), -2*A*np.ones((2, 1)))
+        self.assertItemsAlmostEqual(mul(expr, val_dict, True), 2*A*np.ones((2, 1)))
+        self.assertItemsAlmostEqual(tmul(expr, np.mat([[1], [0]]))[x.id], [-2, -4])
+        coeff = get_coeff(expr, cache=cache)
+        self.assertTrue(get_coeff(expr, cache=cache) is coeff)
+        P.value = 3*A
+        self.assertItemsAlmostEqual(get_coeff(expr, cache=cache), 3*A)
+        self.assertItemsAlmostEqual(mul(expr, val_dict, cache=cache),
+                                    3*A*np.ones((2, 1)))
+
+    def test_mul_plan(self):
+        """Test the compiled plan against the constraints matrix.
+        """
+        x = Variable(3)
+        X = Variable(2, 3)
+        y = Variable()
+        np.random.seed(0)
+        A = np.random.randn(2, 3)
+        constraints = [A*x + X[:, 1] == 1,
+                       X.T[1:, :] >= y,
+                       sum_entries(X) - 2*y <= x[0]/4,
+                       diag(x[0:2]) + X[:, 0:2] <= 0,
+                       conv([1, 2], x) >= -x[2],
+                       X[[1, 0], [2, 2]] <= x[[0, 2]]]
+        prob = Problem(Minimize(sum_entries(x)), constraints)
+        mat = prob.get_problem_data(solver=SCS)["A"].todense()
+        objective, constraints = prob.canonicalize()
+        sym_data = SymData(objective, constraints, SOLVERS[SCS])
+        # The rows of the matrix are ordered by constraint type.
+        constraints = sym_data.constr_map[s.EQ] + sym_data.constr_map[s.LEQ]
+        sym_data.constraints = prune_constants(constraints)
+        Amul, ATmul = iterative.get_mul_funcs(sym_data)
+        rows, cols = mat.shape
+        for func, size in [(Amul, (rows, cols)), (ATmul, (cols, rows))]:
+            plan_mat = np.zeros(size)
+            for i in range(size[1]):
+                vec = np.zeros(size[1])
+                vec[i] = 1
+                func(vec, plan_mat[:, i])
+            if func is ATmul:
+                plan_mat = plan_mat.T
+            self.assertItemsAlmostEqual(plan_mat, mat)
+        # Absolute values.
+        vec = np.arange(cols) - 2.0
+        result = np.zeros(rows)
+        Amul(vec, result, is_abs=True)
+        self.assertItemsAlmostEqual(result, np.abs(mat).dot(np.abs(vec)))
+
+    def test_conv_kernel(self):
+        """Test the cached spectrum of convolution kernels.
+        """
+        np.random.seed(1)
+        f = np.random.randn(4)
+        x = Variable(7)
+        expr = conv(f, x).canonical_form[0]
+        cache = CoeffCache()
+        kernel = get_conv_kernel(expr, cache=cache)
+        self.assertTrue(get_conv_kernel(expr, cache=cache) is kernel)
+        self.assertTrue(kernel.fft_len >= 10)
+        # A batch of right-hand sides.
+        X = np.random.randn(7, 3)
+        result = kernel.mul(X)
+        self.assertEqual(result.shape, (10, 3))
+        for j in range(3):
+            self.assertItemsAlmostEqual(result[:, j], np.convolve(f, X[:, j]))
+        # The transpose is the adjoint of the convolution.
+        Y = np.random.randn(10, 3)
+        result = kernel.tmul(Y)
+        self.assertEqual(result.shape, (7, 3))
+        self.assertItemsAlmostEqual(X.T.dot(result), kernel.mul(X).T.dot(Y))
+        # Absolute values.
+        abs_kernel = get_conv_kernel(expr, True)
+        self.assertItemsAlmostEqual(abs_kernel.mul(X[:, 0]),
+                                    np.convolve(np.abs(f), X[:, 0]))
+
+        # One kernel convolved with arguments of different lengths.
+        c = Constant(f)
+        y = Variable(9)
+        prob = Problem(Minimize(sum_entries(x) + sum_entries(y)),
+                       [conv(c, x) >= 0, conv(c, y) <= 1])
+        mat = prob.get_problem_data(solver=SCS)["A"]
+        objective, constraints = prob.canonicalize()
+        sym_data = SymData(objective, constraints, SOLVERS[SCS])
+        constraints = sym_data.constr_map[s.EQ] + sym_data.constr_map[s.LEQ]
+        sym_data.constraints = prune_constants(constraints)
+        Amul, ATmul = iterative.get_mul_funcs(sym_data)
+        vec = np.arange(mat.shape[1], dtype=float)
+        result = np.zeros(mat.shape[0])
+        Amul(vec, result)
+        self.assertItemsAlmostEqual(result, mat.dot(vec))
+        vec = np.arange(mat.shape[0], dtype=float)
+        result = np.zeros(mat.shape[1])
+        ATmul(vec, result)
+        self.assertItemsAlmostEqual(result, mat.T.dot(vec))
+
+    def test_gather(self):
+        """Test selecting entries with lists and boolean arrays.
+        """
+        X = Variable(3, 4)
+        A = np.reshape(np.arange(12.0), (3, 4), order='F')
+        val_dict = {X.id: A}
+        keys = [([2, 0, 1], [3, 3, 0]), A >= 7, (1, [0, 2, 3])]
+        for key in keys:
+            expr = X[key]
+            lin_op = expr.canonical_form[0]
+            result = mul(lin_op, val_dict)
+            self.assertEqual(result.shape, expr.size)
+            self.assertItemsAlmostEqual(result, np.atleast_1d(A[key]))
+            # The transpose scatters the entries back.
+            result_dict = tmul(lin_op, result)
+            scattered = np.zeros((3, 4))
+            scattered[key] = A[key]
+            self.assertItemsAlmostEqual(result_dict[X.id], scattered)
@@ -18,5 +18,6 @@ along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 from cvxpy.transforms.partial_optimize import partial_optimize
-from cvxpy.transforms.separable_problems import get_separable_problems
+from cvxpy.transforms.separable_problems import (get_separable_problems,
+                                                 SeparableTerms)
 from cvxpy.transforms.linearize import linearize
@@ -281,7 +281,7 @@ class PartialProblem(Expression):
         """
         # Canonical form for objective and problem switches from minimize
         # to maximize.
-        obj, constrs = self._prob.objective.args[0].canonical_form
-        for cons in self._prob.constraints:
-            constrs += cons.canonical_form[1]
+        obj = self._prob.objective.args[0].canonical_node[0]
+        constrs = u.canonical_constraints([self._prob.objective.args[0]] +
+                                          self._prob.constraints)
         return (obj, constrs)
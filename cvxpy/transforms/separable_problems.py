@@ -21,77 +21,179 @@ from cvxpy.problems.problem import Problem
 from cvxpy.expressions import cvxtypes
 from cvxpy.expressions.constants import Constant
 
-import itertools
-from scipy.sparse import dok_matrix, csgraph
 
+class SeparableTerms(object):
+    """The connected components of a problem's objective terms and constraints.
 
-def get_separable_problems(problem):
+    Two terms are connected if they share a variable. The components are
+    tracked with a union-find structure over the terms, so building them
+    is nearly linear in the number of (term, variable) pairs. Constraints
+    appended to the problem are merged into the existing components.
+
+    Attributes
+    ----------
+    objective : Minimize or Maximize
+        The objective the terms were taken from.
+    constraints : list
+        The constraints that have been added.
+    obj_terms : list
+        The non-constant terms in the objective.
+    constant_terms : list
+        The constant terms in the objective.
+    """
+
+    def __init__(self):
+        self.objective = None
+        self.constraints = []
+        self.obj_terms = []
+        self.constant_terms = []
+        # Union-find parent of each term.
+        self._parent = []
+        # Map of variable id to the first term containing the variable.
+        self._var_terms = {}
+
+    def matches(self, problem):
+        """Were the terms built from the problem's objective and constraints?
+        """
+        return (problem.objective is self.objective and
+                len(problem.constraints) == len(self.constraints) and
+                all(new is old for new, old in zip(problem.constraints,
+                                                   self.constraints)))
+
+    def update(self, problem):
+        """Updates the components for the problem's objective and constraints.
+
+        The components are only rebuilt if the objective changed or a
+        constraint was replaced or removed.
+
+        Parameters
+        ----------
+        problem : Problem
+            The problem to split.
+        """
+        num_constr = len(self.constraints)
+        if (problem.objective is not self.objective or
+                len(problem.constraints) < num_constr or
+                any(new is not old for new, old in zip(problem.constraints,
+                                                       self.constraints))):
+            self._reset(problem.objective)
+            num_constr = 0
+        for constr in problem.constraints[num_constr:]:
+            self.constraints.append(constr)
+            self._add_term(constr)
+
+    def components(self):
+        """Returns the term indices in each component.
+
+        Objective terms come first, followed by the constraints. The
+        components are ordered by their first term.
+
+        Returns
+        -------
+        list
+            A list of lists of term indices.
+        """
+        labels = {}
+        term_ids = []
+        for i in range(len(self._parent)):
+            root = self._find(i)
+            if root not in labels:
+                labels[root] = len(term_ids)
+                term_ids.append([])
+            term_ids[labels[root]].append(i)
+        return term_ids
+
+    def _reset(self, objective):
+        """Starts over with the terms of a new objective.
+        """
+        self.objective = objective
+        self.constraints = []
+        self._parent = []
+        self._var_terms = {}
+        # We have to deal with the special case where the objective function
+        # is not a sum.
+        if isinstance(objective.args[0], cvxtypes.add_expr()):
+            obj_terms = objective.args[0].args
+        else:
+            obj_terms = [objective.args[0]]
+        # Constant terms are appended to the first separable problem.
+        self.constant_terms = [term for term in obj_terms if term.is_constant()]
+        self.obj_terms = [term for term in obj_terms if not term.is_constant()]
+        for term in self.obj_terms:
+            self._add_term(term)
+
+    def _add_term(self, term):
+        """Adds an objective term or constraint to the components.
+        """
+        index = len(self._parent)
+        self._parent.append(index)
+        for var in term.variables():
+            first = self._var_terms.setdefault(var.id, index)
+            self._union(first, index)
+
+    def _find(self, i):
+        """Returns the root of a term's component, compressing the path.
+        """
+        root = i
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[i] != root:
+            self._parent[i], i = root, self._parent[i]
+        return root
+
+    def _union(self, i, j):
+        """Merges the components of two terms.
+        """
+        root_i, root_j = self._find(i), self._find(j)
+        if root_i != root_j:
+            # Keep the smaller index as the root.
+            if root_i > root_j:
+                root_i, root_j = root_j, root_i
+            self._parent[root_j] = root_i
+
+
+def get_separable_problems(problem, terms=None):
     """Return a list of separable problems whose sum is the original one.
 
     Parameters
     ----------
     problem : Problem
         A problem that consists of separable (sub)problems.
+    terms : SeparableTerms, optional
+        The components from an earlier call, which are updated in place.
 
     Returns
     -------
     List
         A list of problems which are separable whose sum is the original one.
     """
-    # obj_terms contains the terms in the objective functions. We have to
-    # deal with the special case where the objective function is not a sum.
-    if isinstance(problem.objective.args[0], cvxtypes.add_expr()):
-        obj_terms = problem.objective.args[0].args
-    else:
-        obj_terms = [problem.objective.args[0]]
-    # Remove constant terms, which will be appended to the first separable
-    # problem.
-    constant_terms = [term for term in obj_terms if term.is_constant()]
-    obj_terms = [term for term in obj_terms if not term.is_constant()]
-
-    constraints = problem.constraints
+    if terms is None:
+        terms = SeparableTerms()
+    terms.update(problem)
+    obj_terms = terms.obj_terms
+    constant_terms = terms.constant_terms
+    constraints = terms.constraints
     num_obj_terms = len(obj_terms)
-    num_terms = len(obj_terms) + len(constraints)
-
-    # Objective terms and constraints are indexed from 0 to num_terms - 1.
-    var_sets = [frozenset(func.variables()) for func in obj_terms + constraints
-                ]
-    all_vars = frozenset().union(*var_sets)
-
-    adj_matrix = dok_matrix((num_terms, num_terms), dtype=bool)
-    for var in all_vars:
-        # Find all functions that contain this variable
-        term_ids = [i for i, var_set in enumerate(var_sets) if var in var_set]
-        # Add an edge between any two objetive terms/constraints sharing
-        # this variable.
-        if len(term_ids) > 1:
-            for i, j in itertools.combinations(term_ids, 2):
-                adj_matrix[i, j] = adj_matrix[j, i] = True
-    num_components, labels = csgraph.connected_components(adj_matrix,
-                                                          directed=False)
 
     # After splitting, construct subproblems from appropriate objective
     # terms and constraints.
-    term_ids_per_subproblem = [[] for _ in range(num_components)]
-    for i, label in enumerate(labels):
-        term_ids_per_subproblem[label].append(i)
-    problem_list = []
-    for index in range(num_components):
-        terms = [obj_terms[i] for i in term_ids_per_subproblem[index]
-                 if i < num_obj_terms]
-        # If we just call sum, we'll have an extra 0 in the objective.
-        obj = sum(terms[1:], terms[0]) if terms else Constant(0)
+    subproblems = []
+    for term_ids in terms.components():
+        sub_terms = [obj_terms[i] for i in term_ids if i < num_obj_terms]
         constrs = [constraints[i - num_obj_terms]
-                   for i in term_ids_per_subproblem[index]
-                   if i >= num_obj_terms]
-        problem_list.append(Problem(problem.objective.copy([obj]), constrs))
-    # Append constant terms to the first separable problem.
+                   for i in term_ids if i >= num_obj_terms]
+        subproblems.append((sub_terms, constrs))
+    # Append constant terms to the first separable problem. The objectives
+    # are completed before the problems are made, since problems cache
+    # their leaves.
     if constant_terms:
-        # Avoid adding an extra 0 in the objective
-        sum_constant_terms = sum(constant_terms[1:], constant_terms[0])
-        if problem_list:
-            problem_list[0].objective.args[0] += sum_constant_terms
+        if subproblems:
+            subproblems[0][0].extend(constant_terms)
         else:
-            problem_list.append(Problem(problem.objective.copy(
-                [sum_constant_terms])))
+            subproblems.append((constant_terms, []))
+    problem_list = []
+    for sub_terms, constrs in subproblems:
+        # If we just call sum, we'll have an extra 0 in the objective.
+        obj = sum(sub_terms[1:], sub_terms[0]) if sub_terms else Constant(0)
+        problem_list.append(Problem(problem.objective.copy([obj]), constrs))
     return problem_list
@@ -17,7 +17,7 @@ You should have received a copy of the GNU General Public License
 along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from .canonical import Canonical
+from .canonical import Canonical, canonical_constraints
 from . import grad
 from . import shape
 from . import sign
@@ -46,6 +46,28 @@ class Canonical(object):
         """
         return self.canonicalize()
 
+    def canonicalize_node(self):
+        """Returns the graph implementation of the object alone.
+
+        The constraints are only those added by the object itself;
+        the constraints of its children are collected by
+        canonical_constraints.
+
+        Returns:
+            A tuple of (affine expression, [constraints], [children]).
+        """
+        obj, constraints = self.canonical_form
+        return (obj, constraints, [])
+
+    @pu.lazyprop
+    def canonical_node(self):
+        """The graph implementation of the object alone stored as a property.
+
+        Returns:
+            A tuple of (affine expression, [constraints], [children]).
+        """
+        return self.canonicalize_node()
+
     @abc.abstractmethod
     def variables(self):
         """The object's internal variables.
@@ -104,3 +126,30 @@ class Canonical(object):
         list
         """
         return None
+
+
+def canonical_constraints(roots):
+    """Collects the constraints of the canonical nodes reachable from roots.
+
+    The nodes form a DAG, so each node's constraints are added once,
+    after the constraints of its children.
+
+    Args:
+        roots: A list of Canonical objects.
+
+    Returns:
+        A list of constraints.
+    """
+    constraints = []
+    visited = set()
+    stack = [(root, False) for root in reversed(roots)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            constraints += node.canonical_node[1]
+        elif id(node) not in visited:
+            visited.add(id(node))
+            stack.append((node, True))
+            for child in reversed(node.canonical_node[2]):
+                stack.append((child, False))
+    return constraints
@@ -17,6 +17,8 @@ You should have received a copy of the GNU General Public License
 along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import functools
+
 # Taken from
 # http://stackoverflow.com/questions/3012421/python-lazy-property-decorator
 
@@ -40,3 +42,27 @@ def lazyprop(func):
             setattr(self, attr_name, func(self))
         return getattr(self, attr_name)
     return _lazyprop
+
+
+def compute_once(func):
+    """Wraps a method without arguments so it is only evaluated once.
+
+    The result is stored on the instance, so the method must only depend
+    on immutable state.
+
+    Args:
+        func: The method to wrap.
+
+    Returns:
+        A method that only does computation the first time it is called.
+    """
+    attr_name = '_compute_once_' + func.__name__
+
+    @functools.wraps(func)
+    def _compute_once(self):
+        """A method evaluated once per instance.
+        """
+        if not hasattr(self, attr_name):
+            setattr(self, attr_name, func(self))
+        return getattr(self, attr_name)
+    return _compute_once
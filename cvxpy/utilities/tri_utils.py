@@ -0,0 +1,95 @@
+"""
+Copyright 2013 Steven Diamond
+
+This file is part of CVXPY.
+
+CVXPY is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CVXPY is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CVXPY.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Utility functions for the scaled lower triangular format of SDP cones
+# used by SCS: the lower triangle of a symmetric matrix in column-major
+# order, with the off-diagonal entries scaled by sqrt(2).
+
+from collections import namedtuple
+import numpy as np
+import scipy.sparse as sp
+
+# The indices of the lower triangle of a matrix.
+# lower and upper are indices in the column-major flattened matrix of
+# each entry and of its mirror entry, and scale is sqrt(2) off the diagonal.
+LowerTri = namedtuple('LowerTri', ['lower', 'upper', 'scale'])
+
+
+def lower_tri_indices(n):
+    """Returns the indices of the lower triangle of an n by n matrix.
+
+    Parameters
+    ----------
+    n : int
+        The width/height of the matrix.
+
+    Returns
+    -------
+    LowerTri
+        The indices of the n*(n+1)//2 entries in column-major order.
+    """
+    # The upper triangle in row-major order is the lower triangle
+    # in column-major order.
+    cols, rows = np.triu_indices(n)
+    scale = np.where(rows == cols, 1.0, np.sqrt(2))
+    return LowerTri(cols*n + rows, rows*n + cols, scale)
+
+
+def scaled_lower_tri(n):
+    """Returns the coefficient extracting the scaled lower triangle.
+
+    Parameters
+    ----------
+    n : int
+        The width/height of the matrix.
+
+    Returns
+    -------
+    SciPy CSC matrix
+        A n*(n+1)//2 by n*n matrix.
+    """
+    tri = lower_tri_indices(n)
+    entries = tri.lower.size
+    return sp.csc_matrix((tri.scale, (np.arange(entries), tri.lower)),
+                         (entries, n*n))
+
+
+def tri_to_full(lower_tri, n):
+    """Expands a scaled lower triangle to the full symmetric matrix.
+
+    The off-diagonal entries are scaled by 1/sqrt(2).
+
+    Parameters
+    ----------
+    lower_tri : NDArray
+        The n*(n+1)//2 entries of the lower triangle.
+    n : int
+        The width/height of the matrix.
+
+    Returns
+    -------
+    NDArray
+        The n*n entries of the matrix in column-major order.
+    """
+    tri = lower_tri_indices(n)
+    vals = np.asarray(lower_tri).ravel()/tri.scale
+    full = np.empty(n*n)
+    full[tri.upper] = vals
+    full[tri.lower] = vals
+    return full
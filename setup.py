@@ -30,7 +30,6 @@ setup(
     install_requires=["ecos >= 2",
                       "scs >= 1.1.3",
                       "multiprocess",
-                      "fastcache",
                       "six",
                       "toolz",
                       "numpy >= 1.9",